@@ -1,14 +1,20 @@
 import streamlit as st
 from supabase import create_client
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
+
+# Adiciona o diretório raiz ao path
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from scripts.utils.embedding_generator import get_embedding_generator
 
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 
 @st.cache_resource
 def init_supabase():
@@ -18,7 +24,12 @@ def init_supabase():
 
 @st.cache_resource
 def init_model():
-    return SentenceTransformer(EMBEDDING_MODEL_NAME)
+    # Com o servidor de embeddings no ar, o dashboard não carrega o modelo; senão carrega
+    # localmente, com o mesmo cache do pipeline (consultas repetidas não passam pelo modelo)
+    return get_embedding_generator()
+
+def embed_query(text: str) -> list:
+    return model.generate_embedding(text)
 
 supabase = init_supabase()
 model = init_model()
@@ -30,7 +41,7 @@ query = st.text_input("Digite sua busca jurídica:", placeholder="Ex: O que é a
 if query and supabase and model:
     with st.spinner("Gerando embedding e buscando..."):
         # Gerar embedding
-        query_embedding = model.encode(query).tolist()
+        query_embedding = embed_query(query)
 
         # Buscar Chunks (RPC call seria ideal, mas vamos usar match_embeddings se configurado, ou simular)
         # Nota: Supabase-py não tem suporte direto fácil a match_documents sem configurar a function no DB.
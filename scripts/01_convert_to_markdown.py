@@ -1,16 +1,81 @@
 """
 Script 01: Conversão de Documentos para Markdown
 Usa Docling para converter arquivos DOCX/PDF da pasta raw para markdown limpo.
+RTF e DOC legados são extraídos em processo, sem subprocessos externos.
 """
 
 import os
+import json
 import time
+import struct
+import zipfile
 from pathlib import Path
-from typing import List
+from collections import defaultdict, Counter
+from datetime import datetime
+from importlib.metadata import version, PackageNotFoundError
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import xml.etree.ElementTree as ET
 from loguru import logger
-from docling.document_converter import DocumentConverter
+from docling.datamodel.base_models import InputFormat
+from docling.datamodel.pipeline_options import PdfPipelineOptions
+from docling.document_converter import DocumentConverter, PdfFormatOption
+
+from config import (
+    RAW_DOCS_DIR, MARKDOWN_DIR, LOGS_DIR, NUM_WORKERS,
+    CONVERT_EXECUTOR, DOCX_MODE, PDF_SPLIT_PAGES,
+    PDF_PROBE_PAGES, OCR_MIN_CHARS_PER_PAGE, LEAN_TABLE_STRUCTURE,
+    CONVERT_TASK_TIMEOUT, CONVERT_MAX_RSS_MB, CONVERT_MAX_TASKS_PER_WORKER
+)
+from utils.conversion_manifest import ConversionManifest, ConversionQuarantine
+from utils.worker_pool import SupervisedPool, WorkerStartupError, BUDGET_STATUSES
+from utils.markdown_handoff import MarkdownHandoff
+from utils.docx_extractor import DocxExtractor, ComplexDocumentError
+from utils.pdf_inspector import inspect_pdf
+from utils.legacy_extractor import RtfExtractor, DocExtractor, LegacyFormatError
+
+# Incrementar quando a lógica de conversão deste script mudar (invalida o manifesto)
+CONVERTER_REVISION = 2
+MANIFEST_PATH = MARKDOWN_DIR / ".conversion_manifest.json"
+QUARANTINE_PATH = LOGS_DIR / "conversion_quarantine.json"
+# Quantidade de arquivos mais lentos listados no relatório de conversão
+REPORT_SLOWEST_N = 20
+
+_docx_extractor = DocxExtractor()
+_rtf_extractor = RtfExtractor()
+_doc_extractor = DocExtractor()
+
+# Perfis de pipeline PDF: "lean" (sem OCR) para PDFs nativos em texto, "ocr" para digitalizados
+PDF_PROFILES = ("lean", "ocr")
+
+# Unidade de trabalho: (arquivo, faixa de páginas 1-indexada ou None, perfil de pipeline PDF)
+WorkUnit = Tuple[Path, Optional[Tuple[int, int]], str]
+
+
+class DoclingPipelines:
+    """Mantém um DocumentConverter por perfil de pipeline PDF, criados sob demanda."""
+
+    def __init__(self):
+        self._converters: Dict[str, DocumentConverter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, profile: str = "lean") -> DocumentConverter:
+        """Retorna o converter do perfil (formatos não-PDF ignoram as opções de pipeline)."""
+        with self._lock:
+            if profile not in self._converters:
+                options = PdfPipelineOptions()
+                options.do_ocr = profile == "ocr"
+                options.do_table_structure = profile == "ocr" or LEAN_TABLE_STRUCTURE
+                self._converters[profile] = DocumentConverter(
+                    format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=options)}
+                )
+            return self._converters[profile]
+
+
+# Pipelines do processo worker (inicializados uma única vez por processo)
+_worker_pipelines: Optional[DoclingPipelines] = None
 
-from config import RAW_DOCS_DIR, MARKDOWN_DIR, NUM_WORKERS
 
 def get_files_to_process() -> List[Path]:
     """Lista arquivos suportados no diretório raw."""
@@ -23,45 +88,436 @@ def get_files_to_process() -> List[Path]:
 
     return files
 
-def convert_document(file_path: Path, converter: DocumentConverter) -> bool:
-    """Converte um único documento para markdown."""
+def get_output_path(file_path: Path) -> Path:
+    """Caminho do Markdown de saída para um arquivo de origem."""
+    return MARKDOWN_DIR / file_path.relative_to(RAW_DOCS_DIR).with_suffix(".md")
+
+def get_manifest_key(file_path: Path) -> str:
+    """Chave do manifesto: caminho relativo do arquivo de origem."""
+    return file_path.relative_to(RAW_DOCS_DIR).as_posix()
+
+def get_converter_version(file_path: Optional[Path] = None) -> str:
+    """Versão do conversor registrada no manifesto (docling + revisão local + extrator próprio)."""
     try:
-        relative_path = file_path.relative_to(RAW_DOCS_DIR)
-        output_path = MARKDOWN_DIR / relative_path.with_suffix(".md")
+        docling_version = version("docling")
+    except PackageNotFoundError:
+        docling_version = "unknown"
+    converter_version = f"docling-{docling_version}+r{CONVERTER_REVISION}"
+    if file_path is not None and file_path.suffix.lower() == ".docx":
+        converter_version += f"+docx-{DOCX_MODE}"
+    elif file_path is not None and file_path.suffix.lower() in (".rtf", ".doc"):
+        converter_version += "+legacy-native"
+    return converter_version
 
-        # Pular se já existe
-        if output_path.exists():
-            logger.info(f"Skipping {relative_path} (já existe)")
-            return True
+def plan_conversions(
+    files: List[Path],
+    manifest: ConversionManifest
+) -> Tuple[List[Path], Dict[str, Optional[str]]]:
+    """
+    Seleciona os arquivos que precisam de (re)conversão segundo o manifesto.
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+    Returns:
+        Tupla (arquivos a converter, sha256 já calculados por chave do manifesto)
+    """
+    to_convert = []
+    hashes = {}
+    for file_path in files:
+        key = get_manifest_key(file_path)
+        needed, sha = manifest.needs_conversion(
+            key, file_path, get_output_path(file_path), get_converter_version(file_path)
+        )
+        if needed:
+            to_convert.append(file_path)
+            hashes[key] = sha
+        else:
+            logger.debug(f"Skipping {key} (inalterado)")
+    return to_convert, hashes
+
+def _convert_with_docling(file_path: Path, converter: DocumentConverter) -> Tuple[str, int]:
+    """Converte via Docling. Retorna (markdown, número de páginas)."""
+    result = converter.convert(file_path)
+    return result.document.export_to_markdown(), result.document.num_pages()
+
+def convert_document(
+    file_path: Path,
+    pipelines: DoclingPipelines,
+    profile: str = "lean",
+    write_output: bool = True
+) -> Dict[str, Any]:
+    """
+    Converte um único documento para markdown.
+
+    Args:
+        file_path: Arquivo de origem
+        pipelines: Converters Docling por perfil
+        profile: Perfil de pipeline PDF decidido na pré-checagem ("lean" ou "ocr")
+        write_output: Se False, o Markdown volta em "markdown" em vez de ser gravado (modo fused)
+
+    Returns:
+        Dicionário com status ("converted" ou "error"), caminho de conversão
+        usado, número de páginas e tempo de conversão.
+    """
+    outcome = {
+        "path": str(file_path), "status": "error", "pipeline": None, "pages": 0, "seconds": 0.0, "output_chars": 0
+    }
+    try:
+        relative_path = file_path.relative_to(RAW_DOCS_DIR)
+        output_path = get_output_path(file_path)
 
         logger.info(f"Convertendo: {relative_path}")
-        if file_path.suffix.lower() == '.rtf':
-            txt_path = output_path.parent / f"{file_path.stem}.txt"
-            subprocess.check_call(['textutil', '-convert', 'txt', str(file_path), '-output', str(txt_path)])
+        start = time.perf_counter()
+        suffix = file_path.suffix.lower()
+        if suffix == '.rtf':
+            markdown_content = _rtf_extractor.convert(file_path)
+            outcome["pipeline"] = "rtf-native"
+        elif suffix == '.doc':
             try:
-                with open(txt_path, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                markdown_content = f"# {file_path.stem}\n\n{content}"
-            finally:
-                txt_path.unlink(missing_ok=True)
+                markdown_content = _doc_extractor.convert(file_path)
+                outcome["pipeline"] = "doc-native"
+            except (LegacyFormatError, struct.error) as e:
+                logger.info(f"Fallback Docling para {relative_path}: {e}")
+                markdown_content, outcome["pages"] = _convert_with_docling(file_path, pipelines.get())
+                outcome["pipeline"] = "docling-fallback"
+        elif suffix == '.docx' and DOCX_MODE == "native":
+            try:
+                markdown_content = _docx_extractor.convert(file_path)
+                outcome["pipeline"] = "docx-native"
+            except (ComplexDocumentError, zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+                logger.info(f"Fallback Docling para {relative_path}: {e}")
+                markdown_content, outcome["pages"] = _convert_with_docling(file_path, pipelines.get())
+                outcome["pipeline"] = "docling-fallback"
+        elif suffix == '.pdf':
+            markdown_content, outcome["pages"] = _convert_with_docling(file_path, pipelines.get(profile))
+            outcome["pipeline"] = f"docling-{profile}"
         else:
-            result = converter.convert(file_path)
-            markdown_content = result.document.export_to_markdown()
+            markdown_content, outcome["pages"] = _convert_with_docling(file_path, pipelines.get())
+            outcome["pipeline"] = "docling"
+
+        if write_output:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(markdown_content)
+        else:
+            outcome["markdown"] = markdown_content
+
+        outcome["output_chars"] = len(markdown_content)
+        outcome["seconds"] = time.perf_counter() - start
+        outcome["status"] = "converted"
+        logger.success(f"✓ Convertido ({outcome['pipeline']}, {outcome['seconds']:.1f}s): {output_path}")
+        return outcome
+
+    except Exception as e:
+        logger.error(f"Erro ao converter {file_path}: {e}")
+        return outcome
+
+def convert_pdf_range(
+    file_path: Path,
+    page_range: Tuple[int, int],
+    converter: DocumentConverter,
+    profile: str = "lean"
+) -> Dict[str, Any]:
+    """
+    Converte uma faixa de páginas de um PDF.
+
+    Não grava nada: o processo principal costura as faixas em ordem de página.
 
+    Returns:
+        Dicionário com status, faixa, markdown parcial, páginas e tempo
+    """
+    piece = {
+        "path": str(file_path), "range": page_range, "profile": profile, "status": "error",
+        "markdown": "", "pages": 0, "seconds": 0.0
+    }
+    try:
+        start = time.perf_counter()
+        result = converter.convert(file_path, page_range=page_range)
+        piece["markdown"] = result.document.export_to_markdown()
+        piece["pages"] = result.document.num_pages()
+        piece["seconds"] = time.perf_counter() - start
+        piece["status"] = "converted"
+        logger.debug(f"Faixa {page_range[0]}-{page_range[1]} convertida: {file_path.name}")
+    except Exception as e:
+        logger.error(f"Erro ao converter {file_path} (páginas {page_range[0]}-{page_range[1]}): {e}")
+    return piece
+
+def stitch_pdf_pieces(file_path: Path, pieces: List[Dict[str, Any]], write_output: bool = True) -> Dict[str, Any]:
+    """Costura as faixas de um PDF em um único Markdown, em ordem de página."""
+    outcome = {
+        "path": str(file_path), "status": "error", "pipeline": f"docling-{pieces[0]['profile']}-split",
+        "pages": sum(p["pages"] for p in pieces),
+        "seconds": sum(p["seconds"] for p in pieces), "output_chars": 0
+    }
+    budget = next((p["budget"] for p in pieces if p.get("budget")), None)
+    if budget:
+        outcome["budget"] = budget
+    if any(p["status"] != "converted" for p in pieces):
+        logger.error(f"Conversão de {file_path} descartada: faixa(s) com erro")
+        return outcome
+
+    pieces = sorted(pieces, key=lambda p: p["range"][0])
+    markdown_content = "\n\n".join(p["markdown"].strip() for p in pieces if p["markdown"].strip())
+
+    output_path = get_output_path(file_path)
+    if write_output:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
         with open(output_path, "w", encoding="utf-8") as f:
             f.write(markdown_content)
+    else:
+        outcome["markdown"] = markdown_content
 
+    outcome["output_chars"] = len(markdown_content)
+    outcome["status"] = "converted"
+    logger.success(
+        f"✓ Convertido ({outcome['pipeline']}, {len(pieces)} faixas, {outcome['seconds']:.1f}s): {output_path}"
+    )
+    return outcome
 
-        logger.success(f"✓ Convertido: {output_path}")
-        return True
+def build_work_units(files: List[Path]) -> Tuple[List[WorkUnit], Dict[str, Dict[str, Any]]]:
+    """
+    Monta as unidades de trabalho.
 
-    except Exception as e:
-        logger.error(f"Erro ao converter {file_path}: {e}")
-        return False
+    Cada PDF passa por uma pré-checagem da camada de texto que escolhe o perfil
+    de pipeline ("ocr" para digitalizados, "lean" para nativos em texto), e PDFs
+    grandes são divididos em faixas de PDF_SPLIT_PAGES páginas. As unidades são
+    ordenadas pelo custo estimado (bytes proporcionais às páginas da faixa),
+    maiores primeiro, para que nada grande fique na cauda.
+
+    Returns:
+        Tupla (unidades de trabalho, pré-checagens por caminho de PDF)
+    """
+    weighted_units = []
+    probes = {}
+    for file_path in files:
+        size = file_path.stat().st_size
+        total_pages = 0
+        profile = "lean"
+        if file_path.suffix.lower() == ".pdf":
+            probe = inspect_pdf(file_path, PDF_PROBE_PAGES, OCR_MIN_CHARS_PER_PAGE)
+            probes[str(file_path)] = probe
+            total_pages = probe["pages"]
+            profile = "ocr" if probe["scanned"] else "lean"
+            logger.info(
+                f"Pré-checagem {file_path.name}: {probe['pages']} págs, "
+                f"{probe['chars_per_page']:.0f} chars/pág -> {profile} ({probe['seconds']:.2f}s)"
+            )
+
+        if PDF_SPLIT_PAGES > 0 and total_pages > PDF_SPLIT_PAGES:
+            for first in range(1, total_pages + 1, PDF_SPLIT_PAGES):
+                last = min(first + PDF_SPLIT_PAGES - 1, total_pages)
+                weighted_units.append((size * (last - first + 1) / total_pages, file_path, (first, last), profile))
+        else:
+            weighted_units.append((size, file_path, None, profile))
+
+    weighted_units.sort(key=lambda u: u[0], reverse=True)
+    return [(file_path, page_range, profile) for _, file_path, page_range, profile in weighted_units], probes
+
+def run_work_unit(
+    file_path: Path,
+    page_range: Optional[Tuple[int, int]],
+    profile: str,
+    pipelines: DoclingPipelines,
+    write_output: bool = True
+) -> Dict[str, Any]:
+    """Executa uma unidade de trabalho: documento inteiro ou faixa de páginas."""
+    if page_range is None:
+        return convert_document(file_path, pipelines, profile, write_output)
+    return convert_pdf_range(file_path, page_range, pipelines.get(profile), profile)
+
+def _init_worker():
+    """Inicializa os pipelines Docling do processo worker (uma vez por processo)."""
+    global _worker_pipelines
+    _worker_pipelines = DoclingPipelines()
+    _worker_pipelines.get("lean")
+
+def _run_unit_in_worker(
+    file_path: Path,
+    page_range: Optional[Tuple[int, int]],
+    profile: str,
+    write_output: bool = True
+) -> Dict[str, Any]:
+    """Executa uma unidade de trabalho usando os pipelines do processo worker."""
+    return run_work_unit(file_path, page_range, profile, _worker_pipelines, write_output)
+
+def _failed_unit_result(unit: WorkUnit, status: str, seconds: float) -> Dict[str, Any]:
+    """Resultado de uma unidade cujo worker foi finalizado (orçamento) ou levantou exceção."""
+    file_path, page_range, profile = unit
+    result = {
+        "path": str(file_path), "status": "error", "pipeline": None, "pages": 0, "seconds": seconds, "output_chars": 0
+    }
+    if page_range is not None:
+        result.update({"range": page_range, "profile": profile, "markdown": ""})
+    if status in BUDGET_STATUSES:
+        result["budget"] = status
+    return result
+
+def iter_unit_results(units: List[WorkUnit], write_output: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Executa as unidades no executor configurado, entregando resultados conforme terminam.
+
+    No executor de processos cada unidade tem orçamento de tempo e memória:
+    o worker que estoura é finalizado e substituído, e o resultado sai com
+    status "error" e a chave "budget" ("timeout", "memory" ou "crashed"; este
+    só quando a unidade derruba também o worker novo da nova tentativa).
+
+    Raises:
+        WorkerStartupError: Worker morreu no initializer (docling/modelos ausentes):
+            o passo é abortado, sem colocar a unidade em quarentena
+    """
+    if CONVERT_EXECUTOR == "thread":
+        # Threads não podem ser interrompidas: sem orçamentos neste modo
+        pipelines = DoclingPipelines()
+        with ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
+            futures = [executor.submit(run_work_unit, *unit, pipelines, write_output) for unit in units]
+            for future in as_completed(futures):
+                yield future.result()
+        return
+
+    # "spawn" evita herdar via fork o estado de threads do torch/docling do processo pai
+    pool = SupervisedPool(
+        _run_unit_in_worker,
+        NUM_WORKERS,
+        initializer=_init_worker,
+        task_timeout=CONVERT_TASK_TIMEOUT,
+        max_rss_mb=CONVERT_MAX_RSS_MB,
+        max_tasks_per_worker=CONVERT_MAX_TASKS_PER_WORKER
+    )
+    for index, status, value, seconds in pool.run([unit + (write_output,) for unit in units]):
+        if status == "ok":
+            yield value
+        else:
+            file_path, page_range, _ = units[index]
+            where = f" (páginas {page_range[0]}-{page_range[1]})" if page_range else ""
+            logger.error(f"Erro ao converter {file_path}{where}: {value or status}")
+            yield _failed_unit_result(units[index], status, seconds)
+
+def run_conversions(files: List[Path], handoff: Optional[MarkdownHandoff] = None) -> List[Dict[str, Any]]:
+    """
+    Executa as conversões no executor configurado.
+
+    Args:
+        files: Arquivos a converter
+        handoff: No modo fused, recebe cada Markdown convertido (gravação e chunking
+            ficam a cargo dela em vez dos workers)
 
-def main():
+    Returns:
+        Um resultado por arquivo (faixas de PDFs divididos já costuradas)
+    """
+    units, probes = build_work_units(files)
+    expected_pieces = defaultdict(int)
+    for file_path, page_range, _ in units:
+        if page_range is not None:
+            expected_pieces[str(file_path)] += 1
+    if expected_pieces:
+        logger.info(f"{len(expected_pieces)} PDFs grandes divididos em {sum(expected_pieces.values())} faixas")
+
+    outcomes = []
+    pieces = defaultdict(list)
+    write_output = handoff is None
+    for result in iter_unit_results(units, write_output):
+        if "range" in result:
+            pieces[result["path"]].append(result)
+            if len(pieces[result["path"]]) < expected_pieces[result["path"]]:
+                continue
+            result = stitch_pdf_pieces(Path(result["path"]), pieces.pop(result["path"]), write_output)
+
+        if "markdown" in result:
+            markdown_content = result.pop("markdown")
+            if result["status"] == "converted":
+                handoff.publish(get_output_path(Path(result["path"])), markdown_content)
+
+        probe = probes.get(result["path"])
+        if probe:
+            result["precheck_seconds"] = probe["seconds"]
+            result["chars_per_page"] = probe["chars_per_page"]
+        outcomes.append(result)
+
+    return outcomes
+
+def write_conversion_report(
+    outcomes: List[Dict[str, Any]],
+    elapsed: float,
+    skipped: int,
+    quarantined: int
+) -> Path:
+    """
+    Grava o relatório JSON da execução em logs/.
+
+    Por arquivo: formato, bytes, páginas, segundos de conversão, caracteres
+    de saída e caminho de conversão. No agregado: throughput, totais por
+    formato e por caminho, e os REPORT_SLOWEST_N arquivos mais lentos.
+
+    Returns:
+        Caminho do relatório
+    """
+    records = []
+    for outcome in outcomes:
+        file_path = Path(outcome["path"])
+        record = {
+            "file": get_manifest_key(file_path),
+            "format": file_path.suffix.lower().lstrip("."),
+            "bytes": file_path.stat().st_size if file_path.exists() else 0,
+            "pages": outcome["pages"],
+            "seconds": round(outcome["seconds"], 3),
+            "output_chars": outcome.get("output_chars", 0),
+            "pipeline": outcome["pipeline"],
+            "status": outcome["status"]
+        }
+        for extra in ("precheck_seconds", "chars_per_page", "budget"):
+            if extra in outcome:
+                record[extra] = outcome[extra]
+        records.append(record)
+
+    def totals(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "files": len(group),
+            "bytes": sum(r["bytes"] for r in group),
+            "pages": sum(r["pages"] for r in group),
+            "seconds": round(sum(r["seconds"] for r in group), 3),
+            "output_chars": sum(r["output_chars"] for r in group)
+        }
+
+    converted = [r for r in records if r["status"] == "converted"]
+    by_format = defaultdict(list)
+    by_pipeline = defaultdict(list)
+    for record in converted:
+        by_format[record["format"]].append(record)
+        by_pipeline[record["pipeline"]].append(record)
+
+    summary = {
+        **totals(converted),
+        "errors": len(records) - len(converted),
+        "skipped_unchanged": skipped,
+        "skipped_quarantined": quarantined,
+        "wall_seconds": round(elapsed, 3),
+        "docs_per_second": len(converted) / elapsed if elapsed > 0 else None,
+        "pages_per_second": sum(r["pages"] for r in converted) / elapsed if elapsed > 0 else None,
+        "mb_per_second": sum(r["bytes"] for r in converted) / 1e6 / elapsed if elapsed > 0 else None
+    }
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "converter_version": get_converter_version(),
+        "executor": CONVERT_EXECUTOR,
+        "workers": NUM_WORKERS,
+        "summary": summary,
+        "by_format": {k: totals(v) for k, v in sorted(by_format.items())},
+        "by_pipeline": {k: totals(v) for k, v in sorted(by_pipeline.items())},
+        "slowest": sorted(records, key=lambda r: r["seconds"], reverse=True)[:REPORT_SLOWEST_N],
+        "files": records
+    }
+
+    report_path = LOGS_DIR / f"conversion_report_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report_path
+
+def main(handoff: Optional[MarkdownHandoff] = None):
+    """
+    Executa o passo 1.
+
+    Args:
+        handoff: Passagem em memória para o chunking (modo fused de run_pipeline);
+            recebe os documentos convertidos e o Markdown inalterado já em disco
+    """
     logger.info("=== Passo 1: Conversão para Markdown ===")
 
     files = get_files_to_process()
@@ -71,14 +527,69 @@ def main():
 
     logger.info(f"Encontrados {len(files)} arquivos.")
 
-    converter = DocumentConverter()
+    manifest = ConversionManifest(MANIFEST_PATH, get_converter_version())
+    removed = manifest.remove_orphans([get_manifest_key(f) for f in files])
+    quarantine = ConversionQuarantine(QUARANTINE_PATH)
+    quarantined = {f for f in files if quarantine.contains(get_manifest_key(f), f)}
+    if quarantined:
+        logger.warning(f"{len(quarantined)} arquivos em quarentena ignorados (ver {QUARANTINE_PATH})")
+        files = [f for f in files if f not in quarantined]
+    to_convert, hashes = plan_conversions(files, manifest)
+    if handoff is not None:
+        pending = set(to_convert)
+        handoff.add_existing(
+            output for output in (get_output_path(f) for f in files if f not in pending) if output.exists()
+        )
+    logger.info(
+        f"{len(to_convert)} a converter, {len(files) - len(to_convert)} inalterados, "
+        f"{len(removed)} órfãos removidos (executor: {CONVERT_EXECUTOR}, workers: {NUM_WORKERS})."
+    )
+
+    start = time.perf_counter()
+    try:
+        outcomes = run_conversions(to_convert, handoff) if to_convert else []
+    except WorkerStartupError as e:
+        # Ambiente quebrado, não documento ruim: nada vai para a quarentena
+        logger.error(f"Conversão abortada: {e}")
+        raise
+    elapsed = time.perf_counter() - start
+    if handoff is not None:
+        # O manifesto só registra conversões cujo Markdown já está em disco
+        handoff.wait_written()
+
+    converted = [o for o in outcomes if o["status"] == "converted"]
+    for outcome in converted:
+        file_path = Path(outcome["path"])
+        key = get_manifest_key(file_path)
+        manifest.record(
+            key, file_path, get_output_path(file_path), hashes.get(key), get_converter_version(file_path)
+        )
+    manifest.save()
+
+    for outcome in outcomes:
+        if outcome.get("budget"):
+            file_path = Path(outcome["path"])
+            quarantine.add(get_manifest_key(file_path), file_path, outcome["budget"], outcome["seconds"])
+    quarantine.save()
+
+    pages = sum(o["pages"] for o in converted)
+    by_pipeline = Counter(o["pipeline"] for o in converted)
 
-    from concurrent.futures import ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
-        futures = [executor.submit(convert_document, file_path, converter) for file_path in files]
-        success_count = sum(f.result() for f in futures)
+    logger.info(f"Concluído. Sucesso: {len(converted)}/{len(to_convert)}")
+    for pipeline, count in by_pipeline.most_common():
+        pipeline_seconds = sum(o["seconds"] for o in converted if o["pipeline"] == pipeline)
+        logger.info(f"  {pipeline}: {count} arquivos, {pipeline_seconds:.1f}s de conversão")
+    if converted and elapsed > 0:
+        logger.info(
+            f"Throughput: {len(converted) / elapsed:.2f} docs/s, "
+            f"{pages / elapsed:.2f} páginas/s "
+            f"({len(converted)} convertidos, {pages} páginas em {elapsed:.1f}s)"
+        )
 
-    logger.info(f"Concluído. Sucesso: {success_count}/{len(files)}")
+    report_path = write_conversion_report(
+        outcomes, elapsed, len(files) - len(to_convert), len(quarantined)
+    )
+    logger.info(f"Relatório de conversão: {report_path}")
 
 
 if __name__ == "__main__":
@@ -3,31 +3,101 @@ Script 02: Criação de Chunks e Embeddings
 Lê arquivos Markdown, divide em chunks semânticos, gera embeddings e salva no Supabase.
 """
 
+import io
 import os
+import hashlib
+import uuid
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, TextIO
 from tqdm import tqdm
 from loguru import logger
 
-from config import MARKDOWN_DIR, CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_MODEL
+from config import (
+    MARKDOWN_DIR, CHUNK_SIZE, CHUNK_OVERLAP, LEGAL_AREAS,
+    EMBEDDING_BATCH_SIZE, EMBEDDING_QUEUE_SIZE,
+    CHUNK_STREAM_BLOCK_CHARS, CHUNK_INSERT_BATCH_SIZE,
+    DEDUP_ENABLED, DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_SHINGLE_SIZE
+)
 from database import SupabaseDB
-from utils.text_processor import TextProcessor
+from utils.text_processor import TextProcessor, iter_text_blocks
 from utils.embedding_generator import get_embedding_generator
+from utils.embedding_batcher import EmbeddingBatcher
+from utils.markdown_handoff import MarkdownHandoff
+from utils.near_duplicates import NearDuplicateIndex
+
+def document_key(file_path: Path) -> str:
+    """Caminho do Markdown relativo a MARKDOWN_DIR (identidade do documento no banco)."""
+    try:
+        return file_path.relative_to(MARKDOWN_DIR).as_posix()
+    except ValueError:
+        return file_path.name
+
+def chunk_content_hash(source_path: str, content: str, occurrence: int) -> str:
+    """
+    Chave de conteúdo do chunk: documento, texto, parâmetros do chunker e ocorrência
+    (o mesmo texto repetido no documento gera chaves distintas).
+    """
+    key = f"{source_path}\x00{CHUNK_SIZE}\x00{CHUNK_OVERLAP}\x00{occurrence}\x00{content}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
 
 def process_file(
     file_path: Path,
     processor: TextProcessor,
-    generator,
-    db: SupabaseDB
+    batcher: EmbeddingBatcher,
+    db: SupabaseDB,
+    dedup: Optional[NearDuplicateIndex] = None
 ):
-    """Processa um arquivo markdown: chunking + embedding + save."""
+    """Processa um arquivo markdown em streaming: chunking + enfileiramento para embedding + save."""
     try:
         with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+            process_document(f, file_path, processor, batcher, db, dedup)
+    except OSError as e:
+        logger.error(f"Erro ao ler {file_path}: {e}")
+
+def process_markdown(
+    content: str,
+    file_path: Path,
+    processor: TextProcessor,
+    batcher: EmbeddingBatcher,
+    db: SupabaseDB,
+    dedup: Optional[NearDuplicateIndex] = None
+):
+    """Processa o conteúdo de um documento markdown: chunking + enfileiramento para embedding + save."""
+    process_document(io.StringIO(content), file_path, processor, batcher, db, dedup)
+
+def process_document(
+    stream: TextIO,
+    file_path: Path,
+    processor: TextProcessor,
+    batcher: EmbeddingBatcher,
+    db: SupabaseDB,
+    dedup: Optional[NearDuplicateIndex] = None
+):
+    """
+    Processa um documento a partir de um stream de texto.
 
-        # Extrair metadados básicos
-        metadata = processor.extract_law_metadata(content)
-        area = processor.detect_legal_area(content)
+    Metadados vêm do primeiro bloco e a área do direito de uma leitura em blocos;
+    em seguida os chunks são gerados em streaming, sem materializar o documento nem
+    a lista de chunks. Chunks novos vão para a fila global de embeddings (`batcher`),
+    que os codifica junto com os de outros documentos e grava ao descarregar.
+
+    A ingestão é idempotente: cada chunk tem um content_hash e só os novos são
+    embedados e inseridos. Chunks já gravados são mantidos (ou reativados e
+    reordenados sem novo embedding) e os que saíram do documento são desativados
+    depois que os novos forem gravados (se a gravação falhar, os antigos seguem ativos).
+
+    Com `dedup`, chunks quase idênticos a um já visto na execução são salvos como
+    aliases (canonical_chunk_id) sem embedding próprio.
+    """
+    filename = file_path.name
+    source_path = document_key(file_path)
+    try:
+        # Extrair metadados básicos (número, tipo e título ficam no início do documento)
+        metadata = processor.extract_law_metadata(stream.read(CHUNK_STREAM_BLOCK_CHARS))
+        stream.seek(0)
+        area = processor.detect_legal_area(iter_text_blocks(stream, CHUNK_STREAM_BLOCK_CHARS))
+        stream.seek(0)
         if area:
             metadata["area"] = area
 
@@ -42,59 +112,217 @@ def process_file(
             )
             law_id = law.get("id")
 
-        # Dividir em chunks
-        chunks_data = processor.split_into_chunks(
-            content,
+        # Chunks gravados em execuções anteriores
+        existing = db.get_chunk_hashes(source_path)
+
+        # Dividir em chunks à medida que o texto é lido
+        chunks = processor.iter_chunks(
+            stream,
             chunk_size=CHUNK_SIZE,
-            chunk_overlap=CHUNK_OVERLAP
+            chunk_overlap=CHUNK_OVERLAP,
+            block_size=CHUNK_STREAM_BLOCK_CHARS
         )
 
-        if not chunks_data:
-            logger.warning(f"Nenhum chunk gerado para {file_path.name}")
-            return
+        seen_hashes = set()
+        occurrences: Dict[str, int] = {}
+        queued = 0
+        updated = 0
+        unchanged = 0
+        aliases = 0
+        for batch in iter_batches(chunks, CHUNK_INSERT_BATCH_SIZE):
+            new_records = []
+            updated_records = []
+            for chunk in batch:
+                digest = hashlib.sha256(chunk["content"].encode("utf-8")).hexdigest()
+                occurrence = occurrences.get(digest, 0)
+                occurrences[digest] = occurrence + 1
+                content_hash = chunk_content_hash(source_path, chunk["content"], occurrence)
+                seen_hashes.add(content_hash)
+
+                chunk_record = {
+                    "law_id": law_id,
+                    "source_type": "lei",  # Pode ser refinado
+                    "chunk_index": chunk["chunk_index"],
+                    "content": chunk["content"],
+                    "tokens": chunk["tokens"],
+                    "metadata": {
+                        "filename": filename,
+                        "start_sentence": chunk["start_sentence"],
+                        "end_sentence": chunk["end_sentence"],
+                        **metadata
+                    },
+                    "content_hash": content_hash,
+                    "source_path": source_path,
+                    "is_active": True
+                }
+
+                row = existing.get(content_hash)
+                if row is None:
+                    # Id gerado aqui para que aliases apontem para canônicos do mesmo lote
+                    chunk_record["id"] = str(uuid.uuid4())
+                    new_records.append(chunk_record)
+                    continue
+
+                if dedup and not row.get("canonical_chunk_id"):
+                    dedup.register(row["id"], chunk["content"])
+                if row.get("is_active") and row.get("chunk_index") == chunk["chunk_index"]:
+                    unchanged += 1
+                    continue
+                # Reativado ou deslocado: atualiza sem tocar no embedding
+                chunk_record["id"] = row["id"]
+                updated_records.append(chunk_record)
+
+            # Embedding só dos chunks novos e canônicos; aliases seguem na fila apenas para
+            # serem gravados depois do canônico (canonical_chunk_id referencia chunks.id)
+            for record in new_records:
+                canonical, similarity = dedup.add(record["id"], record["content"]) if dedup else (None, 0.0)
+                record["canonical_chunk_id"] = canonical
+                if canonical:
+                    record["metadata"]["duplicate_similarity"] = round(similarity, 3)
+                    aliases += 1
+                batcher.submit(record, None if canonical else record["content"], record["tokens"], key=source_path)
+            queued += len(new_records)
+
+            updated += db.upsert_chunks_batch(updated_records)
 
-        # Preparar batch de chunks
-        chunks_to_insert = []
-        texts_to_embed = [c["content"] for c in chunks_data]
+        if not seen_hashes:
+            logger.warning(f"Nenhum chunk gerado para {filename}")
 
-        # Gerar embeddings em batch
-        embeddings = generator.generate_embeddings_batch(texts_to_embed, show_progress=False)
+        # Conteúdo que saiu do documento: desativado só depois que os chunks novos
+        # deste documento forem gravados (a fila pode descarregá-los mais tarde)
+        stale = [row["id"] for content_hash, row in existing.items()
+                 if content_hash not in seen_hashes and row.get("is_active", True)]
+        if stale:
+            batcher.on_saved(source_path, lambda: db.retire_chunks(stale))
 
-        if len(embeddings) != len(chunks_data):
-            logger.error(f"Erro: esperados {len(chunks_data)} embeddings, recebidos {len(embeddings)} para {file_path.name}")
+        logger.info(
+            f"✓ {filename}: {queued} novos" + (f" ({aliases} aliases)" if aliases else "")
+            + f", {unchanged} inalterados, {updated} atualizados, {len(stale)} a desativar"
+        )
+
+    except Exception as e:
+        logger.error(f"Erro ao processar {filename}: {e}")
+
+def iter_batches(items: Iterable, size: int) -> Iterator[List]:
+    """Agrupa um iterável em listas de até `size` itens."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, max(1, size)))
+        if not batch:
             return
+        yield batch
+
+def save_embedded_chunks(db: SupabaseDB, ready: List[tuple]):
+    """Grava os chunks devolvidos pela fila de embeddings, na ordem de submissão."""
+    records = []
+    for record, embedding in ready:
+        record["embedding"] = embedding
+        records.append(record)
+    for batch in iter_batches(records, CHUNK_INSERT_BATCH_SIZE):
+        db.insert_chunks_batch(batch)
 
-        for i, chunk in enumerate(chunks_data):
-            chunk_record = {
-                "law_id": law_id,
-                "source_type": "lei",  # Pode ser refinado
-                "chunk_index": chunk["chunk_index"],
-                "content": chunk["content"],
-                "tokens": chunk["tokens"],
-                "metadata": {
-                    "filename": file_path.name,
-                    "start_sentence": chunk["start_sentence"],
-                    "end_sentence": chunk["end_sentence"],
-                    **metadata
-                },
-                "embedding": embeddings[i]
-            }
-            chunks_to_insert.append(chunk_record)
-
-        # Salvar no banco
-        count = db.insert_chunks_batch(chunks_to_insert)
-        logger.info(f"✓ {file_path.name}: {count} chunks salvos")
+def create_batcher(generator, db: SupabaseDB) -> EmbeddingBatcher:
+    """Fila de embeddings compartilhada por todos os documentos da execução."""
+    return EmbeddingBatcher(
+        generator,
+        on_ready=lambda ready: save_embedded_chunks(db, ready),
+        batch_size=EMBEDDING_BATCH_SIZE,
+        max_pending=EMBEDDING_QUEUE_SIZE
+    )
 
+def flush_batcher(batcher: EmbeddingBatcher):
+    """Descarrega os chunks restantes na fila ao fim da execução."""
+    try:
+        batcher.flush()
     except Exception as e:
-        logger.error(f"Erro ao processar {file_path}: {e}")
+        logger.error(f"Erro ao gerar/salvar o último lote de embeddings: {e}")
+    batcher.log_summary()
+
+def retire_removed_sources(db: SupabaseDB) -> int:
+    """
+    Desativa os chunks de documentos cujo Markdown não existe mais em MARKDOWN_DIR
+    (ex: removido pelo passo 1 junto com o arquivo de origem).
+    """
+    try:
+        removed = sorted(
+            path for path in db.get_active_source_paths()
+            if not (MARKDOWN_DIR / path).is_file()
+        )
+        return db.retire_sources(removed) if removed else 0
+    except Exception as e:
+        logger.error(f"Erro ao desativar chunks de documentos removidos: {e}")
+        return 0
+
+def create_dedup_index() -> Optional[NearDuplicateIndex]:
+    """Índice de quase duplicatas compartilhado por todos os documentos da execução."""
+    if not DEDUP_ENABLED:
+        return None
+    return NearDuplicateIndex(
+        threshold=DEDUP_THRESHOLD,
+        num_perm=DEDUP_NUM_PERM,
+        bands=DEDUP_BANDS,
+        shingle_size=DEDUP_SHINGLE_SIZE
+    )
+
+def log_dedup_summary(dedup: Optional[NearDuplicateIndex]):
+    if dedup and dedup.alias_count:
+        logger.info(
+            f"Quase duplicatas: {dedup.alias_count} aliases de {dedup.canonical_count} chunks canônicos "
+            f"(embedding e geração ignorados)"
+        )
+
+def log_cache_summary(generator):
+    cache = getattr(generator, "cache", None)
+    if cache is not None and (cache.hits or cache.misses):
+        logger.info(f"Cache de embeddings: {cache.hits} acertos, {cache.misses} calculados")
+
+def consume_handoff(handoff: MarkdownHandoff):
+    """
+    Consumidor do modo fused: faz chunking e embedding dos documentos à medida
+    que o passo 1 os converte, sem reler MARKDOWN_DIR.
+
+    Args:
+        handoff: Passagem em memória alimentada por 01_convert_to_markdown.main
+    """
+    logger.info("=== Passo 2 (fused): Chunks e Embeddings a partir da conversão ===")
+    try:
+        db = SupabaseDB()
+        processor = TextProcessor(legal_areas=LEGAL_AREAS)
+        generator = get_embedding_generator()
+        batcher = create_batcher(generator, db)
+        dedup = create_dedup_index()
+    except Exception as e:
+        handoff.abort(e)
+        raise
+
+    processed = 0
+    for output_path, content in handoff:
+        if content is None:
+            process_file(output_path, processor, batcher, db, dedup)
+        else:
+            process_markdown(content, output_path, processor, batcher, db, dedup)
+        processed += 1
+
+    flush_batcher(batcher)
+    generator.close()
+    if handoff.write_errors:
+        # Markdown que falhou ao gravar não está em disco, mas a fonte existe
+        logger.warning("Falhas de gravação do Markdown: desativação de documentos removidos adiada")
+    else:
+        retire_removed_sources(db)
+    logger.info(f"Chunking fused concluído: {processed} documentos")
+    log_dedup_summary(dedup)
+    log_cache_summary(generator)
 
 def main():
     logger.info("=== Passo 2: Criação de Chunks e Embeddings ===")
 
     # Inicializar componentes
     db = SupabaseDB()
-    processor = TextProcessor()
-    generator = get_embedding_generator(model_name=EMBEDDING_MODEL)
+    processor = TextProcessor(legal_areas=LEGAL_AREAS)
+    generator = get_embedding_generator()
+    batcher = create_batcher(generator, db)
+    dedup = create_dedup_index()
 
     # Listar arquivos MD
     files = list(MARKDOWN_DIR.rglob("*.md"))
@@ -105,7 +333,13 @@ def main():
     logger.info(f"Processando {len(files)} arquivos...")
 
     for file_path in tqdm(files):
-        process_file(file_path, processor, generator, db)
+        process_file(file_path, processor, batcher, db, dedup)
+
+    flush_batcher(batcher)
+    generator.close()
+    retire_removed_sources(db)
+    log_dedup_summary(dedup)
+    log_cache_summary(generator)
 
 if __name__ == "__main__":
     main()
@@ -14,7 +14,7 @@ from pydantic import BaseModel, Field
 from config import (
     OPENROUTER_API_KEY, OPENROUTER_BASE_URL, LLM_MODELS,
     GENERATION_SYSTEM_PROMPT, MAX_EXAMPLES_PER_CHUNK,
-    GENERATION_BATCH_SIZE, API_DELAY, EMBEDDING_MODEL,
+    GENERATION_BATCH_SIZE, API_DELAY,
     get_config
 )
 from database import SupabaseDB
@@ -143,7 +143,7 @@ def main():
 
     # Inicializar
     db = SupabaseDB(use_service_role=True)
-    generator = get_embedding_generator(model_name=EMBEDDING_MODEL)
+    generator = get_embedding_generator()
     client = OpenAI(
         base_url=OPENROUTER_BASE_URL,
         api_key=OPENROUTER_API_KEY
@@ -152,10 +152,12 @@ def main():
     # Obter ou criar dataset
     dataset_id = get_or_create_dataset(db, split="train")
 
-    # Buscar chunks não processados usando o novo índice
+    # Buscar chunks não processados usando o novo índice (aliases e chunks desativados ficam de fora)
     chunks = db.client.table("chunks")\
         .select("*")\
         .eq("processed_for_generation", False)\
+        .is_("canonical_chunk_id", "null")\
+        .eq("is_active", True)\
         .limit(100)\
         .execute().data
 
@@ -3,8 +3,7 @@ Script 04: Validação de Qualidade e Deduplicação
 Verifica qualidade dos exemplos gerados e remove duplicatas semânticas.
 """
 
-import json
-from typing import List, Dict
+from typing import List, Dict, Optional
 from tqdm import tqdm
 from loguru import logger
 from openai import OpenAI
@@ -12,9 +11,11 @@ from openai import OpenAI
 from config import (
     OPENROUTER_API_KEY, OPENROUTER_BASE_URL, LLM_MODELS,
     VALIDATION_SYSTEM_PROMPT, SIMILARITY_THRESHOLD,
-    MIN_OUTPUT_LENGTH, MAX_OUTPUT_LENGTH, EMBEDDING_MODEL
+    MIN_OUTPUT_LENGTH, MAX_OUTPUT_LENGTH, ANN_INDEX_ENABLED
 )
-from database import SupabaseDB
+from database import SupabaseDB, parse_vector
+from build_ann_index import sync_index
+from utils.ann_index import AnnIndex
 from utils.embedding_generator import get_embedding_generator
 
 def validate_example_llm(
@@ -52,18 +53,24 @@ def check_duplicates(
     example: Dict,
     db: SupabaseDB,
     generator,
-    threshold: float = 0.95
+    threshold: float = 0.95,
+    index: Optional[AnnIndex] = None
 ) -> bool:
     """Verifica se já existe exemplo semanticamente idêntico."""
 
-    # Busca exemplos similares no banco
-    # Nota: SupabaseDB.search_similar_examples espera lista de floats
-    # Se o embedding vier como string do banco, precisa converter
     embedding = example.get("embedding")
 
     if isinstance(embedding, str):
-        embedding = json.loads(embedding)
+        embedding = parse_vector(embedding)
 
+    if index is not None:
+        # Índice local: o próprio exemplo volta entre os 2 vizinhos e é ignorado
+        for neighbor_id, score in index.search(embedding, k=2)[0]:
+            if neighbor_id != str(example.get("id")):
+                return score > threshold
+        return False
+
+    # Sem índice local: busca exemplos similares no banco (RPC do pgvector)
     similars = db.search_similar_examples(
         query_embedding=embedding,
         limit=1
@@ -89,7 +96,7 @@ def main():
     logger.info("=== Passo 4: Validação de Qualidade ===")
 
     db = SupabaseDB()
-    generator = get_embedding_generator(model_name=EMBEDDING_MODEL)
+    generator = get_embedding_generator()
     client = OpenAI(
         base_url=OPENROUTER_BASE_URL,
         api_key=OPENROUTER_API_KEY
@@ -98,6 +105,8 @@ def main():
     # Buscar exemplos para validar (simplificado: busca todos não validados)
     # Idealmente teríamos status 'pending_validation'
     examples = db.client.table("examples").select("*").limit(100).execute().data
+    # Índice local de exemplos (sincronização incremental) para a deduplicação
+    index = sync_index(db, "examples") if ANN_INDEX_ENABLED else None
 
     if not examples:
         logger.warning("Nenhum exemplo encontrado para validar.")
@@ -120,11 +129,11 @@ def main():
             continue
 
         # 2. Validação de Duplicatas
-        # Converter embedding string -> list se necessário
+        # Converter embedding string -> vetor se necessário
         if isinstance(example["embedding"], str):
-            example["embedding"] = json.loads(example["embedding"])
+            example["embedding"] = parse_vector(example["embedding"])
 
-        if check_duplicates(example, db, generator, threshold=SIMILARITY_THRESHOLD):
+        if check_duplicates(example, db, generator, threshold=SIMILARITY_THRESHOLD, index=index):
             logger.debug(f"Reprovado (duplicata): {example['id']}")
             removed_count += 1
             continue
@@ -0,0 +1,150 @@
+"""
+Benchmark: chunker por somas prefixadas vs algoritmo anterior de split_into_chunks.
+Confere que os chunks são idênticos e mede o tempo nos maiores arquivos de 1-MarkdownClean.
+"""
+
+import re
+import json
+import time
+import argparse
+from datetime import datetime
+from typing import Dict, Any, List
+from loguru import logger
+
+from config import MARKDOWN_DIR, BENCHMARKS_DIR, CHUNK_SIZE, CHUNK_OVERLAP
+from utils.text_processor import TextProcessor
+
+
+def legacy_split_into_chunks(
+    processor: TextProcessor,
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int
+) -> List[Dict[str, Any]]:
+    """Implementação anterior (referência): tokeniza cada sentença, o overlap e o chunk inteiro."""
+    text = processor.clean_text(text)
+    sentences = processor.split_sentences(text)
+
+    chunks = []
+    current_chunk = []
+    current_tokens = 0
+    chunk_index = 0
+
+    def make_chunk(current_chunk: List[str], chunk_index: int) -> Dict[str, Any]:
+        chunk_text = " ".join(current_chunk)
+        return {
+            "content": chunk_text,
+            "tokens": processor.count_tokens(chunk_text),
+            "chunk_index": chunk_index,
+            "start_sentence": current_chunk[0][:50] + ("..." if len(current_chunk[0]) > 50 else ""),
+            "end_sentence": ("..." if len(current_chunk[-1]) > 50 else "") + current_chunk[-1][-50:]
+        }
+
+    for sentence in sentences:
+        sentence_tokens = processor.count_tokens(sentence)
+
+        if current_tokens + sentence_tokens > chunk_size and current_chunk:
+            chunks.append(make_chunk(current_chunk, chunk_index))
+
+            overlap_tokens = 0
+            overlap_sentences = []
+            for s in reversed(current_chunk):
+                s_tokens = processor.count_tokens(s)
+                if overlap_tokens + s_tokens <= chunk_overlap:
+                    overlap_sentences.insert(0, s)
+                    overlap_tokens += s_tokens
+                else:
+                    break
+
+            current_chunk = overlap_sentences
+            current_tokens = overlap_tokens
+            chunk_index += 1
+
+        current_chunk.append(sentence)
+        current_tokens += sentence_tokens
+
+    if current_chunk:
+        chunks.append(make_chunk(current_chunk, chunk_index))
+    return chunks
+
+def best_of(repeat: int, func, *args) -> float:
+    """Menor tempo de parede entre `repeat` execuções."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do chunker de split_into_chunks")
+    parser.add_argument("--top", type=int, default=10, help="Número de maiores arquivos Markdown")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições por arquivo (vale a menor)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--chunk-overlap", type=int, default=CHUNK_OVERLAP)
+    args = parser.parse_args()
+
+    files = sorted(MARKDOWN_DIR.rglob("*.md"), key=lambda p: p.stat().st_size, reverse=True)[:args.top]
+    if not files:
+        logger.warning("Nenhum arquivo Markdown encontrado.")
+        return
+
+    logger.info(f"=== Benchmark do chunker: {len(files)} maiores arquivos ===")
+    processor = TextProcessor()
+    # Aquecimento: tabela de tamanhos de token e regex de pré-tokenização
+    processor.split_into_chunks("Aquecimento. Do chunker.", args.chunk_size, args.chunk_overlap)
+
+    records = []
+    for file_path in files:
+        text = file_path.read_text(encoding="utf-8")
+        reference = legacy_split_into_chunks(processor, text, args.chunk_size, args.chunk_overlap)
+        candidate = processor.split_into_chunks(text, args.chunk_size, args.chunk_overlap)
+        cleaned = processor.clean_text(text)
+        record = {
+            "file": str(file_path.relative_to(MARKDOWN_DIR)),
+            "chars": len(text),
+            # Segmentos da divisão ingênua por pontuação vs segmentador ciente de abreviações
+            "regex_sentences": len(re.split(r'(?<=[.!?])\s+', cleaned)),
+            "sentences": len(processor.split_sentences(cleaned)),
+            "chunks": len(candidate),
+            "identical": reference == candidate,
+            "legacy_seconds": best_of(
+                args.repeat, legacy_split_into_chunks, processor, text, args.chunk_size, args.chunk_overlap
+            ),
+            "new_seconds": best_of(
+                args.repeat, processor.split_into_chunks, text, args.chunk_size, args.chunk_overlap
+            )
+        }
+        record["speedup"] = record["legacy_seconds"] / record["new_seconds"] if record["new_seconds"] else None
+        records.append(record)
+        logger.info(
+            f"{record['file']}: {record['chars']} chars, "
+            f"{record['regex_sentences']} -> {record['sentences']} sentenças, {record['chunks']} chunks, "
+            f"{record['legacy_seconds']:.3f}s -> {record['new_seconds']:.3f}s "
+            f"({record['speedup']:.1f}x){'' if record['identical'] else ' DIVERGENTE'}"
+        )
+
+    legacy_total = sum(r["legacy_seconds"] for r in records)
+    new_total = sum(r["new_seconds"] for r in records)
+    summary = {
+        "files": len(records),
+        "all_identical": all(r["identical"] for r in records),
+        "chunk_size": args.chunk_size,
+        "chunk_overlap": args.chunk_overlap,
+        "legacy_seconds": legacy_total,
+        "new_seconds": new_total,
+        "speedup": legacy_total / new_total if new_total else None
+    }
+    if summary["all_identical"]:
+        logger.info(f"Chunks idênticos em todos os arquivos. Speedup total: {summary['speedup']:.1f}x")
+    else:
+        logger.error("Chunks divergentes em relação ao algoritmo anterior!")
+
+    output_path = BENCHMARKS_DIR / f"chunker_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "files": records}, f, ensure_ascii=False, indent=2)
+    logger.success(f"Relatório salvo em {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: extrator DOCX nativo vs Docling.
+Compara tempo de parede e fidelidade do texto extraído em uma amostra de DOCX de 0-RawDocs.
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import difflib
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List
+from loguru import logger
+from docling.document_converter import DocumentConverter
+
+from config import RAW_DOCS_DIR, BENCHMARKS_DIR
+from utils.docx_extractor import DocxExtractor, ComplexDocumentError
+
+
+def normalize_words(markdown: str) -> List[str]:
+    """Reduz o Markdown a uma sequência de palavras (ignora marcação e pontuação de tabela)."""
+    text = re.sub(r'<!--.*?-->', ' ', markdown)
+    text = re.sub(r'[#|*_\\\-]+', ' ', text)
+    return re.findall(r'\w+', text.lower())
+
+def fidelity(reference: str, candidate: str) -> Dict[str, float]:
+    """
+    Mede a fidelidade do candidato em relação à saída do Docling.
+
+    Returns:
+        Dicionário com F1 de palavras (ordem ignorada) e razão de sequência (ordem considerada)
+    """
+    ref_words = normalize_words(reference)
+    cand_words = normalize_words(candidate)
+    overlap = sum((Counter(ref_words) & Counter(cand_words)).values())
+    precision = overlap / len(cand_words) if cand_words else 0.0
+    recall = overlap / len(ref_words) if ref_words else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    matcher = difflib.SequenceMatcher(None, ref_words, cand_words, autojunk=False)
+    return {"word_f1": f1, "sequence_ratio": matcher.ratio()}
+
+def benchmark_file(file_path: Path, extractor: DocxExtractor, converter: DocumentConverter) -> Dict[str, Any]:
+    """Converte um arquivo pelos dois caminhos e compara."""
+    record = {"file": str(file_path.relative_to(RAW_DOCS_DIR)), "bytes": file_path.stat().st_size}
+
+    start = time.perf_counter()
+    try:
+        native_md = extractor.convert(file_path)
+        record["native_status"] = "ok"
+    except ComplexDocumentError as e:
+        native_md = None
+        record["native_status"] = f"fallback: {e}"
+    record["native_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    docling_md = converter.convert(file_path).document.export_to_markdown()
+    record["docling_seconds"] = time.perf_counter() - start
+
+    if native_md is not None:
+        record.update(fidelity(docling_md, native_md))
+    return record
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do extrator DOCX nativo vs Docling")
+    parser.add_argument("--limit", type=int, default=50, help="Número de arquivos amostrados")
+    parser.add_argument("--seed", type=int, default=42, help="Semente da amostragem")
+    args = parser.parse_args()
+
+    files = sorted(RAW_DOCS_DIR.rglob("*.docx"))
+    random.Random(args.seed).shuffle(files)
+    files = files[:args.limit]
+
+    logger.info(f"=== Benchmark DOCX: {len(files)} arquivos ===")
+    extractor = DocxExtractor()
+    converter = DocumentConverter()
+
+    records = []
+    for file_path in files:
+        try:
+            records.append(benchmark_file(file_path, extractor, converter))
+        except Exception as e:
+            logger.error(f"Erro em {file_path}: {e}")
+
+    native_ok = [r for r in records if r["native_status"] == "ok"]
+    native_time = sum(r["native_seconds"] for r in native_ok)
+    docling_time = sum(r["docling_seconds"] for r in native_ok)
+    summary = {
+        "files": len(records),
+        "native_ok": len(native_ok),
+        "fallbacks": len(records) - len(native_ok),
+        "native_seconds": native_time,
+        "docling_seconds": docling_time,
+        "speedup": docling_time / native_time if native_time else None,
+        "mean_word_f1": sum(r["word_f1"] for r in native_ok) / len(native_ok) if native_ok else None,
+        "mean_sequence_ratio": sum(r["sequence_ratio"] for r in native_ok) / len(native_ok) if native_ok else None,
+    }
+
+    logger.info(f"Nativo: {summary['native_ok']}/{summary['files']} ({summary['fallbacks']} fallbacks)")
+    if native_ok:
+        logger.info(
+            f"Tempo (arquivos nativos): nativo {native_time:.2f}s vs Docling {docling_time:.2f}s "
+            f"(speedup {summary['speedup']:.1f}x)"
+        )
+        logger.info(
+            f"Fidelidade média: F1 de palavras {summary['mean_word_f1']:.3f}, "
+            f"razão de sequência {summary['mean_sequence_ratio']:.3f}"
+        )
+
+    output_path = BENCHMARKS_DIR / f"docx_extractor_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "files": records}, f, ensure_ascii=False, indent=2)
+    logger.success(f"Relatório salvo em {output_path}")
+
+
+if __name__ == "__main__":
+    main()
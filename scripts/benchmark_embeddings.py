@@ -0,0 +1,129 @@
+"""
+Benchmark: backend ONNX Runtime (fp32 e int8) vs sentence-transformers/torch em CPU.
+Mede throughput em chunks reais de 1-MarkdownClean, a similaridade de cosseno texto a
+texto em relação ao torch e o recall@k dos vizinhos mais próximos.
+"""
+
+import json
+import time
+import argparse
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Any, List
+import numpy as np
+from loguru import logger
+
+from config import MARKDOWN_DIR, BENCHMARKS_DIR, CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_MODEL, EMBEDDING_ONNX_DIR
+from utils.text_processor import TextProcessor
+from utils.embedding_generator import EmbeddingGenerator
+from utils.onnx_encoder import COSINE_TOLERANCE
+from utils.similarity_index import SimilarityIndex
+
+
+def sample_chunks(limit: int) -> List[str]:
+    """Chunks dos maiores arquivos Markdown, até `limit`."""
+    processor = TextProcessor()
+    files = sorted(MARKDOWN_DIR.rglob("*.md"), key=lambda p: p.stat().st_size, reverse=True)
+    texts = []
+    for file_path in files:
+        chunks = processor.iter_chunks(file_path, CHUNK_SIZE, CHUNK_OVERLAP)
+        texts.extend(chunk["content"] for chunk in islice(chunks, limit - len(texts)))
+        if len(texts) >= limit:
+            break
+    return texts
+
+def normalized(embeddings: List[List[float]]) -> np.ndarray:
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    return matrix / np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+
+def neighbors(matrix: np.ndarray, k: int) -> np.ndarray:
+    """Índices dos k vizinhos mais próximos de cada texto (excluindo ele mesmo)."""
+    return SimilarityIndex(matrix).neighbors(k)[0]
+
+def recall_at_k(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Fração média dos vizinhos do torch recuperados pelo candidato."""
+    k = reference.shape[1]
+    return float(np.mean([len(set(r) & set(c)) / k for r, c in zip(reference, candidate)]))
+
+def measure(generator: EmbeddingGenerator, texts: List[str], repeat: int) -> Dict[str, Any]:
+    """Menor tempo de parede entre `repeat` execuções e os embeddings gerados."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        embeddings = generator.generate_embeddings_batch(texts, show_progress=False)
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+    return {"seconds": seconds, "texts_per_second": len(texts) / seconds, "embeddings": embeddings}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de embeddings: ONNX Runtime vs torch")
+    parser.add_argument("--samples", type=int, default=512, help="Número de chunks")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições por backend (vale a menor)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--k", type=int, default=10, help="Vizinhos para o recall@k")
+    args = parser.parse_args()
+
+    texts = sample_chunks(args.samples)
+    if len(texts) <= args.k:
+        logger.warning("Chunks insuficientes em 1-MarkdownClean para o benchmark.")
+        return
+
+    logger.info(f"=== Benchmark de embeddings: {len(texts)} chunks, batch {args.batch_size} ===")
+    backends = {
+        "torch": EmbeddingGenerator(EMBEDDING_MODEL, batch_size=args.batch_size),
+        "onnx-fp32": EmbeddingGenerator(EMBEDDING_MODEL, batch_size=args.batch_size, backend="onnx",
+                                        onnx_dir=EMBEDDING_ONNX_DIR, onnx_quantized=False),
+        "onnx-int8": EmbeddingGenerator(EMBEDDING_MODEL, batch_size=args.batch_size, backend="onnx",
+                                        onnx_dir=EMBEDDING_ONNX_DIR, onnx_quantized=True),
+    }
+
+    results = {}
+    for name, generator in backends.items():
+        # Aquecimento: alocações do runtime e caches de kernels
+        generator.generate_embeddings_batch(texts[:args.batch_size], show_progress=False)
+        results[name] = measure(generator, texts, args.repeat)
+
+    reference = normalized(results["torch"]["embeddings"])
+    reference_neighbors = neighbors(reference, args.k)
+    records = []
+    for name, result in results.items():
+        matrix = normalized(result["embeddings"])
+        cosine = (reference * matrix).sum(axis=1)
+        tolerance = COSINE_TOLERANCE.get(name.replace("onnx-", ""))
+        record = {
+            "backend": name,
+            "seconds": result["seconds"],
+            "texts_per_second": result["texts_per_second"],
+            "speedup": results["torch"]["seconds"] / result["seconds"],
+            "cosine_min": float(cosine.min()),
+            "cosine_mean": float(cosine.mean()),
+            "cosine_tolerance": tolerance,
+            "within_tolerance": tolerance is None or bool(cosine.min() >= tolerance),
+            f"recall_at_{args.k}": recall_at_k(reference_neighbors, neighbors(matrix, args.k))
+        }
+        records.append(record)
+        logger.info(
+            f"{name}: {record['texts_per_second']:.1f} chunks/s ({record['speedup']:.2f}x), "
+            f"cosseno mín {record['cosine_min']:.5f} / médio {record['cosine_mean']:.5f}, "
+            f"recall@{args.k} {record[f'recall_at_{args.k}']:.3f}"
+            f"{'' if record['within_tolerance'] else ' FORA DA TOLERÂNCIA'}"
+        )
+
+    summary = {
+        "model": EMBEDDING_MODEL,
+        "samples": len(texts),
+        "batch_size": args.batch_size,
+        "k": args.k,
+        "all_within_tolerance": all(r["within_tolerance"] for r in records)
+    }
+    if not summary["all_within_tolerance"]:
+        logger.error("Backend ONNX fora da tolerância de cosseno em relação ao torch!")
+
+    output_path = BENCHMARKS_DIR / f"embeddings_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "backends": records}, f, ensure_ascii=False, indent=2)
+    logger.success(f"Relatório salvo em {output_path}")
+
+
+if __name__ == "__main__":
+    main()
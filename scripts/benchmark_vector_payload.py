@@ -0,0 +1,95 @@
+"""
+Benchmark: serialização de embeddings para o pgvector.
+Compara o caminho antigo (matriz -> listas de floats do Python via .tolist() ->
+str() por componente) com o caminho numpy (linhas float32 formatadas direto do
+buffer com precisão fixa), medindo CPU, pico de memória (tracemalloc), tamanho
+do payload e o erro de arredondamento.
+"""
+
+import json
+import time
+import argparse
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, Any, List
+import numpy as np
+from loguru import logger
+
+from config import BENCHMARKS_DIR, EMBEDDING_DIMENSION
+from database import vector_literal, VECTOR_PRECISION
+
+
+def legacy_payload(matrix: np.ndarray) -> List[str]:
+    """Caminho antigo: generate_embeddings_batch devolvia listas e o banco usava str()."""
+    embeddings = matrix.tolist()
+    return [f"[{','.join(map(str, embedding))}]" for embedding in embeddings]
+
+def numpy_payload(matrix: np.ndarray) -> List[str]:
+    """Caminho atual: linhas float32 formatadas direto do buffer."""
+    return [vector_literal(row) for row in matrix]
+
+def measure(serialize: Callable[[np.ndarray], List[str]], matrix: np.ndarray, repeat: int) -> Dict[str, Any]:
+    """Menor tempo entre `repeat` execuções e pico de memória alocada (payload incluso)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialize(matrix)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    payload = serialize(matrix)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    parsed = np.array([json.loads(p) for p in payload], dtype=np.float32)
+    return {
+        "seconds": min(timings),
+        "vectors_per_second": len(matrix) / min(timings),
+        "peak_mb": peak / 2**20,
+        "payload_mb": sum(len(p) for p in payload) / 2**20,
+        "max_abs_error": float(np.abs(parsed - matrix).max())
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialização de embeddings")
+    parser.add_argument("--vectors", type=int, default=20000, help="Número de embeddings")
+    parser.add_argument("--dimension", type=int, default=EMBEDDING_DIMENSION)
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições por caminho (vale a menor)")
+    args = parser.parse_args()
+
+    # Vetores normalizados, como os do modelo de embeddings
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((args.vectors, args.dimension)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    logger.info(f"=== Serialização de {args.vectors} embeddings ({args.dimension} dim) ===")
+    results = {}
+    for name, serialize in (("legacy", legacy_payload), ("numpy", numpy_payload)):
+        results[name] = measure(serialize, matrix, args.repeat)
+        r = results[name]
+        logger.info(
+            f"{name}: {r['seconds']:.2f}s ({r['vectors_per_second']:.0f} vetores/s), "
+            f"pico {r['peak_mb']:.1f} MB, payload {r['payload_mb']:.1f} MB, erro máx {r['max_abs_error']:.1e}"
+        )
+
+    summary = {
+        "vectors": args.vectors,
+        "dimension": args.dimension,
+        "precision": VECTOR_PRECISION,
+        "speedup": results["legacy"]["seconds"] / results["numpy"]["seconds"],
+        "peak_reduction": 1 - results["numpy"]["peak_mb"] / results["legacy"]["peak_mb"],
+        "payload_reduction": 1 - results["numpy"]["payload_mb"] / results["legacy"]["payload_mb"]
+    }
+    logger.info(
+        f"Caminho numpy: {summary['speedup']:.1f}x mais rápido, pico de memória "
+        f"{summary['peak_reduction']:.0%} menor, payload {summary['payload_reduction']:.0%} menor"
+    )
+
+    output_path = BENCHMARKS_DIR / f"vector_payload_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "results": results}, f, ensure_ascii=False, indent=2)
+    logger.success(f"Relatório salvo em {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Constrói e sincroniza o índice ANN local (utils/ann_index.py) de chunks e exemplos.
+Cada tabela/modelo tem seu diretório em ANN_INDEX_DIR. A sincronização padrão é
+incremental: baixa só as linhas criadas desde a última marca d'água (created_at).
+Com --full, confere todos os ids do banco: remove os que sumiram (ou foram
+desativados), baixa os que faltam e reativa os que voltaram.
+"""
+
+import argparse
+from pathlib import Path
+from loguru import logger
+
+from config import (
+    ANN_INDEX_DIR, ANN_NPROBE, EMBEDDING_MODEL, EMBEDDING_DIMENSION
+)
+from database import SupabaseDB, parse_vector
+from utils.ann_index import AnnIndex
+from utils.onnx_encoder import model_slug
+
+TABLES = ("chunks", "examples")
+# Vetores acumulados antes de cada inserção no índice
+ADD_BATCH = 1000
+
+
+def index_directory(table: str) -> Path:
+    """Diretório do índice da tabela para o modelo de embeddings atual."""
+    return ANN_INDEX_DIR / f"{table}-{model_slug(EMBEDDING_MODEL)}-{EMBEDDING_DIMENSION}"
+
+def open_index(table: str) -> AnnIndex:
+    """Abre o índice persistido da tabela (vazio se ainda não existir)."""
+    return AnnIndex(index_directory(table), EMBEDDING_DIMENSION, nprobe=ANN_NPROBE)
+
+def _add_rows(index: AnnIndex, rows) -> int:
+    """Insere linhas {id, embedding} no índice em lotes."""
+    added = 0
+    ids, vectors = [], []
+    for row in rows:
+        ids.append(str(row["id"]))
+        vectors.append(parse_vector(row["embedding"]))
+        if len(ids) >= ADD_BATCH:
+            added += index.add(ids, vectors)
+            ids, vectors = [], []
+    if ids:
+        added += index.add(ids, vectors)
+    return added
+
+def sync_index(db: SupabaseDB, table: str, full: bool = False, rebuild: bool = False) -> AnnIndex:
+    """
+    Sincroniza o índice local com a tabela.
+
+    Args:
+        db: Conexão com o banco
+        table: "chunks" ou "examples"
+        full: Confere todos os ids (remoções/reativações) em vez de só as linhas novas
+        rebuild: Força o retreino das listas invertidas
+
+    Returns:
+        Índice atualizado e persistido
+    """
+    index = open_index(table)
+    watermark = index.watermark
+
+    if full or watermark is None:
+        live = db.get_embedding_ids(table)
+        removed, restored = index.retain(set(live))
+        missing = [i for i in live if i not in index]
+        added = _add_rows(index, db.get_embeddings_by_id(table, missing))
+        if live:
+            watermark = max(live.values())
+    else:
+        # created_at >= marca: a linha da própria marca volta e é ignorada por id
+        def new_rows():
+            nonlocal watermark
+            for row in db.iter_embeddings(table, since=index.watermark):
+                watermark = max(watermark, row["created_at"])
+                if str(row["id"]) not in index:
+                    yield row
+        removed = restored = 0
+        added = _add_rows(index, new_rows())
+
+    index.watermark = watermark
+    if rebuild or index.needs_rebuild():
+        index.rebuild()
+    else:
+        index.save()
+    logger.info(
+        f"Índice ANN de {table}: {len(index)} vetores "
+        f"(+{added}, -{removed}, {restored} reativados)"
+    )
+    return index
+
+def main():
+    parser = argparse.ArgumentParser(description="Sincroniza o índice ANN local com o banco")
+    parser.add_argument("--table", choices=TABLES, help="Só esta tabela (padrão: todas)")
+    parser.add_argument("--full", action="store_true", help="Confere todos os ids (remoções e reativações)")
+    parser.add_argument("--rebuild", action="store_true", help="Retreina as listas invertidas")
+    args = parser.parse_args()
+
+    logger.info("=== Índice ANN local ===")
+    db = SupabaseDB()
+    for table in ([args.table] if args.table else TABLES):
+        sync_index(db, table, full=args.full, rebuild=args.rebuild)
+
+
+if __name__ == "__main__":
+    main()
@@ -100,6 +100,12 @@ LLM_MODELS = get_config("llm.models", {
 # EMBEDDINGS
 # =============================================================================
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", get_config("embeddings.model", "sentence-transformers/all-MiniLM-L6-v2"))
+# Backend local: "sentence-transformers" (torch) ou "onnx" (ONNX Runtime em CPU, ver export_onnx_model.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", get_config("embeddings.backend", "sentence-transformers")).lower()
+EMBEDDING_ONNX_DIR = MODELS_DIR / "onnx" / os.getenv(
+    "EMBEDDING_ONNX_NAME", get_config("embeddings.onnx.name", EMBEDDING_MODEL.rstrip("/").split("/")[-1])
+)
+EMBEDDING_ONNX_QUANTIZED = str(os.getenv("EMBEDDING_ONNX_QUANTIZED", get_config("embeddings.onnx.quantized", True))).lower() == "true"
 try:
     EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", str(get_config("embeddings.dimension", 384))))
 except ValueError:
@@ -140,6 +146,57 @@ def safe_float(env_var: str, config_path: str, default: str) -> float:
 # Chunking
 CHUNK_SIZE = safe_int("CHUNK_SIZE", "pipeline.chunk_size", "1500")
 CHUNK_OVERLAP = safe_int("CHUNK_OVERLAP", "pipeline.chunk_overlap", "200")
+# Chunking em streaming: caracteres lidos por vez e chunks por lote de embedding/inserção
+CHUNK_STREAM_BLOCK_CHARS = safe_int("CHUNK_STREAM_BLOCK_CHARS", "pipeline.stream_block_chars", "1048576")
+CHUNK_INSERT_BATCH_SIZE = safe_int("CHUNK_INSERT_BATCH_SIZE", "pipeline.insert_batch_size", "64")
+
+# Quase duplicatas (MinHash/LSH): chunks repetidos viram aliases de um canônico, sem embedding
+DEDUP_ENABLED = str(os.getenv("DEDUP_ENABLED", get_config("dedup.enabled", True))).lower() == "true"
+DEDUP_THRESHOLD = safe_float("DEDUP_THRESHOLD", "dedup.threshold", "0.85")
+DEDUP_NUM_PERM = safe_int("DEDUP_NUM_PERM", "dedup.num_perm", "128")
+DEDUP_BANDS = safe_int("DEDUP_BANDS", "dedup.bands", "16")
+DEDUP_SHINGLE_SIZE = safe_int("DEDUP_SHINGLE_SIZE", "dedup.shingle_size", "5")
+
+# Fila global de embeddings do passo 2: textos por chamada ao modelo e textos acumulados
+# (de vários documentos, ordenados por tamanho) antes de codificar
+EMBEDDING_BATCH_SIZE = safe_int("EMBEDDING_BATCH_SIZE", "embeddings.batch_size", "32")
+EMBEDDING_QUEUE_SIZE = safe_int("EMBEDDING_QUEUE_SIZE", "embeddings.queue_size", "1024")
+
+# Backend openai (EMBEDDING_MODEL=openai/...): requisições concorrentes sob orçamentos de
+# requisições e tokens por minuto (ajuste aos limites da sua conta)
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+EMBEDDING_API_BASE_URL = os.getenv("EMBEDDING_API_BASE_URL", get_config("embeddings.api.base_url", None)) or None
+EMBEDDING_API_CONCURRENCY = safe_int("EMBEDDING_API_CONCURRENCY", "embeddings.api.concurrency", "8")
+EMBEDDING_API_RPM = safe_int("EMBEDDING_API_RPM", "embeddings.api.requests_per_minute", "3000")
+EMBEDDING_API_TPM = safe_int("EMBEDDING_API_TPM", "embeddings.api.tokens_per_minute", "1000000")
+
+# Servidor local de embeddings (embedding_server.py): carrega o modelo uma vez e atende
+# passos, dashboard e API; EMBEDDING_SERVER_URL é None quando desativado (cada processo
+# carrega o seu modelo)
+EMBEDDING_SERVER_ENABLED = str(os.getenv("EMBEDDING_SERVER_ENABLED", get_config("embeddings.server.enabled", False))).lower() == "true"
+EMBEDDING_SERVER_HOST = os.getenv("EMBEDDING_SERVER_HOST", get_config("embeddings.server.host", "127.0.0.1"))
+EMBEDDING_SERVER_PORT = safe_int("EMBEDDING_SERVER_PORT", "embeddings.server.port", "8765")
+EMBEDDING_SERVER_URL = f"http://{EMBEDDING_SERVER_HOST}:{EMBEDDING_SERVER_PORT}" if EMBEDDING_SERVER_ENABLED else None
+EMBEDDING_SERVER_MAX_BATCH = safe_int("EMBEDDING_SERVER_MAX_BATCH", "embeddings.server.max_batch", "256")
+EMBEDDING_SERVER_MAX_WAIT_MS = safe_float("EMBEDDING_SERVER_MAX_WAIT_MS", "embeddings.server.max_wait_ms", "2")
+
+# Cache persistente de embeddings (SQLite + memmap float32 por modelo, despejo LRU)
+EMBEDDING_CACHE_ENABLED = str(os.getenv("EMBEDDING_CACHE_ENABLED", get_config("embeddings.cache.enabled", True))).lower() == "true"
+# None quando desativado (os geradores de embedding seguem sem cache)
+EMBEDDING_CACHE_DIR = (
+    PROJECT_ROOT / os.getenv("EMBEDDING_CACHE_DIR", get_config("embeddings.cache.dir", ".cache/embeddings"))
+    if EMBEDDING_CACHE_ENABLED else None
+)
+EMBEDDING_CACHE_MAX_MB = safe_int("EMBEDDING_CACHE_MAX_MB", "embeddings.cache.max_mb", "1024")
+
+# Índice ANN local (IVF em memmap) de chunks e exemplos, sincronizado por build_ann_index.py;
+# desativado, as buscas de similaridade voltam ao RPC do pgvector
+ANN_INDEX_ENABLED = str(os.getenv("ANN_INDEX_ENABLED", get_config("ann.enabled", True))).lower() == "true"
+ANN_INDEX_DIR = PROJECT_ROOT / os.getenv("ANN_INDEX_DIR", get_config("ann.dir", ".cache/ann"))
+ANN_NPROBE = safe_int("ANN_NPROBE", "ann.nprobe", "16")
+
+# Taxonomia de áreas do direito ({área: {palavra-chave: peso}}); vazio usa a taxonomia padrão
+LEGAL_AREAS = get_config("legal_areas", {})
 
 # Geração de exemplos
 MAX_EXAMPLES_PER_CHUNK = safe_int("MAX_EXAMPLES_PER_CHUNK", "pipeline.max_examples_per_chunk", "3") # Valor padrão hardcoded se não estiver no yaml
@@ -155,10 +212,39 @@ SIMILARITY_THRESHOLD = safe_float("SIMILARITY_THRESHOLD", "pipeline.similarity_t
 # EXECUÇÃO
 # =============================================================================
 NUM_WORKERS = safe_int("NUM_WORKERS", "execution.num_workers", "4")
+# Pool de processos de encoding de embeddings em CPU (NUM_WORKERS processos, cada um
+# com uma fatia dos núcleos); desativado por padrão
+EMBEDDING_POOL_ENABLED = str(os.getenv("EMBEDDING_POOL_ENABLED", get_config("embeddings.pool", False))).lower() == "true"
+EMBEDDING_POOL_WORKERS = NUM_WORKERS if EMBEDDING_POOL_ENABLED else 0
 API_DELAY = safe_float("API_DELAY", "execution.api_delay", "1.0")
 ENV = os.getenv("ENV", "development")
 DEBUG = os.getenv("DEBUG", "True").lower() == "true"
 
+# =============================================================================
+# CONVERSÃO (PASSO 1)
+# =============================================================================
+# "process": um DocumentConverter por processo (contorna o GIL)
+# "thread": converter único compartilhado entre threads (modo legado)
+CONVERT_EXECUTOR = os.getenv("CONVERT_EXECUTOR", get_config("conversion.executor", "process")).lower()
+# "native": extrator OOXML próprio com fallback para o Docling em estruturas complexas
+# "docling": todo DOCX passa pelo DocumentConverter
+DOCX_MODE = os.getenv("DOCX_MODE", get_config("conversion.docx_mode", "native")).lower()
+# PDFs com mais páginas que isto são divididos em faixas convertidas em paralelo (0 desativa)
+PDF_SPLIT_PAGES = safe_int("PDF_SPLIT_PAGES", "conversion.pdf_split_pages", "40")
+# Pré-checagem da camada de texto: abaixo da média de caracteres por página o PDF vai para OCR
+PDF_PROBE_PAGES = safe_int("PDF_PROBE_PAGES", "conversion.probe_pages", "5")
+OCR_MIN_CHARS_PER_PAGE = safe_int("OCR_MIN_CHARS_PER_PAGE", "conversion.ocr_min_chars_per_page", "100")
+# Modelo de estrutura de tabelas no pipeline enxuto (PDFs nativos em texto)
+LEAN_TABLE_STRUCTURE = str(os.getenv("LEAN_TABLE_STRUCTURE", get_config("conversion.lean_table_structure", False))).lower() == "true"
+# Orçamentos por documento no executor de processos (0 desativa): workers que estouram
+# tempo ou memória são finalizados e o arquivo vai para a quarentena
+CONVERT_TASK_TIMEOUT = safe_int("CONVERT_TASK_TIMEOUT", "conversion.task_timeout_seconds", "900")
+CONVERT_MAX_RSS_MB = safe_int("CONVERT_MAX_RSS_MB", "conversion.max_worker_rss_mb", "6144")
+# Workers são substituídos após N tarefas para conter vazamentos lentos
+CONVERT_MAX_TASKS_PER_WORKER = safe_int("CONVERT_MAX_TASKS_PER_WORKER", "conversion.max_tasks_per_worker", "50")
+# Modo fused (run_pipeline --fused): documentos convertidos aguardando o chunker em memória
+FUSED_QUEUE_SIZE = safe_int("FUSED_QUEUE_SIZE", "conversion.fused_queue_size", "16")
+
 # =============================================================================
 # LOGGING
 # =============================================================================
@@ -3,7 +3,9 @@ Módulo de conexão e operações com Supabase.
 Implementa as operações CRUD para as tabelas do schema unificado.
 """
 
-from typing import List, Dict, Optional, Any
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Iterator, Sequence, Set, Union
+import numpy as np
 from supabase import create_client, Client
 from loguru import logger
 
@@ -13,6 +15,45 @@ from config import (
     SUPABASE_SERVICE_ROLE_KEY
 )
 
+# Dígitos significativos dos vetores enviados ao pgvector (float4 tem ~7)
+VECTOR_PRECISION = 7
+
+Vector = Union[np.ndarray, Sequence[float]]
+
+
+@lru_cache(maxsize=8)
+def _vector_format(dimension: int) -> str:
+    return "[" + ",".join([f"%.{VECTOR_PRECISION}g"] * dimension) + "]"
+
+def vector_literal(embedding: Vector) -> str:
+    """
+    Formata um embedding no literal do pgvector ("[0.1234567,...]").
+
+    Aceita vetores numpy (float32, lidos direto do buffer) ou listas; uma única
+    formatação por vetor, com precisão fixa, em vez de str() por componente.
+
+    Raises:
+        ValueError: Componente NaN ou infinito (o pgvector recusa o vetor)
+    """
+    if not np.isfinite(embedding).all():
+        raise ValueError("Embedding com NaN ou infinito não é aceito pelo pgvector")
+    return _vector_format(len(embedding)) % tuple(embedding)
+
+def parse_vector(value: Union[str, Sequence[float]]) -> np.ndarray:
+    """
+    Converte um embedding lido do banco ("[0.1,...]" ou lista) em vetor float32.
+
+    Raises:
+        ValueError: Componente NaN ou infinito
+    """
+    if isinstance(value, str):
+        vector = np.fromstring(value.strip("[]"), dtype=np.float32, sep=",")
+    else:
+        vector = np.asarray(value, dtype=np.float32)
+    if not np.isfinite(vector).all():
+        raise ValueError("Embedding com NaN ou infinito")
+    return vector
+
 
 class SupabaseDB:
     """Gerenciador de conexão e operações com Supabase."""
@@ -123,7 +164,7 @@ class SupabaseDB:
     def insert_chunk(
         self,
         content: str,
-        embedding: List[float],
+        embedding: Vector,
         law_id: Optional[str] = None,
         article_id: Optional[str] = None,
         source_type: str = "lei",
@@ -133,7 +174,7 @@ class SupabaseDB:
     ) -> Dict[str, Any]:
         """Insere um chunk com seu embedding."""
         # Converte embedding para formato pgvector
-        embedding_str = f"[{','.join(map(str, embedding))}]"
+        embedding_str = vector_literal(embedding)
 
         data = {
             "law_id": law_id,
@@ -152,7 +193,7 @@ class SupabaseDB:
 
     def search_similar_chunks(
         self,
-        query_embedding: List[float],
+        query_embedding: Vector,
         limit: int = 5,
         match_threshold: float = 0.7,
         filters: Optional[Dict] = None
@@ -168,7 +209,7 @@ class SupabaseDB:
         Returns:
             Lista de chunks ordenados por similaridade
         """
-        embedding_str = f"[{','.join(map(str, query_embedding))}]"
+        embedding_str = vector_literal(query_embedding)
 
         # Construir query com RPC para busca vetorial
         rpc_params = {
@@ -239,7 +280,7 @@ class SupabaseDB:
         dataset_id: str,
         instruction: str,
         output: str,
-        embedding: List[float],
+        embedding: Vector,
         input_text: Optional[str] = None,
         task_type: Optional[str] = None,
         difficulty: Optional[str] = None,
@@ -251,7 +292,7 @@ class SupabaseDB:
         chunk_ids: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Insere um exemplo de treino."""
-        embedding_str = f"[{','.join(map(str, embedding))}]"
+        embedding_str = vector_literal(embedding)
 
         data = {
             "dataset_id": dataset_id,
@@ -292,7 +333,7 @@ class SupabaseDB:
 
     def search_similar_examples(
         self,
-        query_embedding: List[float],
+        query_embedding: Vector,
         limit: int = 3,
         filters: Optional[Dict] = None
     ) -> List[Dict[str, Any]]:
@@ -307,7 +348,7 @@ class SupabaseDB:
         Returns:
             Lista de exemplos ordenados por similaridade
         """
-        embedding_str = f"[{','.join(map(str, query_embedding))}]"
+        embedding_str = vector_literal(query_embedding)
 
         result = self.client.rpc(
             "match_examples",
@@ -329,13 +370,12 @@ class SupabaseDB:
         if not chunks:
             return 0
 
-        # Converter embeddings para string
-        # Converter embeddings para string (sem modificar lista original)
+        # Converter embeddings (numpy ou lista) para string (sem modificar o registro original)
         processed_chunks = []
         for chunk in chunks:
             chunk_copy = chunk.copy()
-            if isinstance(chunk_copy.get("embedding"), list):
-                chunk_copy["embedding"] = f"[{','.join(map(str, chunk_copy['embedding']))}]"
+            if isinstance(chunk_copy.get("embedding"), (np.ndarray, list)):
+                chunk_copy["embedding"] = vector_literal(chunk_copy["embedding"])
             processed_chunks.append(chunk_copy)
 
         result = self.client.table("chunks").insert(processed_chunks).execute()
@@ -343,18 +383,98 @@ class SupabaseDB:
         logger.info(f"✓ {count} chunks inseridos em batch")
         return count
 
+    def get_chunk_hashes(self, source_path: str, page_size: int = 1000) -> Dict[str, Dict[str, Any]]:
+        """
+        Chunks já gravados de um documento, indexados por content_hash.
+
+        Returns:
+            {content_hash: {"id", "is_active", "canonical_chunk_id", "chunk_index"}}
+        """
+        existing = {}
+        start = 0
+        while True:
+            rows = self.client.table("chunks")\
+                .select("id, content_hash, is_active, canonical_chunk_id, chunk_index")\
+                .eq("source_path", source_path)\
+                .range(start, start + page_size - 1)\
+                .execute().data or []
+            for row in rows:
+                if row.get("content_hash"):
+                    existing[row["content_hash"]] = row
+            if len(rows) < page_size:
+                return existing
+            start += page_size
+
+    def upsert_chunks_batch(self, chunks: List[Dict[str, Any]]) -> int:
+        """
+        Atualiza (ou insere) chunks pelo content_hash.
+
+        Colunas ausentes do registro, como o embedding, ficam como estão no banco:
+        chunks inalterados são reativados e reordenados sem recalcular embedding.
+        """
+        if not chunks:
+            return 0
+
+        result = self.client.table("chunks")\
+            .upsert(chunks, on_conflict="content_hash")\
+            .execute()
+        return len(result.data) if result.data else 0
+
+    def retire_chunks(self, chunk_ids: List[str], batch_size: int = 200) -> int:
+        """Marca chunks como inativos (conteúdo que saiu do documento)."""
+        retired = 0
+        for start in range(0, len(chunk_ids), batch_size):
+            result = self.client.table("chunks")\
+                .update({"is_active": False})\
+                .in_("id", chunk_ids[start:start + batch_size])\
+                .execute()
+            retired += len(result.data) if result.data else 0
+        if retired:
+            logger.info(f"✓ {retired} chunks desativados")
+        return retired
+
+    def get_active_source_paths(self, page_size: int = 1000) -> Set[str]:
+        """Documentos (source_path) com ao menos um chunk ativo."""
+        paths = set()
+        start = 0
+        while True:
+            rows = self.client.table("chunks")\
+                .select("source_path")\
+                .eq("is_active", True)\
+                .not_.is_("source_path", "null")\
+                .order("id")\
+                .range(start, start + page_size - 1)\
+                .execute().data or []
+            paths.update(row["source_path"] for row in rows)
+            if len(rows) < page_size:
+                return paths
+            start += page_size
+
+    def retire_sources(self, source_paths: List[str], batch_size: int = 50) -> int:
+        """Marca como inativos todos os chunks dos documentos (fonte removida)."""
+        retired = 0
+        for start in range(0, len(source_paths), batch_size):
+            result = self.client.table("chunks")\
+                .update({"is_active": False})\
+                .in_("source_path", source_paths[start:start + batch_size])\
+                .eq("is_active", True)\
+                .execute()
+            retired += len(result.data) if result.data else 0
+        if retired:
+            logger.info(f"✓ {retired} chunks desativados ({len(source_paths)} documentos removidos)")
+        return retired
+
     def insert_examples_batch(self, examples: List[Dict[str, Any]]) -> int:
         """Insere múltiplos exemplos de uma vez."""
         if not examples:
             return 0
 
-        # Converter embeddings para string
-        # Converter embeddings para string (sem modificar lista original)
+        # Converter embeddings (numpy ou lista) para string (sem modificar o registro original)
         processed_examples = []
         for example in examples:
             example_copy = example.copy()
-            if isinstance(example_copy.get("embedding"), list):
-                example_copy["embedding"] = f"[{','.join(map(str, example_copy['embedding']))}]"
+            if isinstance(example_copy.get("embedding"), (np.ndarray, list)):
+                example_copy["embedding"] = vector_literal(example_copy["embedding"])
             processed_examples.append(example_copy)
 
         result = self.client.table("examples").insert(processed_examples).execute()
@@ -362,6 +482,68 @@ class SupabaseDB:
         logger.info(f"✓ {count} exemplos inseridos em batch")
         return count
 
+    # =========================================================================
+    # EMBEDDINGS (sincronização do índice ANN local)
+    # =========================================================================
+
+    def _embedded_rows(self, table: str, columns: str):
+        """Linhas com embedding próprio (em chunks, só as ativas)."""
+        query = self.client.table(table).select(columns).not_.is_("embedding", "null")
+        if table == "chunks":
+            query = query.eq("is_active", True)
+        return query
+
+    def iter_embeddings(
+        self,
+        table: str,
+        since: Optional[str] = None,
+        page_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre {id, embedding, created_at} em ordem de criação.
+
+        Args:
+            table: "chunks" ou "examples"
+            since: Só linhas com created_at >= since (sincronização incremental)
+            page_size: Linhas por requisição
+        """
+        start = 0
+        while True:
+            query = self._embedded_rows(table, "id, embedding, created_at")
+            if since:
+                query = query.gte("created_at", since)
+            rows = query.order("created_at").order("id")\
+                .range(start, start + page_size - 1)\
+                .execute().data or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            start += page_size
+
+    def get_embedding_ids(self, table: str, page_size: int = 1000) -> Dict[str, str]:
+        """Ids (-> created_at) de todas as linhas com embedding, sem baixar os vetores."""
+        ids = {}
+        start = 0
+        while True:
+            rows = self._embedded_rows(table, "id, created_at").order("id")\
+                .range(start, start + page_size - 1)\
+                .execute().data or []
+            ids.update((row["id"], row["created_at"]) for row in rows)
+            if len(rows) < page_size:
+                return ids
+            start += page_size
+
+    def get_embeddings_by_id(self, table: str, ids: List[str], batch_size: int = 200) -> List[Dict[str, Any]]:
+        """Busca {id, embedding} de ids específicos."""
+        rows = []
+        for start in range(0, len(ids), batch_size):
+            result = self.client.table(table)\
+                .select("id, embedding")\
+                .in_("id", ids[start:start + batch_size])\
+                .execute()
+            rows.extend(result.data or [])
+        return rows
+
     # =========================================================================
     # STATISTICS (Estatísticas)
     # =========================================================================
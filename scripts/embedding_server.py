@@ -0,0 +1,54 @@
+"""
+Servidor local de embeddings (utils/embedding_service.py).
+Carrega o modelo de embeddings uma única vez (com o backend, o cache e o pool de
+encoding configurados) e atende, via HTTP em localhost, os passos 2-4, o dashboard
+e a API: com embeddings.server.enabled, o EmbeddingGenerator desses processos vira
+cliente deste servidor em vez de carregar o próprio modelo.
+"""
+
+import argparse
+from loguru import logger
+
+from config import (
+    EMBEDDING_SERVER_HOST, EMBEDDING_SERVER_PORT, EMBEDDING_SERVER_MAX_BATCH, EMBEDDING_SERVER_MAX_WAIT_MS
+)
+from utils.embedding_generator import get_embedding_generator
+from utils.embedding_service import create_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local de embeddings")
+    parser.add_argument("--host", default=EMBEDDING_SERVER_HOST, help="Interface (sem autenticação: use localhost)")
+    parser.add_argument("--port", type=int, default=EMBEDDING_SERVER_PORT)
+    parser.add_argument("--max-batch", type=int, default=EMBEDDING_SERVER_MAX_BATCH, help="Textos por micro-lote")
+    parser.add_argument("--max-wait-ms", type=float, default=EMBEDDING_SERVER_MAX_WAIT_MS,
+                        help="Espera por requisições concorrentes antes de codificar")
+    args = parser.parse_args()
+
+    logger.info("=== Servidor de Embeddings ===")
+    # O servidor carrega o próprio modelo: não pode ser cliente de si mesmo
+    generator = get_embedding_generator(server_url=None)
+    server = create_server(
+        generator, args.host, args.port, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms
+    )
+    host, port = server.server_address[:2]
+    logger.success(f"Servidor de embeddings em http://{host}:{port} ({generator.model_name}, {generator.backend})")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Encerrando servidor de embeddings...")
+    finally:
+        server.server_close()
+        server.batcher.close()
+        generator.close()
+        batcher = server.batcher
+        if batcher.batches:
+            logger.info(
+                f"Atendidas {batcher.requests} requisições ({batcher.texts} textos) "
+                f"em {batcher.batches} micro-lotes"
+            )
+
+
+if __name__ == "__main__":
+    main()
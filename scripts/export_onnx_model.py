@@ -0,0 +1,141 @@
+"""
+Exporta o modelo de embeddings sentence-transformers para ONNX (fp32 + int8).
+Gera em 5-Models/onnx/<modelo> o transformer exportado, a versão com pesos
+quantizados dinamicamente em int8, o tokenizer e a configuração de pooling
+usados pelo backend "onnx" do EmbeddingGenerator; em seguida confere a
+similaridade de cosseno contra o caminho torch (COSINE_TOLERANCE).
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+import numpy as np
+from loguru import logger
+
+import torch
+from sentence_transformers import SentenceTransformer
+from onnxruntime.quantization import quantize_dynamic, QuantType
+
+from config import EMBEDDING_MODEL, EMBEDDING_ONNX_DIR
+from utils.onnx_encoder import (
+    OnnxEncoder, ONNX_CONFIG_FILE, ONNX_MODEL_FILES, COSINE_TOLERANCE
+)
+
+# Textos de conferência rápida (o benchmark_embeddings.py usa chunks reais)
+SAMPLE_TEXTS = [
+    "Art. 1º Esta Lei estabelece normas gerais de licitação e contratação para as Administrações Públicas diretas.",
+    "§ 2º O disposto no caput não se aplica às empresas públicas e sociedades de economia mista.",
+    "Parágrafo único. Aplica-se subsidiariamente o Código de Processo Civil.",
+    "I - os órgãos dos Poderes Legislativo e Judiciário da União, quando no desempenho de função administrativa;",
+    "A pena de reclusão será cumprida em regime fechado, semiaberto ou aberto.",
+    "O contrato de trabalho por prazo determinado não poderá ser estipulado por mais de dois anos.",
+    "Compete privativamente à União legislar sobre direito civil, comercial, penal, processual e eleitoral.",
+    "Revogado.",
+]
+
+
+class TransformerOutput(torch.nn.Module):
+    """Transformer do sentence-transformers com entradas posicionais e saída last_hidden_state."""
+
+    def __init__(self, model, input_names):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *inputs):
+        return self.model(**dict(zip(self.input_names, inputs)), return_dict=True).last_hidden_state
+
+
+def pooling_config(st_model: SentenceTransformer) -> dict:
+    """Pooling e normalização do pipeline sentence-transformers (módulos após o Transformer)."""
+    pooling, normalize = "mean", False
+    for module in st_model:
+        name = type(module).__name__
+        if name == "Pooling":
+            if getattr(module, "pooling_mode_cls_token", False):
+                pooling = "cls"
+            elif getattr(module, "pooling_mode_max_tokens", False):
+                pooling = "max"
+        elif name == "Normalize":
+            normalize = True
+    return {"pooling": pooling, "normalize": normalize}
+
+def export(model_name: str, output_dir: Path, opset: int):
+    """Exporta fp32, quantiza para int8 e grava tokenizer e configuração."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0]
+    tokenizer = transformer.tokenizer
+    auto_model = transformer.auto_model.eval()
+
+    dummy = tokenizer(SAMPLE_TEXTS[:2], padding=True, truncation=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+
+    fp32_path = output_dir / ONNX_MODEL_FILES["fp32"]
+    logger.info(f"Exportando {model_name} -> {fp32_path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            TransformerOutput(auto_model, input_names),
+            tuple(dummy[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True
+        )
+
+    int8_path = output_dir / ONNX_MODEL_FILES["int8"]
+    logger.info(f"Quantizando pesos para int8 -> {int8_path}")
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+
+    # tokenizer.json (tokenizer rápido) é lido pela biblioteca tokenizers no backend onnx
+    tokenizer.save_pretrained(str(output_dir))
+    config = {
+        "model_name": model_name,
+        "dimension": st_model.get_sentence_embedding_dimension(),
+        "max_seq_length": st_model.max_seq_length,
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+        "opset": opset,
+        **pooling_config(st_model)
+    }
+    with open(output_dir / ONNX_CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    return st_model
+
+def verify(st_model: SentenceTransformer, output_dir: Path) -> bool:
+    """Confere a similaridade de cosseno de cada variante ONNX contra o torch."""
+    reference = st_model.encode(SAMPLE_TEXTS, convert_to_numpy=True)
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    ok = True
+    for variant, tolerance in COSINE_TOLERANCE.items():
+        encoder = OnnxEncoder(output_dir, quantized=(variant == "int8"))
+        candidate = encoder.encode(SAMPLE_TEXTS)
+        candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+        cosine = (reference * candidate).sum(axis=1)
+        status = "ok" if cosine.min() >= tolerance else "ABAIXO DA TOLERÂNCIA"
+        logger.info(f"{variant}: cosseno mínimo {cosine.min():.5f}, médio {cosine.mean():.5f} "
+                    f"(tolerância {tolerance}) {status}")
+        ok = ok and cosine.min() >= tolerance
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta o modelo de embeddings para ONNX (fp32 + int8)")
+    parser.add_argument("--model", default=EMBEDDING_MODEL, help="Modelo sentence-transformers")
+    parser.add_argument("--output", type=Path, default=EMBEDDING_ONNX_DIR, help="Diretório de saída")
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    st_model = export(args.model, args.output, args.opset)
+    if verify(st_model, args.output):
+        logger.success(f"Modelo ONNX pronto em {args.output}. Ative com embeddings.backend: onnx")
+    else:
+        logger.error("Saídas ONNX fora da tolerância de cosseno em relação ao torch!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
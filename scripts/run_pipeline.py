@@ -5,6 +5,7 @@ Executa os passos do pipeline sequencialmente ou individualmente.
 
 import argparse
 import sys
+import threading
 from loguru import logger
 
 # Importar scripts como módulos
@@ -47,6 +48,46 @@ def run_step(step_num: int):
         logger.error(f"Erro ao executar passo {step_num}: {e}")
         return False
 
+def run_fused_conversion_and_chunking():
+    """
+    Executa os passos 1 e 2 sobrepostos: cada Markdown convertido vai direto ao
+    chunker por uma fila em memória, e o chunking começa enquanto o restante
+    do corpus ainda está sendo convertido.
+    """
+    logger.info("\n=== Executando Passos 1+2 (modo fused) ===")
+    try:
+        from config import FUSED_QUEUE_SIZE
+        from utils.markdown_handoff import MarkdownHandoff
+
+        convert_module = _load_step_module(1)
+        chunks_module = _load_step_module(2)
+        handoff = MarkdownHandoff(maxsize=FUSED_QUEUE_SIZE)
+        errors = []
+
+        def consume():
+            try:
+                chunks_module.consume_handoff(handoff)
+            except Exception as e:
+                errors.append(e)
+                # Sem consumidor, a conversão não pode ficar bloqueada na fila cheia
+                handoff.abort(e)
+
+        consumer = threading.Thread(target=consume, name="chunker")
+        consumer.start()
+        try:
+            convert_module.main(handoff=handoff)
+        finally:
+            handoff.close()
+            consumer.join()
+
+        if errors:
+            logger.error(f"Erro no chunking fused: {errors[0]}")
+            return False
+        return True
+    except Exception as e:
+        logger.error(f"Erro ao executar passos 1+2 (fused): {e}")
+        return False
+
 def main():
     parser = argparse.ArgumentParser(description="Pipeline JurDatasetBrasil")
     parser.add_argument(
@@ -61,6 +102,11 @@ def main():
         choices=[1, 2, 3, 4, 5],
         help="Começar a partir de um passo específico"
     )
+    parser.add_argument(
+        "--fused",
+        action="store_true",
+        help="Sobrepor passos 1 e 2: o Markdown convertido vai direto ao chunking em memória"
+    )
 
     args = parser.parse_args()
 
@@ -74,6 +120,12 @@ def main():
         # Executar pipeline completo ou parcial
         start = args.start_from or 1
 
+        if args.fused and start == 1:
+            if not run_fused_conversion_and_chunking():
+                logger.error("Pipeline interrompido devido a erro.")
+                sys.exit(1)
+            start = 3
+
         for i in range(start, 6):
             if not run_step(i):
                 logger.error("Pipeline interrompido devido a erro.")
@@ -36,6 +36,10 @@ create table if not exists chunks (
     metadata jsonb default '{}'::jsonb,
     embedding vector(384), -- 384 dims para sentence-transformers/all-MiniLM-L6-v2 (padrão)
     processed_for_generation boolean default false, -- Tracking de chunks já processados para geração
+    canonical_chunk_id uuid references chunks(id), -- Quase duplicata: aponta para o chunk canônico (sem embedding próprio)
+    content_hash text, -- sha256 de documento + texto + parâmetros do chunker (ingestão idempotente)
+    source_path text, -- Markdown de origem, relativo a 1-MarkdownClean
+    is_active boolean default true, -- false quando o trecho saiu do documento
     created_at timestamp with time zone default timezone('utc'::text, now())
 );
 
@@ -79,6 +83,17 @@ create table if not exists migrations (
     details jsonb default '{}'::jsonb
 );
 
+-- Migração de bancos existentes
+alter table chunks add column if not exists canonical_chunk_id uuid references chunks(id);
+alter table chunks add column if not exists content_hash text;
+alter table chunks add column if not exists source_path text;
+alter table chunks add column if not exists is_active boolean default true;
+-- Chunks anteriores à ingestão idempotente não têm content_hash/source_path (o hash depende
+-- dos parâmetros do chunker e da ocorrência no documento, sem como recalculá-lo aqui): o
+-- passo 2 não os reconhece e grava novas cópias. Desativados, saem de match_chunks, do
+-- passo 3 e do índice ANN; a próxima execução do passo 2 recria os chunks ativos.
+update chunks set is_active = false where content_hash is null and is_active;
+
 -- =============================================================================
 -- ÍNDICES
 -- =============================================================================
@@ -99,6 +114,13 @@ create index if not exists examples_dataset_id_idx on examples (dataset_id);
 create index if not exists examples_law_id_idx on examples (law_id);
 create index if not exists examples_tags_idx on examples using gin (tags);
 
+-- Chave de conteúdo (upsert on_conflict) e diff por documento no passo 2
+create unique index if not exists chunks_content_hash_idx on chunks (content_hash);
+create index if not exists chunks_source_path_idx on chunks (source_path);
+
+create index if not exists chunks_canonical_chunk_id_idx on chunks (canonical_chunk_id)
+  where canonical_chunk_id is not null;
+
 -- Índice parcial para tracking de chunks não processados (otimização)
 create index if not exists chunks_unprocessed_idx on chunks (processed_for_generation)
   where processed_for_generation = false;
@@ -129,7 +151,8 @@ begin
     1 - (chunks.embedding <=> query_embedding) as similarity,
     chunks.metadata
   from chunks
-  where 1 - (chunks.embedding <=> query_embedding) > match_threshold
+  where chunks.is_active
+    and 1 - (chunks.embedding <=> query_embedding) > match_threshold
   order by chunks.embedding <=> query_embedding
   limit match_count;
 end;
@@ -2,12 +2,59 @@
 Módulo de utilitários do JurDatasetBrasil.
 """
 
-from .text_processor import TextProcessor, clean_text, split_into_chunks
+from .text_processor import TextProcessor, clean_text, split_into_chunks, iter_chunks
 from .embedding_generator import EmbeddingGenerator
+from .embedding_cache import EmbeddingCache
+from .embedding_batcher import EmbeddingBatcher
+from .onnx_encoder import OnnxEncoder
+from .encoder_pool import EncoderPool
+from .openai_async import AsyncEmbeddingClient
+from .embedding_service import EmbeddingServiceClient, MicroBatcher
+from .similarity_index import SimilarityIndex
+from .ann_index import AnnIndex
+from .conversion_manifest import ConversionManifest, ConversionQuarantine
+from .worker_pool import SupervisedPool, WorkerStartupError
+from .docx_extractor import DocxExtractor, ComplexDocumentError, docx_to_markdown
+from .legacy_extractor import (
+    RtfExtractor, DocExtractor, LegacyFormatError, rtf_to_markdown, doc_to_markdown
+)
+from .legal_lexer import LegalStructureLexer, parse_legal_structure, iter_nodes
+from .legal_area_classifier import LegalAreaClassifier
+from .sentence_segmenter import SentenceSegmenter, split_sentences
+from .near_duplicates import NearDuplicateIndex
 
 __all__ = [
     "TextProcessor",
     "clean_text",
     "split_into_chunks",
-    "EmbeddingGenerator"
+    "iter_chunks",
+    "EmbeddingGenerator",
+    "EmbeddingCache",
+    "EmbeddingBatcher",
+    "OnnxEncoder",
+    "EncoderPool",
+    "AsyncEmbeddingClient",
+    "EmbeddingServiceClient",
+    "MicroBatcher",
+    "SimilarityIndex",
+    "AnnIndex",
+    "ConversionManifest",
+    "ConversionQuarantine",
+    "SupervisedPool",
+    "WorkerStartupError",
+    "DocxExtractor",
+    "ComplexDocumentError",
+    "docx_to_markdown",
+    "RtfExtractor",
+    "DocExtractor",
+    "LegacyFormatError",
+    "rtf_to_markdown",
+    "doc_to_markdown",
+    "LegalStructureLexer",
+    "parse_legal_structure",
+    "iter_nodes",
+    "LegalAreaClassifier",
+    "SentenceSegmenter",
+    "split_sentences",
+    "NearDuplicateIndex"
 ]
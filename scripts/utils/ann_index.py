@@ -0,0 +1,396 @@
+"""
+Índice local de vizinhos aproximados (IVF) persistido em disco.
+Os vetores ficam em listas invertidas (k-means esférico): a busca compara a consulta
+só com as `nprobe` listas mais próximas. A base é gravada em .npy e aberta com
+memmap; inserções recentes vão para um segmento delta (busca exata) e remoções para
+tombstones, ambos consolidados por `rebuild`. Tudo é indexado pelo id da linha no
+banco, para sincronização incremental.
+"""
+
+import os
+import json
+import math
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from loguru import logger
+
+from .similarity_index import SimilarityIndex, normalize_rows
+
+META_FILE = "meta.json"
+# Até este número de consultas, cada uma é resolvida com um único produto sobre as
+# listas visitadas; lotes maiores agrupam as consultas por lista
+SMALL_BATCH = 8
+
+
+def _merge_topk(best_scores: np.ndarray, best_rows: np.ndarray,
+                scores: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-k (sem ordem) da união de dois conjuntos de candidatos por consulta."""
+    merged_scores = np.concatenate([best_scores, scores], axis=1)
+    merged_rows = np.concatenate([best_rows, rows], axis=1)
+    keep = np.argpartition(merged_scores, merged_scores.shape[1] - k, axis=1)[:, -k:]
+    return np.take_along_axis(merged_scores, keep, axis=1), np.take_along_axis(merged_rows, keep, axis=1)
+
+def spherical_kmeans(vectors: np.ndarray, nlist: int, iterations: int = 10,
+                     sample_per_list: int = 40, seed: int = 0) -> np.ndarray:
+    """Centróides normalizados treinados numa amostra dos vetores (já normalizados)."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * sample_per_list)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = SimilarityIndex(centroids).search(sample, k=1)[0][:, 0]
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        # Listas vazias recebem um ponto aleatório da amostra
+        empty = np.bincount(assignment, minlength=nlist) == 0
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class AnnIndex:
+    """Índice IVF por id: base em memmap + delta exato + tombstones."""
+
+    def __init__(
+        self,
+        directory: Path,
+        dimension: int,
+        nprobe: int = 16,
+        min_train_size: int = 4096,
+        rebuild_ratio: float = 0.2
+    ):
+        """
+        Abre (ou cria) o índice.
+
+        Args:
+            directory: Diretório do índice (um por tabela/modelo)
+            dimension: Dimensão dos embeddings
+            nprobe: Listas invertidas visitadas por consulta (mais = melhor recall, mais lento)
+            min_train_size: Vetores mínimos para treinar as listas; abaixo disso a busca é exata
+            rebuild_ratio: Delta ou tombstones acima desta fração da base disparam `rebuild`
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dimension = dimension
+        self.nprobe = max(1, nprobe)
+        self.min_train_size = min_train_size
+        self.rebuild_ratio = rebuild_ratio
+
+        self.generation = 0
+        self.watermark: Optional[str] = None
+        self._centroids = np.empty((0, dimension), dtype=np.float32)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._base_vectors = np.empty((0, dimension), dtype=np.float32)
+        self._base_ids = np.empty(0, dtype="S1")
+        self._alive = np.empty(0, dtype=bool)
+        self._base_rows: Optional[Dict[str, int]] = None
+        self._delta_ids: List[str] = []
+        self._delta_set: Set[str] = set()
+        self._delta = SimilarityIndex(dimension=dimension)
+        self._load()
+
+    # =========================================================================
+    # PERSISTÊNCIA
+    # =========================================================================
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _base_file(self, generation: int, part: str) -> Path:
+        return self._path(f"base-{generation}.{part}.npy")
+
+    def _load(self):
+        meta_path = self._path(META_FILE)
+        if not meta_path.exists():
+            return
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("dimension") != self.dimension:
+            logger.warning(f"Índice ANN em {self.directory} tem outra dimensão; será reconstruído")
+            return
+
+        self.generation = meta["generation"]
+        self.watermark = meta.get("watermark")
+        if self.generation:
+            self._centroids = np.load(self._base_file(self.generation, "centroids"))
+            self._offsets = np.load(self._base_file(self.generation, "offsets"))
+            self._base_vectors = self._map(self._base_file(self.generation, "vectors"))
+            self._base_ids = self._map(self._base_file(self.generation, "ids"))
+        self._alive = np.ones(len(self._base_ids), dtype=bool)
+
+        tombstones = meta.get("tombstones", [])
+        if tombstones:
+            rows = self._rows()
+            self._alive[[rows[i] for i in tombstones if i in rows]] = False
+        if meta.get("delta"):
+            self._delta_ids = [i.decode("utf-8") for i in np.load(self._path("delta.ids.npy"))]
+            self._delta_set = set(self._delta_ids)
+            self._delta.add(np.load(self._path("delta.vectors.npy")))
+
+    @staticmethod
+    def _map(path: Path) -> np.ndarray:
+        """Abre um .npy com memmap (como ndarray simples: fatias sem o custo da subclasse memmap)."""
+        return np.load(path, mmap_mode="r").view(np.ndarray)
+
+    def _save_array(self, path: Path, array: np.ndarray):
+        """Grava via arquivo temporário + rename (leitores nunca veem arquivo parcial)."""
+        temporary = path.with_name(path.name + ".tmp")
+        with open(temporary, "wb") as f:
+            np.save(f, array)
+        os.replace(temporary, path)
+
+    def save(self):
+        """Grava delta, tombstones e metadados (a base só muda em `rebuild`)."""
+        if self._delta_ids:
+            self._save_array(self._path("delta.vectors.npy"), self._delta.matrix)
+            self._save_array(self._path("delta.ids.npy"), np.array(self._delta_ids, dtype=bytes))
+        else:
+            for name in ("delta.vectors.npy", "delta.ids.npy"):
+                self._path(name).unlink(missing_ok=True)
+        meta = {
+            "dimension": self.dimension,
+            "generation": self.generation,
+            "watermark": self.watermark,
+            "base": len(self._base_ids),
+            "lists": len(self._centroids),
+            "delta": len(self._delta_ids),
+            "tombstones": [self._base_ids[row].decode("utf-8") for row in np.flatnonzero(~self._alive)]
+        }
+        temporary = self._path(META_FILE + ".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(temporary, self._path(META_FILE))
+
+    # =========================================================================
+    # ATUALIZAÇÃO POR ID
+    # =========================================================================
+
+    def _rows(self) -> Dict[str, int]:
+        """Mapa id -> linha da base (montado sob demanda)."""
+        if self._base_rows is None:
+            self._base_rows = {i.decode("utf-8"): row for row, i in enumerate(self._base_ids)}
+        return self._base_rows
+
+    def __len__(self) -> int:
+        return int(self._alive.sum()) + len(self._delta_ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        row = self._rows().get(item_id)
+        return (row is not None and bool(self._alive[row])) or item_id in self._delta_set
+
+    def ids(self) -> Set[str]:
+        """Ids ativos no índice."""
+        rows = self._rows()
+        alive = {i for i, row in rows.items() if self._alive[row]}
+        return alive | self._delta_set
+
+    def add(self, ids: Sequence[str], embeddings) -> int:
+        """
+        Insere ou substitui vetores pelo id (entradas novas vão para o delta).
+
+        Returns:
+            Número de vetores gravados
+        """
+        ids = [str(i) for i in ids]
+        if not ids:
+            return 0
+        self.remove(ids)
+        self._delta.add(embeddings)
+        self._delta_ids.extend(ids)
+        self._delta_set.update(ids)
+        return len(ids)
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """Marca ids como removidos (tombstone na base, exclusão no delta)."""
+        ids = set(ids)
+        rows = self._rows()
+        removed = 0
+        for item_id in ids:
+            row = rows.get(item_id)
+            if row is not None and self._alive[row]:
+                self._alive[row] = False
+                removed += 1
+        if not ids.isdisjoint(self._delta_set):
+            keep = [n for n, i in enumerate(self._delta_ids) if i not in ids]
+            removed += len(self._delta_ids) - len(keep)
+            vectors = self._delta.matrix[keep]
+            self._delta = SimilarityIndex(vectors if len(keep) else None, dimension=self.dimension)
+            self._delta_ids = [self._delta_ids[n] for n in keep]
+            self._delta_set = set(self._delta_ids)
+        return removed
+
+    def retain(self, live_ids: Set[str]) -> Tuple[int, int]:
+        """
+        Sincroniza com o conjunto de ids vivos no banco: ids ausentes viram tombstones
+        e ids da base que voltaram (ex: chunks reativados) deixam de ser.
+
+        Returns:
+            (removidos, reativados)
+        """
+        rows = self._rows()
+        base_live = np.fromiter((i in live_ids for i in rows), dtype=bool, count=len(rows))
+        removed = int((self._alive & ~base_live).sum())
+        restored = int((~self._alive & base_live).sum())
+        self._alive = base_live
+        removed += self.remove([i for i in self._delta_ids if i not in live_ids])
+        return removed, restored
+
+    def needs_rebuild(self) -> bool:
+        """Delta ou tombstones grandes demais em relação à base."""
+        base = len(self._base_ids)
+        if not base:
+            return len(self._delta_ids) >= self.min_train_size
+        limit = self.rebuild_ratio * base
+        return len(self._delta_ids) > limit or (base - int(self._alive.sum())) > limit
+
+    def rebuild(self, nlist: Optional[int] = None):
+        """Retreina as listas com todos os vetores ativos e grava uma nova geração da base."""
+        alive_rows = np.flatnonzero(self._alive)
+        vectors = np.concatenate([np.asarray(self._base_vectors[alive_rows]), self._delta.matrix])
+        ids = np.concatenate([np.asarray(self._base_ids[alive_rows]),
+                              np.array(self._delta_ids, dtype=bytes)]) if len(vectors) else np.empty(0, dtype="S1")
+
+        if len(vectors) < self.min_train_size:
+            # Poucos vetores: tudo no delta, busca exata
+            self._delta = SimilarityIndex(vectors if len(vectors) else None, dimension=self.dimension)
+            self._delta_ids = [i.decode("utf-8") for i in ids]
+            self._delta_set = set(self._delta_ids)
+            centroids = np.empty((0, self.dimension), dtype=np.float32)
+            offsets, vectors, ids = np.zeros(1, dtype=np.int64), vectors[:0], ids[:0]
+        else:
+            nlist = nlist or max(1, int(4 * math.sqrt(len(vectors))))
+            centroids = spherical_kmeans(vectors, min(nlist, len(vectors)))
+            assignment = SimilarityIndex(centroids).search(vectors, k=1)[0][:, 0]
+            order = np.argsort(assignment, kind="stable")
+            vectors, ids = vectors[order], ids[order]
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=len(centroids)))])
+            self._delta = SimilarityIndex(dimension=self.dimension)
+            self._delta_ids, self._delta_set = [], set()
+
+        old_generation, self.generation = self.generation, self.generation + 1
+        for part, array in (("centroids", centroids), ("offsets", offsets), ("vectors", vectors), ("ids", ids)):
+            self._save_array(self._base_file(self.generation, part), array)
+        self._centroids, self._offsets = centroids, offsets
+        self._base_vectors = self._map(self._base_file(self.generation, "vectors"))
+        self._base_ids = self._map(self._base_file(self.generation, "ids"))
+        self._alive = np.ones(len(self._base_ids), dtype=bool)
+        self._base_rows = None
+        self.save()
+
+        # Gerações antigas (no Windows, arquivos ainda mapeados são apagados na próxima vez)
+        for path in self.directory.glob("base-*.npy"):
+            if not path.name.startswith(f"base-{self.generation}."):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        logger.info(
+            f"✓ Índice ANN reconstruído: {len(self._base_ids)} vetores em {len(centroids)} listas "
+            f"(geração {self.generation}, anterior {old_generation})"
+        )
+
+    # =========================================================================
+    # BUSCA
+    # =========================================================================
+
+    def search(self, queries, k: int = 5, nprobe: Optional[int] = None) -> List[List[Tuple[str, float]]]:
+        """
+        Vizinhos aproximados de cada consulta (similaridade de cosseno).
+
+        Args:
+            queries: Uma consulta (dimensão,) ou um lote (n_consultas, dimensão)
+            k: Vizinhos por consulta
+            nprobe: Listas visitadas (default: o do índice)
+
+        Returns:
+            Por consulta, [(id, similaridade)] em ordem decrescente (pode ter menos de k)
+        """
+        queries = normalize_rows(queries)
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+        if k <= 0:
+            return [[] for _ in queries]
+
+        base = len(self._base_ids)
+        if base:
+            best_scores, best_rows = self._search_base(queries, k, nprobe or self.nprobe, best_scores, best_rows)
+        if self._delta_ids:
+            rows, scores = self._delta.search(queries, k)
+            best_scores, best_rows = _merge_topk(best_scores, best_rows, scores, rows + base, k)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        results = []
+        for scores, rows in zip(best_scores, best_rows):
+            hits = []
+            for score, row in zip(scores, rows):
+                if row < 0 or score == -np.inf:
+                    break
+                item_id = self._base_ids[row].decode("utf-8") if row < base else self._delta_ids[row - base]
+                hits.append((item_id, float(score)))
+            results.append(hits)
+        return results
+
+    def _search_base(self, queries: np.ndarray, k: int, nprobe: int,
+                     best_scores: np.ndarray, best_rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Busca nas listas invertidas, agrupando as consultas por lista visitada."""
+        nprobe = min(nprobe, len(self._centroids))
+        coarse = queries @ self._centroids.T
+        probes = np.argpartition(coarse, coarse.shape[1] - nprobe, axis=1)[:, -nprobe:]
+
+        has_tombstones = not self._alive.all()
+        if len(queries) <= SMALL_BATCH:
+            # Poucas consultas: junta as linhas das listas visitadas e faz um só produto
+            for n, query in enumerate(queries):
+                starts, ends = self._offsets[probes[n]], self._offsets[probes[n] + 1]
+                lengths = ends - starts
+                rows = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+                scores = self._base_vectors[rows] @ query
+                if has_tombstones:
+                    scores[~self._alive[rows]] = -np.inf
+                kk = min(k, len(rows))
+                top = np.argpartition(scores, len(scores) - kk)[-kk:]
+                best_scores[n, :kk], best_rows[n, :kk] = scores[top], rows[top]
+            return best_scores, best_rows
+
+        lists = probes.ravel()
+        owners = np.repeat(np.arange(len(queries)), nprobe)
+        order = np.argsort(lists, kind="stable")
+        lists, owners = lists[order], owners[order]
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(lists)) + 1, [len(lists)]])
+
+        # Top-k de cada lista por consulta; a seleção final por consulta é feita uma vez
+        found_owners, found_scores, found_rows = [], [], []
+        for first, last in zip(bounds[:-1], bounds[1:]):
+            start, end = self._offsets[lists[first]], self._offsets[lists[first] + 1]
+            if start == end:
+                continue
+            group = owners[first:last]
+            scores = queries[group] @ self._base_vectors[start:end].T
+            if has_tombstones:
+                scores[:, ~self._alive[start:end]] = -np.inf
+            if end - start > k:
+                top = np.argpartition(scores, scores.shape[1] - k, axis=1)[:, -k:]
+                scores = np.take_along_axis(scores, top, axis=1)
+            else:
+                top = np.broadcast_to(np.arange(end - start), scores.shape)
+            found_owners.append(np.repeat(group, scores.shape[1]))
+            found_scores.append(scores.ravel())
+            found_rows.append((top + start).ravel())
+
+        if not found_owners:
+            return best_scores, best_rows
+        found_owners = np.concatenate(found_owners)
+        found_scores = np.concatenate(found_scores)
+        found_rows = np.concatenate(found_rows)
+        order = np.lexsort((-found_scores, found_owners))
+        found_owners, found_scores, found_rows = found_owners[order], found_scores[order], found_rows[order]
+        # Posição de cada candidato dentro da sua consulta: mantém as k primeiras
+        starts = np.searchsorted(found_owners, np.arange(len(queries)))
+        rank = np.arange(len(found_owners)) - starts[found_owners]
+        keep = rank < k
+        best_scores[found_owners[keep], rank[keep]] = found_scores[keep]
+        best_rows[found_owners[keep], rank[keep]] = found_rows[keep]
+        return best_scores, best_rows
@@ -0,0 +1,217 @@
+"""
+Manifesto de conversão incremental (passo 1).
+Registra, por arquivo de origem, sha256, tamanho, mtime e versão do conversor,
+permitindo reconverter apenas documentos cujo conteúdo mudou.
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+from loguru import logger
+
+# Versão registrada para saídas anteriores ao manifesto (conversor de origem desconhecido)
+ADOPTED_VERSION = "adopted"
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """Calcula o sha256 de um arquivo lendo em blocos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ConversionManifest:
+    """Manifesto JSON que mapeia arquivos de origem para suas saídas Markdown."""
+
+    def __init__(self, path: Path, converter_version: str):
+        """
+        Inicializa o manifesto.
+
+        Args:
+            path: Caminho do arquivo JSON do manifesto
+            converter_version: Versão do conversor; mudanças invalidam as entradas
+        """
+        self.path = path
+        self.converter_version = converter_version
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self):
+        """Carrega o manifesto do disco (se existir)."""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("files", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Manifesto {self.path} ilegível ({e}). Recriando do zero.")
+            self.entries = {}
+
+    def save(self):
+        """Grava o manifesto de forma atômica."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def needs_conversion(
+        self,
+        key: str,
+        source: Path,
+        output: Path,
+        converter_version: Optional[str] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Decide se um arquivo precisa ser (re)convertido.
+
+        Tamanho e mtime inalterados dispensam o hash; o sha256 só é calculado
+        quando os metadados do arquivo mudaram.
+
+        Markdown existente sem entrada no manifesto é adotado (sem reconverter) só
+        se for mais recente que a origem e o arquivo usar o conversor padrão; a
+        entrada fica com a versão ADOPTED_VERSION e vale apenas enquanto a versão
+        do conversor não mudar.
+
+        Args:
+            key: Caminho relativo do arquivo de origem (chave do manifesto)
+            source: Caminho absoluto do arquivo de origem
+            output: Caminho absoluto do Markdown de saída
+            converter_version: Versão específica deste arquivo (default: a do manifesto)
+
+        Returns:
+            Tupla (precisa converter, sha256 calculado ou None)
+        """
+        converter_version = converter_version or self.converter_version
+        stat = source.stat()
+        entry = self.entries.get(key)
+
+        if entry is None:
+            # Extratores próprios (docx/rtf/doc) não geraram a saída antiga: reconverte
+            if (output.exists() and converter_version == self.converter_version
+                    and output.stat().st_mtime_ns >= stat.st_mtime_ns):
+                sha = file_sha256(source)
+                self.record(key, source, output, sha, ADOPTED_VERSION)
+                self.entries[key]["adopted_under"] = converter_version
+                logger.debug(f"Adotado no manifesto: {key}")
+                return False, sha
+            return True, None
+
+        entry_version = entry.get("converter_version")
+        if entry_version == ADOPTED_VERSION:
+            entry_version = entry.get("adopted_under")
+        if entry_version != converter_version or not output.exists():
+            return True, None
+
+        if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return False, entry.get("sha256")
+
+        sha = file_sha256(source)
+        if sha == entry.get("sha256"):
+            # Apenas metadados mudaram (ex: touch/cópia); atualiza sem reconverter
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+            return False, sha
+
+        return True, sha
+
+    def record(
+        self,
+        key: str,
+        source: Path,
+        output: Path,
+        sha: Optional[str] = None,
+        converter_version: Optional[str] = None
+    ):
+        """Registra uma conversão bem-sucedida."""
+        stat = source.stat()
+        self.entries[key] = {
+            "sha256": sha or file_sha256(source),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "converter_version": converter_version or self.converter_version,
+            "output": self._relative_output(output)
+        }
+
+    def _relative_output(self, output: Path) -> str:
+        """Caminho da saída relativo ao diretório do manifesto (portável entre máquinas)."""
+        try:
+            return output.relative_to(self.path.parent).as_posix()
+        except ValueError:
+            return str(output)
+
+    def remove_orphans(self, current_keys: List[str]) -> List[str]:
+        """
+        Remove saídas cujos arquivos de origem não existem mais.
+
+        Args:
+            current_keys: Chaves dos arquivos de origem presentes nesta execução
+
+        Returns:
+            Lista de chaves removidas
+        """
+        current = set(current_keys)
+        removed = []
+        for key in [k for k in self.entries if k not in current]:
+            output = self.path.parent / self.entries[key]["output"]
+            output.unlink(missing_ok=True)
+            del self.entries[key]
+            removed.append(key)
+            logger.info(f"Removido Markdown órfão: {output}")
+        return removed
+
+
+class ConversionQuarantine:
+    """
+    Lista de arquivos que estouraram o orçamento de tempo ou memória na conversão.
+
+    Um arquivo em quarentena é ignorado nas execuções seguintes enquanto tamanho
+    e mtime não mudarem; para forçar nova tentativa, remova sua entrada do JSON.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f).get("files", {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Quarentena {path} ilegível ({e}). Recriando do zero.")
+
+    def contains(self, key: str, source: Path) -> bool:
+        """Indica se o arquivo está em quarentena (entradas de arquivos alterados são liberadas)."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        stat = source.stat()
+        if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return True
+        del self.entries[key]
+        logger.info(f"Liberado da quarentena (arquivo alterado): {key}")
+        return False
+
+    def add(self, key: str, source: Path, reason: str, seconds: float):
+        """Coloca um arquivo em quarentena."""
+        stat = source.stat()
+        self.entries[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "reason": reason,
+            "seconds": round(seconds, 1),
+            "quarantined_at": datetime.now().isoformat(timespec="seconds")
+        }
+        logger.warning(f"Quarentena: {key} ({reason} após {seconds:.0f}s)")
+
+    def save(self):
+        """Grava a lista de quarentena de forma atômica."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,232 @@
+"""
+Extração nativa de DOCX para Markdown.
+Lê o OOXML (word/document.xml) em streaming, sem passar pelo Docling, preservando
+títulos, parágrafos, listas e tabelas simples.
+"""
+
+import re
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import xml.etree.ElementTree as ET
+from loguru import logger
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# Elementos que o extrator não sabe representar fielmente: delegar ao Docling
+COMPLEX_TAGS = {"txbxContent", "oMath", "oMathPara", "object", "vMerge"}
+
+# Elementos cujo texto não pertence ao conteúdo visível: revisões excluídas ou movidas
+# (controle de alterações) e códigos de campo; a subárvore inteira é ignorada
+SKIPPED_TEXT_TAGS = {"del", "moveFrom", "delText", "instrText", "delInstrText"}
+
+HEADING_NAME_PATTERN = re.compile(r'^(?:heading|t[ií]tulo)\s*(\d)$', re.IGNORECASE)
+
+
+class ComplexDocumentError(Exception):
+    """Documento com estrutura que exige o pipeline completo do Docling."""
+
+
+def _local(tag: str) -> str:
+    """Remove o namespace de uma tag XML."""
+    return tag.rsplit("}", 1)[-1]
+
+
+class DocxExtractor:
+    """Conversor DOCX -> Markdown que lê o OOXML diretamente."""
+
+    def convert(self, file_path: Union[str, Path]) -> str:
+        """
+        Converte um arquivo DOCX para Markdown.
+
+        Args:
+            file_path: Caminho do arquivo .docx
+
+        Returns:
+            Conteúdo em Markdown
+
+        Raises:
+            ComplexDocumentError: Se o documento tiver tabelas aninhadas, células
+                mescladas verticalmente, caixas de texto, fórmulas ou objetos OLE
+        """
+        with zipfile.ZipFile(file_path) as archive:
+            heading_levels = self._load_heading_levels(archive)
+            with archive.open("word/document.xml") as document:
+                blocks = list(self._iter_blocks(document, heading_levels))
+
+        return "\n\n".join(blocks) + "\n"
+
+    def _load_heading_levels(self, archive: zipfile.ZipFile) -> Dict[str, int]:
+        """Mapeia styleId -> nível de título a partir de word/styles.xml."""
+        try:
+            root = ET.fromstring(archive.read("word/styles.xml"))
+        except KeyError:
+            return {}
+
+        names = {}
+        outline = {}
+        based_on = {}
+        for style in root.iter(f"{W_NS}style"):
+            if style.get(f"{W_NS}type") != "paragraph":
+                continue
+            style_id = style.get(f"{W_NS}styleId")
+            name = style.find(f"{W_NS}name")
+            names[style_id] = (name.get(f"{W_NS}val") if name is not None else "").strip()
+            parent = style.find(f"{W_NS}basedOn")
+            if parent is not None:
+                based_on[style_id] = parent.get(f"{W_NS}val")
+            level = style.find(f"{W_NS}pPr/{W_NS}outlineLvl")
+            if level is not None:
+                outline[style_id] = int(level.get(f"{W_NS}val", "9"))
+
+        levels = {}
+        for style_id, name in names.items():
+            match = HEADING_NAME_PATTERN.match(name)
+            if match:
+                levels[style_id] = int(match.group(1))
+                continue
+            if name.lower() in ("title", "título", "titulo"):
+                levels[style_id] = 1
+                continue
+            # Nível de estrutura herdado pela cadeia basedOn
+            current, seen = style_id, set()
+            while current and current not in seen:
+                seen.add(current)
+                if current in outline:
+                    if outline[current] < 9:
+                        levels[style_id] = outline[current] + 1
+                    break
+                current = based_on.get(current)
+
+        return levels
+
+    def _iter_blocks(self, document, heading_levels: Dict[str, int]):
+        """Percorre document.xml em streaming e gera blocos Markdown de nível superior."""
+        stack: List[ET.Element] = []
+
+        for event, elem in ET.iterparse(document, events=("start", "end")):
+            tag = _local(elem.tag)
+
+            if event == "start":
+                if tag in COMPLEX_TAGS:
+                    raise ComplexDocumentError(f"elemento <w:{tag}> não suportado")
+                if tag == "tbl" and any(_local(e.tag) == "tbl" for e in stack):
+                    raise ComplexDocumentError("tabela aninhada")
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            inside_table = any(_local(e.tag) == "tbl" for e in stack)
+
+            if tag == "p" and not inside_table:
+                block = self._render_paragraph(elem, heading_levels)
+            elif tag == "tbl" and not inside_table:
+                block = self._render_table(elem)
+            else:
+                continue
+
+            if block:
+                yield block
+
+            # Libera a memória do bloco já emitido
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+
+    def _paragraph_text(self, paragraph: ET.Element) -> str:
+        """Extrai o texto visível de um parágrafo."""
+        parts = []
+        pending = [paragraph]
+        while pending:
+            node = pending.pop()
+            tag = _local(node.tag)
+            if tag in SKIPPED_TEXT_TAGS:
+                continue
+            # Pré-ordem, como Element.iter(), mas sem descer nas subárvores ignoradas
+            pending.extend(reversed(node))
+            if tag == "t" and node.text:
+                parts.append(node.text)
+            elif tag == "tab":
+                parts.append(" ")
+            elif tag in ("br", "cr"):
+                parts.append("\n")
+            elif tag == "noBreakHyphen":
+                parts.append("-")
+            elif tag in ("drawing", "pict"):
+                parts.append("\n<!-- image -->\n")
+        text = "".join(parts)
+        # Normaliza espaços dentro de cada linha
+        lines = [re.sub(r'[ \t]+', ' ', line).strip() for line in text.split("\n")]
+        return "\n".join(line for line in lines if line)
+
+    def _render_paragraph(self, paragraph: ET.Element, heading_levels: Dict[str, int]) -> Optional[str]:
+        """Renderiza um parágrafo como título, item de lista ou texto corrido."""
+        text = self._paragraph_text(paragraph)
+        if not text:
+            return None
+
+        ppr = paragraph.find(f"{W_NS}pPr")
+        level = None
+        is_list_item = False
+        if ppr is not None:
+            style = ppr.find(f"{W_NS}pStyle")
+            if style is not None:
+                level = heading_levels.get(style.get(f"{W_NS}val"))
+            outline = ppr.find(f"{W_NS}outlineLvl")
+            if outline is not None and int(outline.get(f"{W_NS}val", "9")) < 9:
+                level = int(outline.get(f"{W_NS}val")) + 1
+            is_list_item = ppr.find(f"{W_NS}numPr") is not None
+
+        if level and "<!-- image -->" not in text:
+            return f"{'#' * min(level, 6)} {text.replace(chr(10), ' ')}"
+        if is_list_item:
+            return f"- {text}"
+        return text
+
+    def _render_table(self, table: ET.Element) -> Optional[str]:
+        """Renderiza uma tabela simples (sem mesclagem vertical) em Markdown."""
+        rows = []
+        for tr in table.iter(f"{W_NS}tr"):
+            row = []
+            for tc in tr.findall(f"{W_NS}tc"):
+                text = " ".join(
+                    self._paragraph_text(p).replace("\n", " ")
+                    for p in tc.iter(f"{W_NS}p")
+                ).strip()
+                text = text.replace("|", "\\|")
+                span = tc.find(f"{W_NS}tcPr/{W_NS}gridSpan")
+                # Mesclagem horizontal: repete o conteúdo nas colunas cobertas
+                row.extend([text] * (int(span.get(f"{W_NS}val", "1")) if span is not None else 1))
+            if any(row):
+                rows.append(row)
+
+        if not rows:
+            return None
+
+        width = max(len(r) for r in rows)
+        rows = [r + [""] * (width - len(r)) for r in rows]
+        lines = ["| " + " | ".join(rows[0]) + " |", "|" + "---|" * width]
+        lines.extend("| " + " | ".join(r) + " |" for r in rows[1:])
+        return "\n".join(lines)
+
+
+# Instância compartilhada para uso na função auxiliar
+_default_extractor = DocxExtractor()
+
+
+def docx_to_markdown(file_path: Union[str, Path]) -> str:
+    """Atalho para converter um DOCX em Markdown."""
+    return _default_extractor.convert(file_path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        logger.error("Uso: python docx_extractor.py <arquivo.docx>")
+        sys.exit(1)
+
+    try:
+        print(docx_to_markdown(sys.argv[1]))
+    except ComplexDocumentError as e:
+        logger.warning(f"Documento complexo, use o Docling: {e}")
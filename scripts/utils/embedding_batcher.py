@@ -0,0 +1,171 @@
+"""
+Fila global de embeddings para o passo 2.
+Acumula chunks de vários documentos, ordena por tamanho em tokens e codifica em
+lotes cheios: leis pequenas deixam de gerar lotes de 2-5 textos e cada lote reúne
+textos de comprimento parecido, reduzindo o padding no sentence-transformers.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+
+class EmbeddingBatcher:
+    """Acumula textos entre documentos e devolve os embeddings na ordem de submissão."""
+
+    def __init__(
+        self,
+        generator,
+        on_ready: Callable[[List[Tuple[Any, Optional[np.ndarray]]]], None],
+        batch_size: int = 32,
+        max_pending: int = 1024
+    ):
+        """
+        Inicializa a fila.
+
+        Args:
+            generator: EmbeddingGenerator (ou objeto com generate_embeddings_batch)
+            on_ready: Recebe [(item, embedding)] de um documento (chave), na ordem de
+                      submissão, a cada descarga (embedding: linha float32 da matriz
+                      do gerador, sem cópia)
+            batch_size: Textos por lote do modelo (o mesmo batch_size do gerador)
+            max_pending: Textos acumulados que disparam a descarga
+        """
+        self.generator = generator
+        self.on_ready = on_ready
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(self.batch_size, max_pending)
+        self._items: List[Tuple[Any, Optional[str], int, Any]] = []
+        self._texts = 0
+        self._callbacks: Dict[Any, Callable[[], Any]] = {}
+        # Documentos cujo embedding ou gravação falhou: {chave: exceção}
+        self.failed: Dict[Any, Exception] = {}
+
+        # Estatísticas: tokens reais vs tokens processados com padding
+        self.batches = 0
+        self.encoded = 0
+        self.tokens = 0
+        self.padded_tokens = 0
+
+    def submit(self, item: Any, text: Optional[str] = None, tokens: int = 0, key: Any = None):
+        """
+        Enfileira um item; descarrega a fila quando max_pending textos acumulam.
+
+        Args:
+            item: Carga devolvida em on_ready (ex: registro do chunk)
+            text: Texto a embedar; None para itens sem embedding (ex: aliases),
+                  que apenas preservam a ordem em relação aos demais
+            tokens: Tamanho do texto em tokens (chave de ordenação dos lotes)
+            key: Documento do item (ex: source_path); falhas são isoladas e
+                 registradas por chave
+        """
+        self._items.append((item, text, tokens, key))
+        if text is not None:
+            self._texts += 1
+            if self._texts >= self.max_pending:
+                self.flush()
+
+    def on_saved(self, key: Any, callback: Callable[[], Any]):
+        """
+        Executa `callback` quando todos os itens já enfileirados de `key` forem gravados
+        (imediatamente se não houver nenhum pendente). Não é executado se algum item
+        do documento falhar.
+        """
+        if key in self.failed:
+            return
+        if any(item_key == key for _, _, _, item_key in self._items):
+            self._callbacks[key] = callback
+        else:
+            self._run_callback(key, callback)
+
+    def _run_callback(self, key: Any, callback: Callable[[], Any]):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Erro ao finalizar {key}: {e}")
+
+    def _encode(self, items: List[Tuple[Any, Optional[str], int, Any]], indexes: List[int]) -> Dict[int, np.ndarray]:
+        """Embeddings dos itens com texto em `indexes`, em lotes ordenados por tamanho."""
+        order = sorted((i for i in indexes if items[i][1] is not None), key=lambda i: items[i][2])
+        if not order:
+            return {}
+        # Uma chamada com os textos já ordenados: o gerador os divide em lotes de
+        # batch_size (ou os distribui entre os processos do pool de encoding)
+        vectors = self.generator.generate_embeddings_batch(
+            [items[i][1] for i in order], show_progress=False
+        )
+        if len(vectors) != len(order):
+            raise RuntimeError(f"Esperados {len(order)} embeddings, recebidos {len(vectors)}")
+
+        for start in range(0, len(order), self.batch_size):
+            lengths = [items[i][2] for i in order[start:start + self.batch_size]]
+            self.batches += 1
+            self.encoded += len(lengths)
+            self.tokens += sum(lengths)
+            self.padded_tokens += max(lengths) * len(lengths)
+        return dict(zip(order, vectors))
+
+    def flush(self):
+        """
+        Codifica os textos pendentes e entrega os resultados documento a documento.
+
+        Uma falha afeta só o documento (chave) em que ocorreu: se o lote conjunto
+        falhar, cada documento é codificado separadamente; erros de on_ready ficam
+        restritos ao documento entregue. A fila só é esvaziada depois das entregas.
+        """
+        items = self._items
+        if not items:
+            return
+
+        groups: Dict[Any, List[int]] = {}
+        for i, (_, _, _, key) in enumerate(items):
+            groups.setdefault(key, []).append(i)
+
+        failed: Dict[Any, Exception] = {}
+        try:
+            embeddings = self._encode(items, list(range(len(items))))
+        except Exception as e:
+            if len(groups) == 1:
+                failed[items[0][3]] = e
+                embeddings = {}
+            else:
+                # Isola o documento problemático sem perder os demais
+                embeddings = {}
+                for key, indexes in groups.items():
+                    try:
+                        embeddings.update(self._encode(items, indexes))
+                    except Exception as group_error:
+                        failed[key] = group_error
+
+        for key, indexes in groups.items():
+            if key in failed:
+                continue
+            try:
+                self.on_ready([(items[i][0], embeddings.get(i)) for i in indexes])
+            except Exception as e:
+                failed[key] = e
+
+        self._items, self._texts = [], 0
+        for key in groups:
+            callback = self._callbacks.pop(key, None)
+            if key in failed:
+                self.failed[key] = failed[key]
+                logger.error(f"Erro ao gerar/salvar embeddings de {key}: {failed[key]}")
+            elif callback is not None and key not in self.failed:
+                self._run_callback(key, callback)
+
+    def __len__(self) -> int:
+        """Itens aguardando descarga."""
+        return len(self._items)
+
+    def log_summary(self):
+        """Registra lotes, textos, aproveitamento do padding e documentos com falha."""
+        if self.failed:
+            logger.warning(f"Fila de embeddings: {len(self.failed)} documentos com falha (não gravados)")
+        if not self.batches:
+            return
+        efficiency = self.tokens / self.padded_tokens if self.padded_tokens else 1.0
+        logger.info(
+            f"Fila de embeddings: {self.encoded} textos em {self.batches} lotes "
+            f"(média {self.encoded / self.batches:.1f}/lote, {efficiency:.0%} de tokens úteis no padding)"
+        )
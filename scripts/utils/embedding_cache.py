@@ -0,0 +1,254 @@
+"""
+Cache persistente de embeddings em disco.
+Índice SQLite (hash do texto -> slot, último uso) e vetores float32 num arquivo
+mapeado em memória, um diretório por modelo. Reexecuções, re-chunking e consultas
+do dashboard reaproveitam vetores já calculados; o tamanho é limitado com despejo LRU.
+"""
+
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from loguru import logger
+
+# Crescimento mínimo dos arquivos de vetores (em slots)
+MIN_GROWTH_SLOTS = 1024
+
+# Variáveis por consulta no SQLite (limite conservador para versões antigas)
+SQLITE_MAX_VARIABLES = 900
+
+
+def text_key(text: str) -> bytes:
+    """Chave do texto no cache (sha256 do UTF-8)."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+def _slot_tag(key: bytes) -> int:
+    """Etiqueta gravada junto ao vetor (nunca 0, que marca slot em escrita)."""
+    return int.from_bytes(key[:8], "little") | 1
+
+def _model_dirname(model_name: str, dimension: int) -> str:
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name).strip("_") or "model"
+    return f"{slug}-{dimension}"
+
+
+class EmbeddingCache:
+    """Cache de embeddings de um modelo: SQLite + memmap float32 com despejo LRU."""
+
+    def __init__(
+        self,
+        directory: Path,
+        model_name: str,
+        dimension: int,
+        max_mb: int = 1024
+    ):
+        """
+        Abre (ou cria) o cache do modelo.
+
+        Args:
+            directory: Diretório raiz do cache (um subdiretório por modelo e dimensão)
+            model_name: Nome do modelo (parte da chave do cache)
+            dimension: Dimensão dos embeddings
+            max_mb: Tamanho máximo dos vetores em disco; além disso, os menos usados são despejados
+        """
+        self.model_name = model_name
+        self.dimension = dimension
+        self.max_entries = max(1, (max_mb << 20) // (dimension * 4))
+        self.path = Path(directory) / _model_dirname(model_name, dimension)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path / "index.sqlite3", timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute("pragma synchronous=normal")
+        self._conn.execute(
+            "create table if not exists entries ("
+            "key blob primary key, slot integer not null unique, last_used integer not null)"
+        )
+        self._conn.execute("create index if not exists entries_last_used_idx on entries (last_used)")
+        self._conn.execute("create table if not exists meta (name text primary key, value text)")
+        self._conn.execute("insert or ignore into meta values ('model_name', ?)", (model_name,))
+
+        self._vectors_path = self.path / "vectors.f32"
+        self._tags_path = self.path / "tags.u64"
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._tags: Optional[np.memmap] = None
+        self._remap()
+
+    # =========================================================================
+    # ARQUIVOS MAPEADOS
+    # =========================================================================
+
+    def _remap(self):
+        """Mapeia os arquivos de vetores e etiquetas no tamanho atual em disco."""
+        for file_path in (self._vectors_path, self._tags_path):
+            file_path.touch(exist_ok=True)
+        capacity = min(
+            self._vectors_path.stat().st_size // (self.dimension * 4),
+            self._tags_path.stat().st_size // 8
+        )
+        self._capacity = capacity
+        if capacity:
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                                      shape=(capacity, self.dimension))
+            self._tags = np.memmap(self._tags_path, dtype=np.uint64, mode="r+", shape=(capacity,))
+        else:
+            self._vectors = self._tags = None
+
+    def _ensure_capacity(self, slots: int):
+        """Aumenta os arquivos (crescimento geométrico) para comportar `slots` slots."""
+        if slots <= self._capacity:
+            return
+        self._remap()
+        if slots <= self._capacity:
+            return
+        capacity = max(slots, min(self.max_entries, 2 * self._capacity), MIN_GROWTH_SLOTS)
+        for file_path, item_size in ((self._vectors_path, self.dimension * 4), (self._tags_path, 8)):
+            with open(file_path, "r+b") as f:
+                f.truncate(capacity * item_size)
+        self._remap()
+
+    # =========================================================================
+    # CONSULTA E GRAVAÇÃO
+    # =========================================================================
+
+    def _select(self, keys: Sequence[bytes]) -> Dict[bytes, int]:
+        """Slots das chaves presentes no índice."""
+        slots = {}
+        for start in range(0, len(keys), SQLITE_MAX_VARIABLES):
+            part = keys[start:start + SQLITE_MAX_VARIABLES]
+            rows = self._conn.execute(
+                f"select key, slot from entries where key in ({','.join('?' * len(part))})", part
+            ).fetchall()
+            slots.update(rows)
+        return slots
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Busca os embeddings dos textos.
+
+        Returns:
+            Lista alinhada a `texts`: vetor float32 (cópia) ou None quando ausente
+        """
+        keys = [text_key(t) for t in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        with self._lock:
+            slots = self._select(list(set(keys)))
+            if slots:
+                if max(slots.values()) >= self._capacity:
+                    self._remap()
+                found = [(i, slots[k]) for i, k in enumerate(keys) if k in slots and slots[k] < self._capacity]
+                if found:
+                    positions = np.fromiter((slot for _, slot in found), dtype=np.int64, count=len(found))
+                    expected = np.fromiter((_slot_tag(keys[i]) for i, _ in found), dtype=np.uint64,
+                                           count=len(found))
+                    # Etiqueta lida antes e depois da cópia: um slot reaproveitado por outro
+                    # processo durante a leitura vira falta em vez de vetor trocado
+                    before = self._tags[positions]
+                    vectors = np.array(self._vectors[positions])
+                    after = self._tags[positions]
+                    valid = (before == expected) & (after == expected)
+                    for (i, _), vector, ok in zip(found, vectors, valid):
+                        if ok:
+                            results[i] = vector
+
+                    used = {keys[i] for (i, _), ok in zip(found, valid) if ok}
+                    if used:
+                        now = time.time_ns()
+                        with self._conn:
+                            self._conn.execute("begin")
+                            self._conn.executemany(
+                                "update entries set last_used = ? where key = ?", [(now, k) for k in used]
+                            )
+
+        hits = sum(1 for r in results if r is not None)
+        self.hits += hits
+        self.misses += len(texts) - hits
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Grava embeddings no cache, despejando os menos usados se o limite for atingido."""
+        pending: Dict[bytes, Sequence[float]] = {}
+        for text, vector in zip(texts, vectors):
+            pending[text_key(text)] = vector
+        if not pending:
+            return
+
+        with self._lock:
+            self._conn.execute("begin immediate")
+            try:
+                for key in self._select(list(pending)):
+                    del pending[key]
+                if not pending:
+                    self._conn.execute("commit")
+                    return
+
+                # Lote maior que o cache: só os últimos max_entries cabem
+                keys = list(pending)[-self.max_entries:]
+                count, next_slot = self._conn.execute(
+                    "select count(*), coalesce(max(slot) + 1, 0) from entries"
+                ).fetchone()
+
+                # Slots livres: novos até o limite; depois, os dos menos usados (LRU)
+                evict = max(0, count + len(keys) - self.max_entries)
+                slots: List[int] = []
+                if evict:
+                    rows = self._conn.execute(
+                        "select key, slot from entries order by last_used limit ?", (evict,)
+                    ).fetchall()
+                    self._conn.executemany("delete from entries where key = ?", [(k,) for k, _ in rows])
+                    slots.extend(slot for _, slot in rows)
+                slots.extend(range(next_slot, next_slot + len(keys) - len(slots)))
+                slots = slots[:len(keys)]
+                self._ensure_capacity(max(slots) + 1)
+
+                positions = np.asarray(slots, dtype=np.int64)
+                # Invalida a etiqueta antes de sobrescrever o vetor (ver get_many)
+                self._tags[positions] = 0
+                self._vectors[positions] = np.asarray([pending[k] for k in keys], dtype=np.float32)
+                self._tags[positions] = np.fromiter((_slot_tag(k) for k in keys), dtype=np.uint64,
+                                                    count=len(keys))
+                self._vectors.flush()
+                self._tags.flush()
+
+                now = time.time_ns()
+                self._conn.executemany(
+                    "insert into entries (key, slot, last_used) values (?, ?, ?)",
+                    [(k, slot, now) for k, slot in zip(keys, slots)]
+                )
+                self._conn.execute("commit")
+            except BaseException:
+                self._conn.execute("rollback")
+                raise
+
+        if evict:
+            logger.debug(f"Cache de embeddings: {len(rows)} entradas despejadas (LRU)")
+
+    # =========================================================================
+    # UTILITÁRIOS
+    # =========================================================================
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("select count(*) from entries").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Acertos e faltas desde a abertura e entradas em disco."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self), "max_entries": self.max_entries}
+
+    def close(self):
+        """Grava os vetores pendentes e fecha o índice."""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._tags.flush()
+            self._vectors = self._tags = None
+            self._conn.close()
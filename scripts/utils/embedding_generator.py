@@ -1,14 +1,22 @@
 """
 Geração de embeddings para chunks e exemplos.
-Suporta modelos locais (sentence-transformers) e APIs externas (OpenAI).
+Suporta modelos locais (sentence-transformers ou ONNX Runtime), APIs externas (OpenAI)
+e o servidor local de embeddings (embedding_server.py), que carrega o modelo uma única vez.
 """
 
-from typing import List, Union, Optional
-import time
+from typing import Any, Dict, List, Union, Optional
+from pathlib import Path
 import hashlib
 import numpy as np
 from loguru import logger
 
+from .embedding_cache import EmbeddingCache
+from .onnx_encoder import OnnxEncoder
+from .encoder_pool import EncoderPool
+from .openai_async import AsyncEmbeddingClient
+from .embedding_service import EmbeddingServiceClient
+from .similarity_index import SimilarityIndex
+
 # Imports condicionais
 try:
     from sentence_transformers import SentenceTransformer
@@ -32,7 +40,18 @@ class EmbeddingGenerator:
         self,
         model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
         api_key: Optional[str] = None,
-        batch_size: int = 32
+        batch_size: int = 32,
+        cache_dir: Optional[Path] = None,
+        cache_max_mb: int = 1024,
+        backend: str = "sentence-transformers",
+        onnx_dir: Optional[Path] = None,
+        onnx_quantized: bool = True,
+        pool_workers: int = 0,
+        api_base_url: Optional[str] = None,
+        api_concurrency: int = 8,
+        api_requests_per_minute: int = 3000,
+        api_tokens_per_minute: int = 1_000_000,
+        server_url: Optional[str] = None
     ):
         """
         Inicializa o gerador de embeddings.
@@ -41,18 +60,61 @@ class EmbeddingGenerator:
             model_name: Nome do modelo (ex: "sentence-transformers/all-MiniLM-L6-v2" ou "openai/text-embedding-3-small")
             api_key: API key para modelos externos (OpenAI)
             batch_size: Tamanho do batch para processamento
+            cache_dir: Diretório do cache persistente de embeddings (None desativa)
+            cache_max_mb: Tamanho máximo do cache em disco para este modelo
+            backend: Backend local: "sentence-transformers" (torch) ou "onnx" (ONNX Runtime em CPU);
+                     modelos "openai/..." usam sempre a API
+            onnx_dir: Diretório do modelo exportado (obrigatório com backend onnx)
+            onnx_quantized: Backend onnx com pesos int8 em vez de fp32
+            pool_workers: Processos de encoding em CPU para chamadas grandes (0 ou 1 desativa)
+            api_base_url: URL da API OpenAI (None usa a padrão; ex: servidor local de testes)
+            api_concurrency: Requisições simultâneas em voo nos lotes da API
+            api_requests_per_minute: Orçamento de requisições por minuto da API
+            api_tokens_per_minute: Orçamento de tokens por minuto da API
+            server_url: Servidor de embeddings (ex: "http://127.0.0.1:8765"); se estiver no ar
+                        servindo o mesmo modelo, nenhum modelo é carregado neste processo
         """
         self.model_name = model_name
         self.batch_size = batch_size
         self.model = None
         self.backend = None
+        # Chave do modelo no cache: saídas ONNX (int8) não se misturam às do torch
+        self.cache_name = model_name
 
         # Detectar backend
-        if model_name.startswith("openai/"):
-            self._init_openai(api_key)
+        if server_url and self._init_server(server_url):
+            # O servidor tem o próprio cache; o pool e o cache locais não se aplicam
+            cache_dir = None
+        elif model_name.startswith("openai/"):
+            self._init_openai(api_key, api_base_url)
+            self.async_client = AsyncEmbeddingClient(
+                api_key, model_name.replace("openai/", ""), base_url=api_base_url,
+                batch_size=min(batch_size, 100), concurrency=api_concurrency,
+                requests_per_minute=api_requests_per_minute, tokens_per_minute=api_tokens_per_minute
+            )
+        elif backend == "onnx":
+            if not onnx_dir:
+                raise ValueError("onnx_dir não informado para o backend onnx")
+            self._init_onnx(Path(onnx_dir), onnx_quantized)
         else:
             self._init_sentence_transformers(model_name)
 
+        # Pool de processos (modelos locais): iniciado na primeira chamada grande
+        self.pool: Optional[EncoderPool] = None
+        if pool_workers > 1 and self.backend in ("sentence-transformers", "onnx"):
+            self.pool = EncoderPool({
+                "backend": self.backend,
+                "model_name": self._local_model_name,
+                "batch_size": batch_size,
+                "onnx_dir": onnx_dir,
+                "onnx_quantized": onnx_quantized
+            }, pool_workers)
+
+        self.cache: Optional[EmbeddingCache] = None
+        if cache_dir:
+            self.cache = EmbeddingCache(cache_dir, self.cache_name, self.dimension, cache_max_mb)
+            logger.info(f"✓ Cache de embeddings: {self.cache.path} ({len(self.cache)} entradas)")
+
     def _init_sentence_transformers(self, model_name: str):
         """Inicializa modelo local sentence-transformers."""
         if not HAS_SENTENCE_TRANSFORMERS:
@@ -66,12 +128,45 @@ class EmbeddingGenerator:
             model_name = model_name.replace("sentence-transformers/", "")
 
         logger.info(f"Carregando modelo local: {model_name}")
+        self._local_model_name = model_name
         self.model = SentenceTransformer(model_name)
         self.backend = "sentence-transformers"
         self.dimension = self.model.get_sentence_embedding_dimension()
         logger.info(f"✓ Modelo carregado (dimensão: {self.dimension})")
 
-    def _init_openai(self, api_key: Optional[str]):
+    def _init_onnx(self, model_dir: Path, quantized: bool):
+        """Inicializa o modelo exportado para ONNX Runtime (CPU)."""
+        logger.info(f"Carregando modelo ONNX: {model_dir} ({'int8' if quantized else 'fp32'})")
+        self.model = OnnxEncoder(model_dir, quantized=quantized)
+        self._local_model_name = self.model_name
+        self.backend = "onnx"
+        self.dimension = self.model.dimension
+        self.cache_name = f"{self.model_name}@onnx-{self.model.variant}"
+        logger.info(f"✓ Modelo ONNX carregado (dimensão: {self.dimension})")
+
+    def _init_server(self, server_url: str) -> bool:
+        """Conecta ao servidor de embeddings; False se fora do ar ou com outro modelo."""
+        client = EmbeddingServiceClient(server_url)
+        try:
+            info = client.health()
+        except RuntimeError as e:
+            logger.warning(f"{e}; carregando o modelo neste processo")
+            return False
+        if info["model"] != self.model_name:
+            logger.warning(
+                f"Servidor de embeddings serve {info['model']}, não {self.model_name}; "
+                "carregando o modelo neste processo"
+            )
+            return False
+
+        self.model = client
+        self.backend = "server"
+        self.dimension = info["dimension"]
+        self.cache_name = info["cache_name"]
+        logger.info(f"✓ Embeddings via servidor {server_url} ({info['backend']}, dimensão: {self.dimension})")
+        return True
+
+    def _init_openai(self, api_key: Optional[str], base_url: Optional[str] = None):
         """Inicializa cliente OpenAI."""
         if not HAS_OPENAI:
             raise ImportError(
@@ -82,7 +177,7 @@ class EmbeddingGenerator:
         if not api_key:
             raise ValueError("API key da OpenAI não fornecida")
 
-        self.model = OpenAI(api_key=api_key)
+        self.model = OpenAI(api_key=api_key, base_url=base_url)
         self.backend = "openai"
 
         # Determinar dimensão baseado no modelo
@@ -110,10 +205,28 @@ class EmbeddingGenerator:
         if not text or not text.strip():
             raise ValueError("Texto vazio fornecido para embedding")
 
+        if self.cache is not None:
+            cached = self.cache.get_many([text])[0]
+            if cached is not None:
+                return cached.tolist()
+            embedding = self._encode_single(text)
+            self.cache.put_many([text], [embedding])
+            return embedding
+
+        return self._encode_single(text)
+
+    def _encode_single(self, text: str) -> List[float]:
+        """Gera o embedding de um texto no backend (sem cache)."""
         if self.backend == "sentence-transformers":
             embedding = self.model.encode(text, convert_to_numpy=True)
             return embedding.tolist()
 
+        elif self.backend == "onnx":
+            return self.model.encode([text])[0].tolist()
+
+        elif self.backend == "server":
+            return self.model.embed([text])[0].tolist()
+
         elif self.backend == "openai":
             try:
                 model_id = self.model_name.replace("openai/", "")
@@ -133,7 +246,7 @@ class EmbeddingGenerator:
         self,
         texts: List[str],
         show_progress: bool = True
-    ) -> List[List[float]]:
+    ) -> np.ndarray:
         """
         Gera embeddings para múltiplos textos.
 
@@ -142,14 +255,46 @@ class EmbeddingGenerator:
             show_progress: Se True, mostra progresso
 
         Returns:
-            Lista de embeddings
+            Matriz float32 (n_textos, dimensão) na ordem de `texts`; as linhas vão
+            direto para o banco (SupabaseDB formata a partir do buffer)
         """
         if not texts:
-            return []
+            return np.empty((0, self.dimension), dtype=np.float32)
 
         # Filtrar textos vazios
         valid_texts = [t if t and t.strip() else " " for t in texts]
 
+        if self.cache is None:
+            return self._encode_batch(valid_texts, show_progress)
+
+        # Só textos ausentes do cache (e sem repetição) vão para o modelo/API
+        cached = self.cache.get_many(valid_texts)
+        missing = list(dict.fromkeys(t for t, v in zip(valid_texts, cached) if v is None))
+        if len(missing) == len(valid_texts):
+            computed = self._encode_batch(missing, show_progress)
+            self.cache.put_many(missing, computed)
+            return computed
+
+        embeddings = np.empty((len(valid_texts), self.cache.dimension), dtype=np.float32)
+        if missing:
+            computed = self._encode_batch(missing, show_progress)
+            self.cache.put_many(missing, computed)
+            row = {t: i for i, t in enumerate(missing)}
+        for i, (text, vector) in enumerate(zip(valid_texts, cached)):
+            embeddings[i] = computed[row[text]] if vector is None else vector
+        return embeddings
+
+    def _encode_batch(self, valid_texts: List[str], show_progress: bool) -> np.ndarray:
+        """Gera embeddings no backend (sem cache), como matriz float32."""
+        # Chamadas grandes (ao menos um lote por processo) vão para o pool
+        if self.pool is not None and len(valid_texts) >= self.pool.num_workers * self.batch_size:
+            try:
+                return self.pool.encode(valid_texts, self.batch_size)
+            except RuntimeError as e:
+                logger.warning(f"Pool de encoding indisponível ({e}); codificando no processo principal")
+                self.pool.close()
+                self.pool = None
+
         if self.backend == "sentence-transformers":
             embeddings = self.model.encode(
                 valid_texts,
@@ -157,44 +302,18 @@ class EmbeddingGenerator:
                 show_progress_bar=show_progress,
                 convert_to_numpy=True
             )
-            return embeddings.tolist()
-
-        elif self.backend == "openai":
-            embeddings = []
-            model_id = self.model_name.replace("openai/", "")
-
-            # Processar em batches (OpenAI limita a 2048 textos por request)
-            openai_batch_size = min(self.batch_size, 100)
-
-            for i in range(0, len(valid_texts), openai_batch_size):
-                batch = valid_texts[i:i + openai_batch_size]
-
-                # Retry logic
-                max_retries = 3
-                for attempt in range(max_retries):
-                    try:
-                        response = self.model.embeddings.create(
-                            model=model_id,
-                            input=batch
-                        )
-                        batch_embeddings = [item.embedding for item in response.data]
-                        embeddings.extend(batch_embeddings)
+            return np.asarray(embeddings, dtype=np.float32)
 
-                        if show_progress:
-                            logger.info(f"Processados {min(i + openai_batch_size, len(valid_texts))}/{len(valid_texts)}")
+        elif self.backend == "onnx":
+            return self.model.encode(valid_texts, batch_size=self.batch_size)
 
-                        break # Success
-
-                    except Exception as e:
-                        if attempt == max_retries - 1:
-                            logger.error(f"Erro no batch {i} após {max_retries} tentativas: {e}")
-                            raise RuntimeError(f"Falha ao gerar embeddings após retries: {e}") from e
-
-                        wait_time = (2 ** attempt) + (np.random.random() * 0.5)
-                        logger.warning(f"Erro no batch (tentativa {attempt+1}/{max_retries}): {e}. Aguardando {wait_time:.2f}s")
-                        time.sleep(wait_time)
+        elif self.backend == "openai":
+            # Lotes de até 100 textos, várias requisições em voo sob os limites de RPM/TPM
+            return self.async_client.embed(valid_texts, show_progress)
 
-            return embeddings
+        elif self.backend == "server":
+            # O servidor reúne esta chamada às de outros processos em micro-lotes
+            return self.model.embed(valid_texts)
 
         else:
             raise ValueError(f"Backend desconhecido: {self.backend}")
@@ -235,6 +354,9 @@ class EmbeddingGenerator:
         """
         Encontra os k embeddings mais similares.
 
+        Para várias consultas sobre os mesmos candidatos, crie um SimilarityIndex
+        uma vez (candidatos normalizados uma única vez, consultas em lote).
+
         Args:
             query_embedding: Embedding de consulta
             candidate_embeddings: Lista de embeddings candidatos
@@ -243,25 +365,16 @@ class EmbeddingGenerator:
         Returns:
             Lista de tuplas (índice, similaridade)
         """
-        query = np.array(query_embedding)
-        candidates = np.array(candidate_embeddings)
-
-        # Normalizar todos de uma vez
-        query_norm = query / (np.linalg.norm(query) + 1e-10)
-        candidates_norm = candidates / (np.linalg.norm(candidates, axis=1, keepdims=True) + 1e-10)
-
-        # Calcular todas as similaridades de uma vez
-        similarities = np.dot(candidates_norm, query_norm)
-
-        # Pegar top-k índices
-        # Se houver menos candidatos que top_k, pegar todos
-        k = min(top_k, len(similarities))
-        if k == 0:
+        if len(candidate_embeddings) == 0:
             return []
 
-        top_indices = np.argsort(similarities)[::-1][:k]
+        indices, scores = SimilarityIndex(candidate_embeddings).search(query_embedding, k=top_k)
+        return [(int(idx), float(score)) for idx, score in zip(indices[0], scores[0])]
 
-        return [(int(idx), float(similarities[idx])) for idx in top_indices]
+    def close(self):
+        """Encerra o pool de encoding (reiniciado sob demanda se o gerador voltar a ser usado)."""
+        if self.pool is not None:
+            self.pool.close()
 
     def get_dimension(self) -> int:
         """Retorna a dimensão dos embeddings."""
@@ -276,26 +389,62 @@ class EmbeddingGenerator:
 _generator_cache = {}
 
 
+def _config_options() -> Dict[str, Any]:
+    """Opções do gerador definidas em config.py (config.yaml e variáveis de ambiente)."""
+    # Nos scripts o módulo é `config`; no dashboard e na API, `scripts.config`
+    if __name__.startswith("scripts."):
+        from scripts import config
+    else:
+        import config
+    return {
+        "model_name": config.EMBEDDING_MODEL,
+        "api_key": config.OPENAI_API_KEY,
+        "batch_size": config.EMBEDDING_BATCH_SIZE,
+        "cache_dir": config.EMBEDDING_CACHE_DIR,
+        "cache_max_mb": config.EMBEDDING_CACHE_MAX_MB,
+        "backend": config.EMBEDDING_BACKEND,
+        "onnx_dir": config.EMBEDDING_ONNX_DIR,
+        "onnx_quantized": config.EMBEDDING_ONNX_QUANTIZED,
+        "pool_workers": config.EMBEDDING_POOL_WORKERS,
+        "api_base_url": config.EMBEDDING_API_BASE_URL,
+        "api_concurrency": config.EMBEDDING_API_CONCURRENCY,
+        "api_requests_per_minute": config.EMBEDDING_API_RPM,
+        "api_tokens_per_minute": config.EMBEDDING_API_TPM,
+        "server_url": config.EMBEDDING_SERVER_URL
+    }
+
+
 def get_embedding_generator(
-    model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
-    api_key: Optional[str] = None
+    model_name: Optional[str] = None,
+    api_key: Optional[str] = None,
+    **overrides: Any
 ) -> EmbeddingGenerator:
     """
-    Retorna um gerador de embeddings (cached).
+    Retorna um gerador de embeddings (cached) configurado por config.py.
 
     Args:
-        model_name: Nome do modelo
-        api_key: API key (se necessário)
+        model_name: Nome do modelo (None usa EMBEDDING_MODEL)
+        api_key: API key (None usa OPENAI_API_KEY)
+        **overrides: Substitui outras opções de config.py, com os nomes dos
+            argumentos de EmbeddingGenerator (ex: server_url=None)
 
     Returns:
         Instância de EmbeddingGenerator
     """
+    options = _config_options()
+    if model_name is not None:
+        options["model_name"] = model_name
+    if api_key is not None:
+        options["api_key"] = api_key
+    options.update(overrides)
+
     # Usar hash da API key para evitar vazamento
+    api_key = options["api_key"]
     api_key_hash = hashlib.sha256(api_key.encode()).hexdigest() if api_key else "none"
-    cache_key = f"{model_name}_{api_key_hash}"
+    cache_key = repr(sorted({**options, "api_key": api_key_hash}.items()))
 
     if cache_key not in _generator_cache:
-        _generator_cache[cache_key] = EmbeddingGenerator(model_name, api_key)
+        _generator_cache[cache_key] = EmbeddingGenerator(**options)
 
     return _generator_cache[cache_key]
 
@@ -0,0 +1,249 @@
+"""
+Serviço local de embeddings (HTTP em localhost).
+Um processo de longa duração (embedding_server.py) carrega o modelo uma única vez e
+atende passos do pipeline, dashboard e API. Requisições concorrentes são agrupadas em
+micro-lotes: enquanto o modelo codifica um lote, as que chegam esperam na fila e
+seguem juntas no próximo. Os vetores trafegam como float32 binário (sem JSON).
+
+Protocolo:
+    GET  /health -> JSON {model, cache_name, backend, dimension, requests, texts, batches}
+    POST /embed  <- JSON {"texts": [...]}
+                 -> float32 little-endian (n, dimensão), cabeçalho X-Embedding-Shape: "n,dimensão"
+"""
+
+import json
+import time
+import queue
+import random
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import Future
+from email.message import Message
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+SHAPE_HEADER = "X-Embedding-Shape"
+# Conexões aguardando accept(): o padrão do socketserver (5) reseta clientes concorrentes
+LISTEN_BACKLOG = 1024
+
+
+class MicroBatcher:
+    """Fila de requisições codificadas em lotes por uma única thread."""
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        max_batch: int = 256,
+        max_wait_ms: float = 2.0
+    ):
+        """
+        Inicializa a fila e a thread de encoding.
+
+        Args:
+            encode: Recebe textos e devolve a matriz float32 (n, dimensão)
+            max_batch: Textos reunidos por lote (uma requisição maior segue sozinha)
+            max_wait_ms: Espera por mais requisições depois da primeira de um lote
+        """
+        self.encode = encode
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """Enfileira textos; o Future resolve com as linhas correspondentes."""
+        future: Future = Future()
+        if not texts:
+            future.set_result(np.empty((0, 0), dtype=np.float32))
+        else:
+            self._queue.put((texts, future))
+        return future
+
+    def _collect(self, first: Tuple[List[str], Future]) -> Tuple[List[Tuple[List[str], Future]], bool]:
+        """Reúne requisições até max_batch textos ou o fim da espera."""
+        pending = [first]
+        count = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while count < self.max_batch:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                return pending, True
+            pending.append(item)
+            count += len(item[0])
+        return pending, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                return
+            pending, stop = self._collect(first)
+            texts = [text for request_texts, _ in pending for text in request_texts]
+            try:
+                matrix = self.encode(texts)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            self.requests += len(pending)
+            self.texts += len(texts)
+            self.batches += 1
+            start = 0
+            for request_texts, future in pending:
+                future.set_result(matrix[start:start + len(request_texts)])
+                start += len(request_texts)
+
+    def close(self):
+        """Atende as requisições já enfileiradas e encerra a thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+class EmbeddingHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer com fila de conexões longa (muitos clientes simultâneos)."""
+
+    request_queue_size = LISTEN_BACKLOG
+    daemon_threads = True
+
+
+def create_server(generator, host: str = "127.0.0.1", port: int = 8765,
+                  max_batch: int = 256, max_wait_ms: float = 2.0) -> EmbeddingHTTPServer:
+    """
+    Servidor HTTP sobre um EmbeddingGenerator já carregado.
+
+    Args:
+        generator: EmbeddingGenerator (usado só pela thread do MicroBatcher)
+        host: Interface (sem autenticação: mantenha em localhost)
+        port: Porta (0 escolhe uma livre)
+        max_batch: Textos por micro-lote
+        max_wait_ms: Espera máxima por requisições concorrentes
+
+    Returns:
+        Servidor pronto para serve_forever (o batcher fica em server.batcher)
+    """
+    batcher = MicroBatcher(
+        lambda texts: generator.generate_embeddings_batch(texts, show_progress=False),
+        max_batch=max_batch, max_wait_ms=max_wait_ms
+    )
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: bytes, content_type: str, headers: Optional[dict] = None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, payload: dict):
+            self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json")
+
+        def do_GET(self):
+            if self.path != "/health":
+                self._send_json(404, {"error": "rota inexistente"})
+                return
+            self._send_json(200, {
+                "model": generator.model_name,
+                "cache_name": generator.cache_name,
+                "backend": generator.backend,
+                "dimension": generator.dimension,
+                "requests": batcher.requests,
+                "texts": batcher.texts,
+                "batches": batcher.batches
+            })
+
+        def do_POST(self):
+            if self.path != "/embed":
+                self._send_json(404, {"error": "rota inexistente"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                texts = json.loads(self.rfile.read(length))["texts"]
+                if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                    raise ValueError("'texts' deve ser uma lista de strings")
+            except (KeyError, TypeError, ValueError) as e:
+                self._send_json(400, {"error": f"requisição inválida: {e}"})
+                return
+            try:
+                matrix = np.ascontiguousarray(batcher.submit(texts).result(), dtype="<f4")
+            except Exception as e:
+                logger.error(f"Erro ao gerar embeddings no servidor: {e}")
+                self._send_json(500, {"error": str(e)})
+                return
+            self._send(200, matrix.tobytes(), "application/octet-stream",
+                       {SHAPE_HEADER: "%d,%d" % matrix.shape})
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    server = EmbeddingHTTPServer((host, port), Handler)
+    server.batcher = batcher
+    return server
+
+
+class EmbeddingServiceClient:
+    """Cliente do servidor de embeddings (backend "server" do EmbeddingGenerator)."""
+
+    def __init__(self, url: str, timeout: float = 300, max_retries: int = 4):
+        """
+        Args:
+            url: Endereço do servidor (ex: "http://127.0.0.1:8765")
+            timeout: Tempo máximo por requisição, em segundos (lotes grandes em CPU)
+            max_retries: Novas tentativas em erros de conexão (recusa, reset), com recuo exponencial
+        """
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+
+    def _request(self, path: str, data: Optional[bytes] = None) -> Tuple[Message, bytes]:
+        """Envia a requisição e lê a resposta inteira (cabeçalhos, corpo)."""
+        request = urllib.request.Request(
+            self.url + path, data=data,
+            headers={"Content-Type": "application/json"} if data is not None else {}
+        )
+        for attempt in range(self.max_retries + 1):
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return response.headers, response.read()
+            except urllib.error.HTTPError as e:
+                try:
+                    detail = json.loads(e.read()).get("error", e.reason)
+                except ValueError:
+                    detail = e.reason
+                raise RuntimeError(f"Servidor de embeddings respondeu {e.code}: {detail}") from e
+            except (urllib.error.URLError, OSError) as e:
+                reason = getattr(e, "reason", e)
+                # Só erros de conexão são repetidos; timeout de um lote longo não
+                if attempt < self.max_retries and isinstance(reason, ConnectionError):
+                    delay = 0.05 * 2 ** attempt * (1 + random.random())
+                    logger.debug(f"Servidor de embeddings: {reason}; nova tentativa em {delay:.2f}s")
+                    time.sleep(delay)
+                    continue
+                raise RuntimeError(f"Servidor de embeddings indisponível em {self.url}: {e}") from e
+
+    def health(self) -> dict:
+        """Modelo, dimensão e estatísticas do servidor."""
+        _, body = self._request("/health")
+        return json.loads(body)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embeddings dos textos como matriz float32 (n, dimensão), na ordem de entrada."""
+        body = json.dumps({"texts": texts}, ensure_ascii=False).encode("utf-8")
+        headers, payload = self._request("/embed", body)
+        rows, dimension = (int(v) for v in headers[SHAPE_HEADER].split(","))
+        return np.frombuffer(payload, dtype="<f4").reshape(rows, dimension).astype(np.float32)
@@ -0,0 +1,193 @@
+"""
+Pool de processos de encoding de embeddings em CPU.
+Cada processo carrega o modelo uma vez e fica preso a uma fatia dos núcleos
+(afinidade + threads do torch/ONNX Runtime); chamadas grandes são divididas em
+lotes ordenados por tamanho e distribuídas entre os processos.
+"""
+
+import os
+import atexit
+import queue
+import itertools
+import multiprocessing
+from typing import Any, Callable, Dict, List
+import numpy as np
+from loguru import logger
+
+
+def cpu_shares(num_workers: int) -> List[List[int]]:
+    """Divide os núcleos disponíveis em até `num_workers` fatias contíguas."""
+    if hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    count = max(1, min(num_workers, len(cores)))
+    size, extra = divmod(len(cores), count)
+    shares, start = [], 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        shares.append(cores[start:end])
+        start = end
+    return shares
+
+def _load_encoder(spec: Dict[str, Any], threads: int) -> Callable[[List[str]], Any]:
+    """Carrega o modelo do backend no processo worker."""
+    if spec["backend"] == "onnx":
+        from .onnx_encoder import OnnxEncoder
+        encoder = OnnxEncoder(spec["onnx_dir"], quantized=spec["onnx_quantized"], num_threads=threads)
+        return lambda texts: encoder.encode(texts, batch_size=spec["batch_size"])
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+    torch.set_num_threads(threads)
+    model = SentenceTransformer(spec["model_name"], device="cpu")
+    return lambda texts: model.encode(
+        texts, batch_size=spec["batch_size"], show_progress_bar=False, convert_to_numpy=True
+    )
+
+def _encoder_main(spec: Dict[str, Any], cores: List[int], tasks, results):
+    """Laço do processo worker: carrega o modelo e codifica lotes até receber None."""
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    try:
+        encode = _load_encoder(spec, max(1, len(cores)))
+    except Exception as e:
+        results.put((None, "error", f"{type(e).__name__}: {e}"))
+        return
+    results.put((None, "ready", None))
+
+    while True:
+        item = tasks.get()
+        if item is None:
+            break
+        task_id, texts = item
+        try:
+            results.put((task_id, "ok", np.asarray(encode(texts), dtype=np.float32)))
+        except Exception as e:
+            results.put((task_id, "error", f"{type(e).__name__}: {e}"))
+
+
+class EncoderPool:
+    """Processos de encoding persistentes, iniciados sob demanda."""
+
+    def __init__(
+        self,
+        spec: Dict[str, Any],
+        num_workers: int,
+        start_method: str = "spawn",
+        start_timeout: float = 600.0,
+        poll_interval: float = 1.0
+    ):
+        """
+        Inicializa o pool (os processos só sobem na primeira chamada de `encode`).
+
+        Args:
+            spec: Backend e modelo a carregar em cada processo (backend, model_name,
+                  batch_size e, para onnx, onnx_dir/onnx_quantized)
+            num_workers: Número de processos (limitado ao número de núcleos)
+            start_method: Método de início do multiprocessing
+            start_timeout: Tempo máximo para os processos carregarem o modelo
+            poll_interval: Intervalo de checagem de processos mortos em segundos
+        """
+        self.spec = spec
+        self.num_workers = max(1, num_workers)
+        self.ctx = multiprocessing.get_context(start_method)
+        self.start_timeout = start_timeout
+        self.poll_interval = poll_interval
+        self._task_ids = itertools.count()
+        self._workers: List[Dict[str, Any]] = []
+        self._results = None
+
+    def start(self):
+        """Sobe os processos e aguarda cada um carregar o modelo."""
+        if self._workers:
+            return
+        shares = cpu_shares(self.num_workers)
+        self._results = self.ctx.Queue()
+        for cores in shares:
+            tasks = self.ctx.Queue()
+            process = self.ctx.Process(
+                target=_encoder_main, args=(self.spec, cores, tasks, self._results), daemon=True
+            )
+            process.start()
+            self._workers.append({"process": process, "tasks": tasks, "cores": cores})
+        atexit.register(self.close)
+
+        ready = 0
+        while ready < len(self._workers):
+            try:
+                _, status, value = self._results.get(timeout=self.start_timeout)
+            except queue.Empty:
+                status, value = "error", f"modelo não carregado em {self.start_timeout:.0f}s"
+            if status != "ready":
+                self.close()
+                raise RuntimeError(f"Falha ao iniciar o pool de encoding: {value}")
+            ready += 1
+        logger.info(
+            f"✓ Pool de encoding: {len(self._workers)} processos "
+            f"({', '.join(str(len(w['cores'])) for w in self._workers)} núcleos cada)"
+        )
+
+    def encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """
+        Codifica os textos distribuindo lotes entre os processos.
+
+        Os textos são ordenados por tamanho e agrupados em lotes de `batch_size`,
+        atribuídos aos processos em rodízio (cargas equilibradas, pouco padding).
+
+        Returns:
+            Matriz float32 (n_textos, dimensão) na ordem original
+
+        Raises:
+            RuntimeError: Processo morto ou erro no encoding; o pool é encerrado (e reiniciado
+                          na próxima chamada) e o chamador pode codificar localmente
+        """
+        self.start()
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        shards: List[List[int]] = [[] for _ in self._workers]
+        for k, start in enumerate(range(0, len(order), max(1, batch_size))):
+            shards[k % len(shards)].extend(order[start:start + batch_size])
+
+        pending: Dict[int, List[int]] = {}
+        for worker, shard in zip(self._workers, shards):
+            if shard:
+                task_id = next(self._task_ids)
+                pending[task_id] = shard
+                worker["tasks"].put((task_id, [texts[i] for i in shard]))
+
+        embeddings = None
+        while pending:
+            try:
+                task_id, status, value = self._results.get(timeout=self.poll_interval)
+            except queue.Empty:
+                dead = [w["process"].pid for w in self._workers if not w["process"].is_alive()]
+                if dead:
+                    self.close()
+                    raise RuntimeError(f"Processos de encoding finalizados: {dead}")
+                continue
+            # Resultados de chamadas anteriores interrompidas são descartados
+            shard = pending.pop(task_id, None)
+            if shard is None:
+                continue
+            if status != "ok":
+                # Os demais lotes em andamento são abandonados junto com os processos
+                self.close()
+                raise RuntimeError(f"Erro no encoding: {value}")
+            if embeddings is None:
+                embeddings = np.empty((len(texts), value.shape[1]), dtype=np.float32)
+            embeddings[shard] = value
+        return embeddings
+
+    def close(self, timeout: float = 10.0):
+        """Encerra os processos de forma ordenada (ou à força, se não responderem)."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            if worker["process"].is_alive():
+                worker["tasks"].put(None)
+        for worker in workers:
+            worker["process"].join(timeout)
+            if worker["process"].is_alive():
+                worker["process"].kill()
+                worker["process"].join()
+        if workers:
+            atexit.unregister(self.close)
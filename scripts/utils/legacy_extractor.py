@@ -0,0 +1,295 @@
+"""
+Extração em processo de formatos legados (RTF e Word 97-2003 .doc) para Markdown.
+Substitui a chamada ao `textutil` (exclusivo do macOS) e o Docling, que não lê .doc,
+sem subprocessos nem arquivos temporários.
+"""
+
+import re
+import struct
+from pathlib import Path
+from typing import Dict, List, Union
+from loguru import logger
+
+# Imports condicionais
+try:
+    from striprtf.striprtf import rtf_to_text
+    HAS_STRIPRTF = True
+except ImportError:
+    HAS_STRIPRTF = False
+
+
+class LegacyFormatError(Exception):
+    """Arquivo legado que o extrator não consegue ler (criptografado, Word 6/95, corrompido)."""
+
+
+def _text_to_markdown(title: str, text: str) -> str:
+    """Monta o Markdown: título do arquivo seguido de um parágrafo por linha não vazia."""
+    paragraphs = [re.sub(r'[ \t]+', ' ', line).strip() for line in text.splitlines()]
+    body = "\n\n".join(p for p in paragraphs if p)
+    return f"# {title}\n\n{body}\n"
+
+
+# =============================================================================
+# RTF
+# =============================================================================
+
+# \binN: N bytes brutos logo após a palavra de controle (imagens, objetos OLE)
+RTF_BINARY_RUN = re.compile(rb"(?<!\\)\\bin(\d+) ?")
+
+
+def _strip_binary_runs(data: bytes) -> bytes:
+    """Remove as sequências \\binN + N bytes (o striprtf só as trata dentro de \\pict)."""
+    parts = []
+    pos = 0
+    for match in RTF_BINARY_RUN.finditer(data):
+        if match.start() < pos:
+            # Ocorrência dentro de dados binários já descartados
+            continue
+        parts.append(data[pos:match.start()])
+        pos = match.end() + int(match.group(1))
+    if not parts:
+        return data
+    parts.append(data[pos:])
+    return b"".join(parts)
+
+
+class RtfExtractor:
+    """Conversor RTF -> Markdown (texto visível via striprtf, em processo)."""
+
+    def convert(self, file_path: Union[str, Path]) -> str:
+        """Converte um arquivo RTF para Markdown."""
+        file_path = Path(file_path)
+        return _text_to_markdown(file_path.stem, self.extract_text(file_path))
+
+    def extract_text(self, file_path: Union[str, Path]) -> str:
+        """
+        Extrai o texto visível de um arquivo RTF, incluindo o resultado dos
+        campos (\\fldrslt: remissões a leis, numeração de incisos e parágrafos).
+        """
+        if not HAS_STRIPRTF:
+            raise ImportError(
+                "striprtf não instalado. "
+                "Instale com: pip install striprtf"
+            )
+        with open(file_path, "rb") as f:
+            data = _strip_binary_runs(f.read())
+        # latin-1 mapeia cada byte em um caractere; os \\'hh seguem o \\ansicpg do documento
+        return rtf_to_text(data.decode("latin-1"), errors="replace")
+
+
+# =============================================================================
+# WORD 97-2003 (.doc)
+# =============================================================================
+
+CFB_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+CFB_END_OF_CHAIN = 0xFFFFFFFE
+CFB_FREE_SECTOR = 0xFFFFFFFF
+
+# Caracteres especiais do texto do Word
+DOC_FIELD_BEGIN = "\x13"
+DOC_FIELD_SEPARATOR = "\x14"
+DOC_FIELD_END = "\x15"
+DOC_CHAR_MAP = str.maketrans({
+    "\r": "\n",       # fim de parágrafo
+    "\x07": "\n",     # fim de célula/linha de tabela
+    "\x0b": "\n",     # quebra de linha
+    "\x0c": "\n",     # quebra de página/seção
+    "\x1e": "-",      # hífen não separável
+    "\x1f": None,     # hífen opcional
+    "\x01": None,     # âncora de imagem
+    "\x08": None,     # objeto desenhado
+    "\x05": None,     # marca de comentário
+    "\x02": None,     # marca de nota de rodapé
+})
+
+
+class CompoundFile:
+    """Leitor mínimo de arquivos OLE2 / Compound File Binary (somente leitura)."""
+
+    def __init__(self, data: bytes):
+        if data[:8] != CFB_SIGNATURE:
+            raise LegacyFormatError("não é um arquivo OLE2")
+
+        self.data = data
+        self.sector_size = 1 << struct.unpack_from("<H", data, 0x1E)[0]
+        self.mini_sector_size = 1 << struct.unpack_from("<H", data, 0x20)[0]
+        first_dir, = struct.unpack_from("<I", data, 0x30)
+        self.mini_cutoff, first_minifat = struct.unpack_from("<II", data, 0x38)
+        first_difat, num_difat = struct.unpack_from("<II", data, 0x44)
+
+        # FAT: setores listados no DIFAT do cabeçalho e na cadeia DIFAT
+        fat_sectors = [s for s in struct.unpack_from("<109I", data, 0x4C) if s < CFB_END_OF_CHAIN - 4]
+        per_sector = self.sector_size // 4
+        sector = first_difat
+        for _ in range(num_difat):
+            if sector >= CFB_END_OF_CHAIN - 4:
+                break
+            entries = struct.unpack_from(f"<{per_sector}I", data, self._offset(sector))
+            fat_sectors.extend(s for s in entries[:-1] if s < CFB_END_OF_CHAIN - 4)
+            sector = entries[-1]
+        self.fat: List[int] = []
+        for s in fat_sectors:
+            self.fat.extend(struct.unpack_from(f"<{per_sector}I", data, self._offset(s)))
+
+        self.entries = self._read_directory(self._read_chain(first_dir))
+        root = self.entries.get("Root Entry")
+        self.mini_stream = self._read_chain(root["start"])[:root["size"]] if root else b""
+        self.minifat = []
+        if first_minifat < CFB_END_OF_CHAIN - 4:
+            raw = self._read_chain(first_minifat)
+            self.minifat = list(struct.unpack_from(f"<{len(raw) // 4}I", raw))
+
+    def _offset(self, sector: int) -> int:
+        return (sector + 1) * self.sector_size
+
+    def _chain(self, start: int, table: List[int]) -> List[int]:
+        chain, sector = [], start
+        while sector < len(table) and sector not in (CFB_END_OF_CHAIN, CFB_FREE_SECTOR):
+            chain.append(sector)
+            if len(chain) > len(table):
+                raise LegacyFormatError("cadeia de setores cíclica")
+            sector = table[sector]
+        return chain
+
+    def _read_chain(self, start: int) -> bytes:
+        return b"".join(
+            self.data[self._offset(s):self._offset(s) + self.sector_size]
+            for s in self._chain(start, self.fat)
+        )
+
+    def _read_directory(self, raw: bytes) -> Dict[str, Dict[str, int]]:
+        entries = {}
+        for pos in range(0, len(raw) - 127, 128):
+            name_len, = struct.unpack_from("<H", raw, pos + 64)
+            if name_len < 2:
+                continue
+            name = raw[pos:pos + name_len - 2].decode("utf-16-le", errors="replace")
+            start, size = struct.unpack_from("<IQ", raw, pos + 116)
+            entries[name] = {"type": raw[pos + 66], "start": start, "size": size & 0xFFFFFFFF}
+        return entries
+
+    def read_stream(self, name: str) -> bytes:
+        """Lê um stream do diretório raiz pelo nome."""
+        entry = self.entries.get(name)
+        if entry is None:
+            raise LegacyFormatError(f"stream {name} ausente")
+        if entry["size"] < self.mini_cutoff:
+            size = self.mini_sector_size
+            raw = b"".join(
+                self.mini_stream[s * size:(s + 1) * size]
+                for s in self._chain(entry["start"], self.minifat)
+            )
+        else:
+            raw = self._read_chain(entry["start"])
+        return raw[:entry["size"]]
+
+
+class DocExtractor:
+    """Conversor Word 97-2003 (.doc) -> Markdown via tabela de peças (piece table)."""
+
+    def convert(self, file_path: Union[str, Path]) -> str:
+        """Converte um arquivo .doc para Markdown."""
+        file_path = Path(file_path)
+        return _text_to_markdown(file_path.stem, self.extract_text(file_path))
+
+    def extract_text(self, file_path: Union[str, Path]) -> str:
+        """
+        Extrai o texto do documento principal.
+
+        Raises:
+            LegacyFormatError: Se o arquivo não for Word 97+ legível
+        """
+        with open(file_path, "rb") as f:
+            cfb = CompoundFile(f.read())
+
+        word = cfb.read_stream("WordDocument")
+        if len(word) < 0x1AA:
+            raise LegacyFormatError("FIB truncado")
+        ident, nfib = struct.unpack_from("<HH", word, 0)
+        flags, = struct.unpack_from("<H", word, 0x0A)
+        if ident != 0xA5EC or nfib < 0x00C1:
+            raise LegacyFormatError(f"formato Word não suportado (nFib={nfib:#x})")
+        if flags & 0x0100:
+            raise LegacyFormatError("documento criptografado")
+
+        table = cfb.read_stream("1Table" if flags & 0x0200 else "0Table")
+        ccp_text, = struct.unpack_from("<I", word, 0x4C)
+        fc_clx, lcb_clx = struct.unpack_from("<II", word, 0x1A2)
+        text = self._read_pieces(word, table[fc_clx:fc_clx + lcb_clx], ccp_text)
+        return self._strip_fields(text).translate(DOC_CHAR_MAP)
+
+    def _read_pieces(self, word: bytes, clx: bytes, ccp_text: int) -> str:
+        """Reconstrói o texto a partir da estrutura Clx (Prc* seguido de Pcdt)."""
+        pos = 0
+        while pos < len(clx) and clx[pos] == 0x01:
+            cb, = struct.unpack_from("<h", clx, pos + 1)
+            pos += 3 + cb
+        if pos >= len(clx) or clx[pos] != 0x02:
+            raise LegacyFormatError("tabela de peças ausente")
+        lcb, = struct.unpack_from("<I", clx, pos + 1)
+        plc = clx[pos + 5:pos + 5 + lcb]
+        count = (lcb - 4) // 12
+        cps = struct.unpack_from(f"<{count + 1}I", plc)
+
+        parts = []
+        for i in range(count):
+            cp_start, cp_end = cps[i], min(cps[i + 1], ccp_text)
+            if cp_start >= cp_end:
+                continue
+            fc_raw, = struct.unpack_from("<I", plc, 4 * (count + 1) + 8 * i + 2)
+            length = cp_end - cp_start
+            if fc_raw & 0x40000000:
+                # Peça compactada: 1 byte por caractere (cp1252) a partir de fc/2
+                fc = (fc_raw & 0x3FFFFFFF) // 2
+                parts.append(word[fc:fc + length].decode("cp1252", errors="replace"))
+            else:
+                fc = fc_raw & 0x3FFFFFFF
+                parts.append(word[fc:fc + 2 * length].decode("utf-16-le", errors="replace"))
+        return "".join(parts)
+
+    def _strip_fields(self, text: str) -> str:
+        """Remove códigos de campo (\\x13 código \\x14 resultado \\x15), mantendo o resultado."""
+        if DOC_FIELD_BEGIN not in text:
+            return text
+        out = []
+        # Pilha de campos abertos: True enquanto estiver na parte de código
+        fields: List[bool] = []
+        for char in text:
+            if char == DOC_FIELD_BEGIN:
+                fields.append(True)
+            elif char == DOC_FIELD_SEPARATOR and fields:
+                fields[-1] = False
+            elif char == DOC_FIELD_END and fields:
+                fields.pop()
+            elif not any(fields):
+                out.append(char)
+        return "".join(out)
+
+
+# Instâncias compartilhadas para uso nas funções auxiliares
+_default_rtf_extractor = RtfExtractor()
+_default_doc_extractor = DocExtractor()
+
+
+def rtf_to_markdown(file_path: Union[str, Path]) -> str:
+    """Atalho para converter um RTF em Markdown."""
+    return _default_rtf_extractor.convert(file_path)
+
+
+def doc_to_markdown(file_path: Union[str, Path]) -> str:
+    """Atalho para converter um .doc em Markdown."""
+    return _default_doc_extractor.convert(file_path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        logger.error("Uso: python legacy_extractor.py <arquivo.rtf|arquivo.doc>")
+        sys.exit(1)
+
+    path = Path(sys.argv[1])
+    try:
+        print(rtf_to_markdown(path) if path.suffix.lower() == ".rtf" else doc_to_markdown(path))
+    except LegacyFormatError as e:
+        logger.error(f"Não foi possível extrair {path}: {e}")
@@ -0,0 +1,163 @@
+"""
+Classificação de área do direito por palavras-chave em passagem única.
+Um autômato Aho-Corasick sobre palavras soma os pesos de todas as áreas de uma vez:
+o tempo depende do tamanho do texto, não do número de palavras-chave da taxonomia.
+Texto e palavras-chave são comparados sem maiúsculas nem acentos ("LICITACAO" casa "licitação").
+"""
+
+import re
+import unicodedata
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Palavras (Unicode): casamentos respeitam fronteiras de palavra ("pena" não casa "penal")
+WORD_PATTERN = re.compile(r"\w+")
+# Marcas diacríticas combinantes que sobram da decomposição NFD
+COMBINING_MARKS = re.compile(r"[\u0300-\u036f]")
+
+# Taxonomia padrão, usada quando config.yaml não define legal_areas
+DEFAULT_LEGAL_AREAS: Dict[str, Any] = {
+    "Direito Administrativo": [
+        "administrativo", "servidor público", "licitação", "contrato administrativo",
+        "ato administrativo", "processo administrativo", "poder público"
+    ],
+    "Direito Constitucional": [
+        "constitucional", "constituição", "direito fundamental", "estado democrático",
+        "princípio constitucional", "controle de constitucionalidade"
+    ],
+    "Direito Penal": [
+        "penal", "crime", "pena", "delito", "infração penal", "reclusão", "detenção"
+    ],
+    "Direito Civil": [
+        "civil", "contrato", "obrigação", "propriedade", "sucessão", "família"
+    ],
+    "Direito Tributário": [
+        "tributário", "tributo", "imposto", "taxa", "contribuição", "fiscal"
+    ],
+    "Direito do Trabalho": [
+        "trabalho", "trabalhador", "empregado", "empregador", "CLT", "jornada"
+    ]
+}
+
+
+def normalize_taxonomy(taxonomy: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """
+    Normaliza a taxonomia para {área: {palavra-chave: peso}}.
+
+    Cada área aceita uma lista de palavras-chave (peso 1) ou um mapeamento
+    palavra-chave -> peso. Entradas inválidas são ignoradas.
+    """
+    normalized = {}
+    for area, keywords in (taxonomy or {}).items():
+        if isinstance(keywords, dict):
+            items = keywords.items()
+        elif isinstance(keywords, (list, tuple)):
+            items = ((keyword, 1.0) for keyword in keywords)
+        else:
+            continue
+        weights = {}
+        for keyword, weight in items:
+            try:
+                weights[str(keyword)] = float(weight)
+            except (TypeError, ValueError):
+                continue
+        if weights:
+            normalized[str(area)] = weights
+    return normalized
+
+
+def fold(text: str) -> str:
+    """Minúsculas sem acentos, para casar palavras-chave com grafias variantes."""
+    return COMBINING_MARKS.sub("", unicodedata.normalize("NFD", text.lower()))
+
+
+def _iter_words(blocks: Iterable[str]) -> Iterator[List[str]]:
+    """Palavras normalizadas de cada bloco; a palavra no fim de um bloco segue para o próximo."""
+    carry = ""
+    for block in blocks:
+        block = fold(block)
+        words = WORD_PATTERN.findall(carry + block)
+        carry = words.pop() if words and WORD_PATTERN.match(block[-1:]) else ""
+        yield words
+    if carry:
+        yield [carry]
+
+
+class LegalAreaClassifier:
+    """Autômato Aho-Corasick sobre palavras com pesos por área."""
+
+    def __init__(self, taxonomy: Optional[Dict[str, Any]] = None):
+        """
+        Compila a taxonomia no autômato.
+
+        Args:
+            taxonomy: {área: [palavras-chave]} ou {área: {palavra-chave: peso}}
+                      (default: DEFAULT_LEGAL_AREAS)
+        """
+        self.taxonomy = normalize_taxonomy(taxonomy or DEFAULT_LEGAL_AREAS)
+        self.areas: List[str] = list(self.taxonomy)
+        # Estado 0 é a raiz; goto[estado][palavra] -> estado
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, float]]] = [[]]
+        self._build()
+
+    def _build(self):
+        for area_index, area in enumerate(self.areas):
+            for keyword, weight in self.taxonomy[area].items():
+                words = WORD_PATTERN.findall(fold(keyword))
+                if not words:
+                    continue
+                state = 0
+                for word in words:
+                    next_state = self._goto[state].get(word)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto[state][word] = next_state
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._output.append([])
+                    state = next_state
+                self._output[state].append((area_index, weight))
+
+        # Links de falha em largura; saídas herdam as do sufixo mais longo
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for word, child in self._goto[state].items():
+                pending.append(child)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(word, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def score(self, text: Union[str, Iterable[str]]) -> Dict[str, float]:
+        """
+        Soma os pesos das ocorrências de palavras-chave, por área, em uma passagem.
+
+        Args:
+            text: Texto, ou iterável de blocos de texto (ex: arquivo lido em partes);
+                  palavras partidas entre blocos são reunidas
+
+        Returns:
+            {área: pontuação} apenas para áreas com ao menos uma ocorrência
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        totals = [0.0] * len(self.areas)
+        state = 0
+        for words in _iter_words([text] if isinstance(text, str) else text):
+            for word in words:
+                while state and word not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(word, 0)
+                for area_index, weight in output[state]:
+                    totals[area_index] += weight
+        return {area: total for area, total in zip(self.areas, totals) if total > 0}
+
+    def classify(self, text: Union[str, Iterable[str]]) -> Optional[str]:
+        """Área de maior pontuação, ou None sem nenhuma ocorrência."""
+        scores = self.score(text)
+        if scores:
+            return max(scores, key=scores.get)
+        return None
@@ -0,0 +1,149 @@
+"""
+Lexer de estrutura de textos legais em passagem única.
+Reconhece artigos, parágrafos, incisos e alíneas no início de linha (ou após
+pontuação) e monta a árvore artigo > caput/§ > inciso > alínea com offsets de caracteres.
+"""
+
+import re
+from typing import Any, Dict, Iterator, Optional
+
+# Decoração Markdown que pode anteceder um dispositivo (títulos, listas, citações, tabelas, ênfase).
+# Consumida de forma atômica (lookahead + backreference, compatível com Python 3.10): sem isso,
+# células de tabela com centenas de espaços após "." geram backtracking quadrático.
+_LEAD = r"(?=(?P<lead>[ \t>#*_|\-]*))(?P=lead)"
+
+# Um único padrão com alternativas ancoradas: cada posição do texto é examinada uma vez.
+# A letra do artigo vem colada ao hífen ("Art. 1º-A"); em "Art. 1º - A visita" é o caput.
+TOKEN_PATTERN = re.compile(
+    r"(?:^|(?<=[.:;])(?=[ \t]))" + _LEAD + r"(?:"
+    r"(?P<artigo>Art(?:igo)?\.?[ \t]*(?P<art_num>\d+(?:\.\d{3})*)[ \t]*(?P<art_ord>[º°o](?![a-zà-ú]))?"
+    r"(?:[ \t]*[-–](?P<art_letter>[A-Z])(?![a-zà-ú]))?)(?=[ \t.\-–—]|$)"
+    r"|(?P<paragrafo>§[ \t]*(?P<par_num>\d+)[ \t]*(?P<par_ord>[º°o](?![a-zà-ú]))?|Par[áa]grafo[ \t]+[úu]nico)"
+    r"|(?P<inciso>(?P<inc_num>[IVXLC]+)[ \t]*[-–—])"
+    r"|(?P<alinea>(?P<ali_letter>[a-z])\))"
+    r"|(?P<divisao>(?:LIVRO|PARTE|T[ÍI]TULO|CAP[ÍI]TULO|SE[ÇC][ÃA]O|SUBSE[ÇC][ÃA]O)\b)"
+    r")",
+    re.MULTILINE
+)
+
+# Nível hierárquico de cada tipo de nó (caput e § dividem o nível 2)
+LEVELS = {"documento": 0, "artigo": 1, "caput": 2, "paragrafo": 2, "inciso": 3, "alinea": 4}
+
+
+def _node(kind: str, ref: Optional[str], start: int, content_start: int) -> Dict[str, Any]:
+    return {"type": kind, "ref": ref, "start": start, "end": start, "content_start": content_start,
+            "text": "", "children": []}
+
+def _token_ref(kind: str, match: re.Match) -> str:
+    """Referência normalizada do dispositivo (ex: "Art. 5º-A", "§ 1º", "Parágrafo único", "IV", "a)").
+
+    O indicador ordinal vira sempre "º" ("Art. 1o" e "Art. 1°" -> "Art. 1º").
+    """
+    if kind == "artigo":
+        ref = f"Art. {match.group('art_num')}{'º' if match.group('art_ord') else ''}"
+        if match.group("art_letter"):
+            ref += f"-{match.group('art_letter')}"
+        return ref
+    if kind == "paragrafo":
+        if match.group("par_num"):
+            return f"§ {match.group('par_num')}{'º' if match.group('par_ord') else ''}"
+        return "Parágrafo único"
+    if kind == "inciso":
+        return match.group("inc_num")
+    return f"{match.group('ali_letter')})"
+
+
+class LegalStructureLexer:
+    """Lexer de dispositivos legais com árvore hierárquica e offsets."""
+
+    def tokenize(self, text: str) -> Iterator[Dict[str, Any]]:
+        """
+        Gera os marcadores de dispositivos na ordem do texto.
+
+        Yields:
+            Dicionários com tipo, referência, offset do marcador e offset do conteúdo
+        """
+        for match in TOKEN_PATTERN.finditer(text):
+            # Grupos externos fecham por último: lastgroup é o tipo do dispositivo
+            kind = match.lastgroup
+            start = match.start(kind)
+            yield {
+                "type": kind,
+                "ref": None if kind == "divisao" else _token_ref(kind, match),
+                "start": start,
+                "content_start": match.end(kind)
+            }
+
+    def parse(self, text: str) -> Dict[str, Any]:
+        """
+        Monta a árvore de dispositivos em tempo linear.
+
+        Incisos ficam sob o caput ou o § aberto; alíneas sob o inciso aberto.
+        Títulos de divisão (LIVRO, TÍTULO, CAPÍTULO, SEÇÃO...) encerram o artigo corrente.
+
+        Returns:
+            Nó "documento" cujos filhos são artigos. Cada nó tem type, ref, start,
+            end (offsets em `text`), text (texto próprio, sem os filhos) e children.
+        """
+        root = _node("documento", None, 0, 0)
+        stack = [root]
+
+        def close_to(level: int, offset: int):
+            while len(stack) > 1 and LEVELS[stack[-1]["type"]] >= level:
+                stack.pop()["end"] = offset
+
+        for token in self.tokenize(text):
+            kind, start = token["type"], token["start"]
+            if kind == "divisao":
+                close_to(1, start)
+                continue
+
+            level = LEVELS[kind]
+            close_to(level, start)
+            node = _node(kind, token["ref"], start, token["content_start"])
+            stack[-1]["children"].append(node)
+            stack.append(node)
+
+            if kind == "artigo":
+                caput = _node("caput", None, token["content_start"], token["content_start"])
+                node["children"].append(caput)
+                stack.append(caput)
+
+        close_to(1, len(text))
+        root["end"] = len(text)
+        self._fill_text(root, text)
+        return root
+
+    def _fill_text(self, root: Dict[str, Any], text: str):
+        """Preenche o texto próprio de cada nó (até o primeiro filho) sem recursão."""
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            own_end = node["children"][0]["start"] if node["children"] else node["end"]
+            # Pontuação do marcador ("Art. 10." / "I -") só à esquerda; à direita, a decoração
+            # de lista/citação/título que antecede o próximo marcador ("- I -", "> § 1º")
+            node["text"] = text[node.pop("content_start"):own_end].lstrip(" \t\n.-–—|*").rstrip(" \t\n|*>#_-")
+            pending.extend(node["children"])
+
+    def iter_articles(self, text: str) -> Iterator[Dict[str, Any]]:
+        """Itera os artigos do texto (nós "artigo" da árvore)."""
+        yield from (node for node in self.parse(text)["children"] if node["type"] == "artigo")
+
+
+def iter_nodes(node: Dict[str, Any], kind: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Percorre a árvore em pré-ordem, opcionalmente filtrando por tipo."""
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if kind is None or current["type"] == kind:
+            yield current
+        pending.extend(reversed(current["children"]))
+
+
+# Instância compartilhada para uso nas funções auxiliares
+_default_lexer = LegalStructureLexer()
+
+
+def parse_legal_structure(text: str) -> Dict[str, Any]:
+    """Atalho para montar a árvore de dispositivos de um texto legal."""
+    return _default_lexer.parse(text)
@@ -0,0 +1,113 @@
+"""
+Passagem em memória do Markdown convertido (passo 1) para o chunking (passo 2).
+Usado no modo fused: a conversão publica cada documento numa fila limitada
+consumida pelo chunker, enquanto uma thread grava o Markdown em disco para auditoria.
+"""
+
+import os
+import queue
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+from loguru import logger
+
+
+class MarkdownHandoff:
+    """Fila limitada de documentos Markdown entre produtor (conversão) e consumidor (chunking)."""
+
+    def __init__(self, maxsize: int = 16, poll_interval: float = 0.2):
+        """
+        Inicializa a passagem e inicia a thread de gravação.
+
+        Args:
+            maxsize: Documentos em memória aguardando o chunker (backpressure na conversão)
+            poll_interval: Intervalo de espera do consumidor por novos documentos (segundos)
+        """
+        self._documents: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+        self._existing: deque = deque()
+        self._writes: queue.Queue = queue.Queue()
+        self._closed = threading.Event()
+        self._aborted = threading.Event()
+        self.poll_interval = poll_interval
+        self.write_errors = 0
+        self._writer = threading.Thread(target=self._write_loop, name="markdown-writer", daemon=True)
+        self._writer.start()
+
+    def _write_loop(self):
+        """Grava os documentos publicados (escrita atômica via arquivo temporário)."""
+        while True:
+            item = self._writes.get()
+            try:
+                if item is None:
+                    return
+                output_path, markdown = item
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(markdown)
+                os.replace(tmp_path, output_path)
+            except OSError as e:
+                self.write_errors += 1
+                logger.error(f"Erro ao gravar {item[0]}: {e}")
+            finally:
+                self._writes.task_done()
+
+    def publish(self, output_path: Path, markdown: str):
+        """
+        Publica um documento convertido: agenda a gravação e entrega ao chunker.
+
+        Bloqueia enquanto a fila estiver cheia, a menos que o consumidor tenha abortado.
+        """
+        self._writes.put((output_path, markdown))
+        while not self._aborted.is_set():
+            try:
+                self._documents.put((output_path, markdown), timeout=self.poll_interval)
+                return
+            except queue.Full:
+                continue
+
+    def add_existing(self, output_paths: Iterable[Path]):
+        """Agenda Markdown já presente em disco (não reconvertido) para o chunker ler quando ocioso."""
+        self._existing.extend(output_paths)
+
+    def wait_written(self):
+        """Aguarda a gravação de todos os documentos publicados até agora."""
+        self._writes.join()
+
+    def close(self):
+        """Sinaliza o fim da produção e encerra a thread de gravação após drenar a fila."""
+        self._closed.set()
+        self._writes.put(None)
+        self._writer.join()
+
+    def abort(self, reason: Optional[BaseException] = None):
+        """Chamado pelo consumidor em falha: a conversão segue sem bloquear na fila."""
+        logger.error(f"Chunking em modo fused interrompido: {reason}")
+        self._aborted.set()
+
+    def __iter__(self) -> Iterator[Tuple[Path, Optional[str]]]:
+        """
+        Itera documentos para o chunker até o produtor fechar a passagem.
+
+        Yields:
+            Tuplas (caminho do Markdown, conteúdo). Conteúdo None indica arquivo
+            existente em disco, que o consumidor deve ler.
+        """
+        while True:
+            # Documentos recém-convertidos primeiro; Markdown existente quando a fila está vazia;
+            # só bloqueia (por poll_interval) quando não há nenhum dos dois
+            try:
+                item = self._documents.get_nowait()
+            except queue.Empty:
+                item = None
+            if item is None and self._existing:
+                item = (self._existing.popleft(), None)
+            if item is None:
+                if self._closed.is_set() and self._documents.empty():
+                    return
+                try:
+                    item = self._documents.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    continue
+            yield item
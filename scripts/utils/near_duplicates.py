@@ -0,0 +1,125 @@
+"""
+Detecção de chunks quase duplicados com MinHash + LSH.
+Cláusulas de vigência, dispositivos "Revogado" e constituições estaduais quase
+idênticas geram chunks repetidos: o primeiro de cada grupo é o canônico e os
+demais viram aliases, sem embedding próprio nem geração de exemplos.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Tuple
+import numpy as np
+
+# Palavras normalizadas para os shingles (minúsculas, sem pontuação)
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class NearDuplicateIndex:
+    """Índice MinHash/LSH incremental: cada chunk novo é comparado com os já vistos."""
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        """
+        Inicializa o índice.
+
+        Args:
+            threshold: Similaridade de Jaccard estimada mínima para considerar duplicata
+            num_perm: Número de funções de hash da assinatura MinHash
+            bands: Faixas do LSH (num_perm deve ser múltiplo); mais faixas, mais candidatos
+            shingle_size: Palavras por shingle
+            seed: Semente das funções de hash (assinaturas comparáveis exigem a mesma)
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) deve ser múltiplo de bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Hash multiply-shift: (a * x + b) mod 2^64, 32 bits mais altos; a ímpar
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [defaultdict(list) for _ in range(bands)]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+        self.alias_count = 0
+
+    def signature(self, text: str) -> np.ndarray:
+        """Assinatura MinHash (num_perm inteiros de 32 bits) dos shingles de palavras do texto."""
+        words = WORD_PATTERN.findall(text.lower())
+        k = self.shingle_size
+        if len(words) <= k:
+            shingles = [" ".join(words)]
+        else:
+            shingles = [" ".join(words[i:i + k]) for i in range(len(words) - k + 1)]
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        with np.errstate(over="ignore"):
+            permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        """Similaridade de Jaccard estimada entre duas assinaturas."""
+        return float(np.count_nonzero(first == second)) / self.num_perm
+
+    def add(self, key: Hashable, text: str) -> Tuple[Optional[Hashable], float]:
+        """
+        Registra um chunk e procura um canônico quase idêntico entre os já vistos.
+
+        Args:
+            key: Identificador do chunk (ex: id gerado antes da inserção)
+            text: Conteúdo do chunk
+
+        Returns:
+            Tupla (chave do canônico, similaridade estimada). Sem duplicata: (None, 0.0)
+            e o chunk passa a ser canônico para os próximos.
+        """
+        signature = self.signature(text)
+        band_keys = self._band_keys(signature)
+
+        best_key, best_similarity = None, 0.0
+        seen = set()
+        for band, band_key in enumerate(band_keys):
+            for candidate in self._buckets[band].get(band_key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                similarity = self.similarity(signature, self._signatures[candidate])
+                if similarity > best_similarity:
+                    best_key, best_similarity = candidate, similarity
+
+        # Só canônicos ficam nos buckets: um alias sempre aponta para um canônico
+        if best_key is not None and best_similarity >= self.threshold:
+            self.alias_count += 1
+            return best_key, best_similarity
+
+        self._insert(key, signature, band_keys)
+        return None, 0.0
+
+    def register(self, key: Hashable, text: str):
+        """Registra um chunk canônico já existente (ex: gravado em execução anterior) sem procurar duplicatas."""
+        signature = self.signature(text)
+        self._insert(key, signature, self._band_keys(signature))
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def _insert(self, key: Hashable, signature: np.ndarray, band_keys: List[bytes]):
+        self._signatures[key] = signature
+        for band, band_key in enumerate(band_keys):
+            self._buckets[band][band_key].append(key)
+
+    @property
+    def canonical_count(self) -> int:
+        """Número de chunks canônicos registrados."""
+        return len(self._signatures)
@@ -0,0 +1,120 @@
+"""
+Encoder de sentenças com ONNX Runtime (CPU).
+Executa o transformer exportado por scripts/export_onnx_model.py (fp32 ou int8
+quantizado) e reproduz pooling e normalização do modelo sentence-transformers original.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+import numpy as np
+
+# Imports condicionais (backend opcional: só é exigido quando selecionado)
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    HAS_ONNXRUNTIME = False
+
+# Arquivos gerados pela exportação
+ONNX_CONFIG_FILE = "embedding_config.json"
+ONNX_MODEL_FILES = {"fp32": "model.onnx", "int8": "model_int8.onnx"}
+TOKENIZER_FILE = "tokenizer.json"
+
+# Tolerância declarada: similaridade de cosseno mínima, texto a texto, entre o embedding
+# ONNX e o do caminho sentence-transformers/torch (verificada na exportação e no benchmark)
+COSINE_TOLERANCE = {"fp32": 0.9999, "int8": 0.99}
+
+
+def model_slug(model_name: str) -> str:
+    """Nome do diretório do modelo exportado (ex: "all-MiniLM-L6-v2")."""
+    return model_name.rstrip("/").split("/")[-1]
+
+
+class OnnxEncoder:
+    """Tokenização (tokenizers) + transformer (ONNX Runtime) + pooling em numpy."""
+
+    def __init__(self, model_dir: Path, quantized: bool = True, num_threads: int = 0):
+        """
+        Carrega o modelo exportado.
+
+        Args:
+            model_dir: Diretório com embedding_config.json, tokenizer.json e os .onnx
+            quantized: Usa o modelo int8 (pesos quantizados dinamicamente) em vez do fp32
+            num_threads: Threads intra-op do ONNX Runtime (0 = padrão do runtime)
+        """
+        if not HAS_ONNXRUNTIME:
+            raise ImportError(
+                "onnxruntime/tokenizers não instalados. "
+                "Instale com: pip install onnxruntime tokenizers"
+            )
+
+        self.model_dir = Path(model_dir)
+        self.variant = "int8" if quantized else "fp32"
+        model_path = self.model_dir / ONNX_MODEL_FILES[self.variant]
+        config_path = self.model_dir / ONNX_CONFIG_FILE
+        if not model_path.exists() or not config_path.exists():
+            raise FileNotFoundError(
+                f"Modelo ONNX não encontrado em {self.model_dir}. "
+                f"Gere com: python scripts/export_onnx_model.py"
+            )
+
+        with open(config_path, "r", encoding="utf-8") as f:
+            self.config: Dict[str, Any] = json.load(f)
+        self.dimension = int(self.config["dimension"])
+        self.pooling = self.config.get("pooling", "mean")
+        self.normalize = bool(self.config.get("normalize", True))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(self.model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=int(self.config["max_seq_length"]))
+        self.tokenizer.enable_padding(
+            pad_id=int(self.config.get("pad_token_id", 0)),
+            pad_token=self.config.get("pad_token", "[PAD]")
+        )
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Gera embeddings float32 (n_textos, dimensão).
+
+        Os textos são ordenados por tamanho antes de formar os lotes (como no
+        sentence-transformers), e o resultado volta na ordem original.
+        """
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        # Mesmo pré-processamento do sentence-transformers (strip)
+        texts = [str(t).strip() for t in texts]
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        for start in range(0, len(texts), max(1, batch_size)):
+            positions = order[start:start + batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in positions])
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": attention_mask
+            }
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            hidden = self.session.run(None, feeds)[0]
+            embeddings[positions] = self._pool(hidden, attention_mask)
+        return embeddings
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Pooling do sentence-transformers (mean, cls ou max) + normalização L2 opcional."""
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        elif self.pooling == "max":
+            masked = np.where(attention_mask[:, :, None] > 0, hidden, -1e9)
+            pooled = masked.max(axis=1)
+        else:
+            mask = attention_mask[:, :, None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
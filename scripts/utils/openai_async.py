@@ -0,0 +1,283 @@
+"""
+Cliente assíncrono de embeddings da OpenAI.
+Mantém várias requisições em voo sob orçamentos de requisições e tokens por minuto
+(token buckets), recua de forma adaptativa em respostas 429 (respeitando Retry-After)
+e devolve os embeddings na ordem de entrada, como matriz float32 (os vetores vêm em
+base64 e são lidos direto do buffer, sem listas de floats do Python).
+"""
+
+import time
+import base64
+import random
+import asyncio
+import concurrent.futures
+from email.utils import parsedate_to_datetime
+from typing import Callable, List, Optional
+import numpy as np
+from loguru import logger
+
+# Imports condicionais (backend opcional: só é exigido quando selecionado)
+try:
+    from openai import AsyncOpenAI, APIStatusError, APIConnectionError, RateLimitError
+    HAS_ASYNC_OPENAI = True
+except ImportError:
+    HAS_ASYNC_OPENAI = False
+
+
+def approximate_tokens(text: str) -> int:
+    """Aproximação: ~1.3 tokens por palavra em português."""
+    return int(len(text.split()) * 1.3) + 1
+
+def default_token_counter() -> Callable[[str], int]:
+    """Contador do cl100k_base (encoding dos modelos text-embedding-*), ou a aproximação."""
+    try:
+        import tiktoken
+        encoder = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoder.encode(text, disallowed_special=()))
+    except Exception as e:
+        logger.warning(f"Falha ao carregar tiktoken: {e}. Usando contagem aproximada de tokens.")
+        return approximate_tokens
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Espera pedida pelo servidor (retry-after-ms ou Retry-After em segundos ou data HTTP)."""
+    if headers is None:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Balde de tokens reabastecido continuamente a `per_minute` por minuto."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, scale: float):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate * scale)
+        self.updated = now
+
+    def wait_time(self, amount: float, scale: float) -> float:
+        """Segundos até `amount` estar disponível (0 se já está)."""
+        self._refill(scale)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / (self.rate * scale))
+
+    def take(self, amount: float):
+        self.level -= amount
+
+
+class RateLimiter:
+    """
+    Orçamentos de requisições e tokens por minuto compartilhados pelas requisições em voo.
+
+    Um 429 pausa todas as requisições pelo tempo pedido e reduz a vazão efetiva à
+    metade; cada sucesso devolve 5% da vazão configurada (aumento aditivo, redução
+    multiplicativa).
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, min_scale: float = 0.1):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.min_scale = min_scale
+        self.scale = 1.0
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int):
+        """Aguarda orçamento para uma requisição com `tokens` tokens."""
+        async with self.lock:
+            while True:
+                wait = max(
+                    self.paused_until - time.monotonic(),
+                    self.requests.wait_time(1, self.scale),
+                    self.tokens.wait_time(tokens, self.scale)
+                )
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+
+    def throttled(self, delay: float):
+        """Registra um 429: pausa global de `delay` segundos e vazão reduzida."""
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        self.scale = max(self.min_scale, self.scale / 2)
+
+    def succeeded(self):
+        self.scale = min(1.0, self.scale + 0.05)
+
+
+class AsyncEmbeddingClient:
+    """Embeddings da API OpenAI com requisições concorrentes e limites de vazão."""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: Optional[str] = None,
+        batch_size: int = 100,
+        concurrency: int = 8,
+        requests_per_minute: int = 3000,
+        tokens_per_minute: int = 1_000_000,
+        max_retries: int = 6,
+        timeout: float = 60.0,
+        count_tokens: Optional[Callable[[str], int]] = None
+    ):
+        """
+        Inicializa o cliente.
+
+        Args:
+            api_key: API key da OpenAI
+            model: Modelo de embedding (ex: "text-embedding-3-small")
+            base_url: URL da API (None usa a da OpenAI; ex: servidor local de testes)
+            batch_size: Textos por requisição
+            concurrency: Requisições simultâneas em voo
+            requests_per_minute: Orçamento de requisições por minuto
+            tokens_per_minute: Orçamento de tokens por minuto
+            max_retries: Tentativas por lote em 429, timeouts e erros 5xx
+            timeout: Timeout de cada requisição em segundos
+            count_tokens: Contador de tokens (default: tiktoken cl100k_base)
+        """
+        if not HAS_ASYNC_OPENAI:
+            raise ImportError(
+                "openai não instalado. "
+                "Instale com: pip install openai"
+            )
+
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.count_tokens = count_tokens or default_token_counter()
+
+        # Estatísticas acumuladas
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+
+    def embed(self, texts: List[str], show_progress: bool = False) -> np.ndarray:
+        """Versão síncrona de `embed_async` (roda em uma thread se já houver event loop ativo)."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.embed_async(texts, show_progress))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.embed_async(texts, show_progress)).result()
+
+    def _batches(self, texts: List[str]) -> List[tuple]:
+        """Lotes (início, textos, tokens) com até batch_size textos e no máximo o orçamento de tokens por minuto."""
+        batches, start, current, current_tokens = [], 0, [], 0
+        for i, text in enumerate(texts):
+            tokens = self.count_tokens(text)
+            if current and (len(current) >= self.batch_size or current_tokens + tokens > self.tokens_per_minute):
+                batches.append((start, current, current_tokens))
+                start, current, current_tokens = i, [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append((start, current, current_tokens))
+        return batches
+
+    async def embed_async(self, texts: List[str], show_progress: bool = False) -> np.ndarray:
+        """
+        Gera os embeddings com até `concurrency` requisições simultâneas.
+
+        Returns:
+            Matriz float32 (n_textos, dimensão) na ordem de `texts`
+
+        Raises:
+            RuntimeError: Lote sem sucesso após max_retries ou erro não recuperável da API
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        batches = self._batches(texts)
+        limiter = RateLimiter(self.requests_per_minute, self.tokens_per_minute)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results: List[Optional[np.ndarray]] = [None] * len(batches)
+        done = [0]
+
+        async with AsyncOpenAI(
+            api_key=self.api_key, base_url=self.base_url, max_retries=0, timeout=self.timeout
+        ) as client:
+
+            async def run(index: int, batch: List[str], tokens: int):
+                results[index] = await self._request(client, limiter, semaphore, batch, tokens)
+                done[0] += len(batch)
+                if show_progress:
+                    logger.info(f"Processados {done[0]}/{len(texts)}")
+
+            await asyncio.gather(*(run(i, batch, tokens) for i, (_, batch, tokens) in enumerate(batches)))
+
+        return np.concatenate(results)
+
+    async def _request(self, client, limiter: RateLimiter, semaphore: asyncio.Semaphore,
+                       batch: List[str], tokens: int) -> np.ndarray:
+        """Uma requisição com novas tentativas; a espera entre tentativas não ocupa vaga de concorrência."""
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                await limiter.acquire(tokens)
+                self.requests += 1
+                try:
+                    response = await client.embeddings.create(
+                        model=self.model, input=batch, encoding_format="base64"
+                    )
+                except RateLimitError as e:
+                    self.throttled += 1
+                    delay = retry_after_seconds(e.response.headers)
+                    if delay is None:
+                        delay = min(60.0, 2 ** attempt) + random.random() * 0.5
+                    limiter.throttled(delay)
+                    error = e
+                except APIStatusError as e:
+                    if e.status_code < 500:
+                        raise RuntimeError(f"Erro da API de embeddings ({e.status_code}): {e}") from e
+                    delay = min(60.0, 2 ** attempt) + random.random() * 0.5
+                    error = e
+                except APIConnectionError as e:
+                    delay = min(60.0, 2 ** attempt) + random.random() * 0.5
+                    error = e
+                else:
+                    limiter.succeeded()
+                    data = sorted(response.data, key=lambda item: item.index)
+                    if len(data) != len(batch):
+                        raise RuntimeError(f"Esperados {len(batch)} embeddings, recebidos {len(data)}")
+                    return np.stack([np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+                                     for item in data])
+
+            if attempt == self.max_retries:
+                break
+            self.retries += 1
+            # 429 é esperado sob carga (a vazão se ajusta); demais erros merecem aviso
+            log = logger.debug if isinstance(error, RateLimitError) else logger.warning
+            log(
+                f"Erro no lote de embeddings (tentativa {attempt + 1}/{self.max_retries + 1}): "
+                f"{error}. Aguardando {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+        raise RuntimeError(f"Falha ao gerar embeddings após {self.max_retries + 1} tentativas: {error}")
@@ -0,0 +1,62 @@
+"""
+Pré-checagem barata de PDFs.
+Conta páginas e mede a camada de texto de uma amostra de páginas para decidir
+se o documento é digitalizado (precisa de OCR) ou nativo em texto.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+from loguru import logger
+
+# Imports condicionais
+try:
+    from PyPDF2 import PdfReader
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+    logger.warning("PyPDF2 não instalado. Use: pip install pypdf2")
+
+
+def _sample_pages(total_pages: int, sample_size: int) -> List[int]:
+    """Índices (0-based) de páginas espalhadas uniformemente pelo documento."""
+    if total_pages <= sample_size:
+        return list(range(total_pages))
+    step = total_pages / sample_size
+    return sorted({int(i * step) for i in range(sample_size)})
+
+
+def inspect_pdf(
+    file_path: Path,
+    sample_size: int = 5,
+    min_chars_per_page: int = 100
+) -> Dict[str, Any]:
+    """
+    Inspeciona a camada de texto de um PDF.
+
+    Args:
+        file_path: Caminho do PDF
+        sample_size: Número de páginas amostradas
+        min_chars_per_page: Média mínima de caracteres para considerar o PDF nativo em texto
+
+    Returns:
+        Dicionário com páginas, caracteres médios por página amostrada,
+        flag "scanned" e tempo gasto. Na falha, "scanned" é True (caminho seguro: OCR).
+    """
+    info = {"pages": 0, "chars_per_page": 0.0, "scanned": True, "seconds": 0.0}
+    if not HAS_PYPDF:
+        return info
+
+    start = time.perf_counter()
+    try:
+        reader = PdfReader(str(file_path))
+        info["pages"] = len(reader.pages)
+        sampled = _sample_pages(info["pages"], sample_size)
+        if sampled:
+            chars = sum(len((reader.pages[i].extract_text() or "").strip()) for i in sampled)
+            info["chars_per_page"] = chars / len(sampled)
+            info["scanned"] = info["chars_per_page"] < min_chars_per_page
+    except Exception as e:
+        logger.warning(f"Falha na pré-checagem de {file_path}: {e}")
+    info["seconds"] = time.perf_counter() - start
+    return info
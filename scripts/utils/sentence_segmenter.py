@@ -0,0 +1,137 @@
+"""
+Segmentação de sentenças ciente de abreviações jurídicas.
+O ponto de "Art.", "nº.", "inc.", "Dec.-Lei", "Des." ou de marcadores no início de
+dispositivo como "Art. 10." e "Parágrafo único." não encerra sentença: abreviações
+e marcadores são consultados só nos candidatos a fronteira, numa única passagem pelo texto.
+"""
+
+import re
+from typing import Iterable, List, Optional
+
+# Abreviações comuns em textos legais e jurisprudência (sem o ponto final)
+LEGAL_ABBREVIATIONS = (
+    # Dispositivos e divisões
+    "art", "arts", "inc", "incs", "al", "als", "par", "parág", "cap", "caps", "tít", "sec", "seç", "subseç",
+    # Numeração e referências
+    "n", "nº", "n°", "nos", "nºs", "núm", "num", "fl", "fls", "pág", "págs", "p", "pp", "vol", "ed",
+    "cf", "vs", "ex", "obs", "op", "cit", "id", "ib", "ibid", "ss",
+    # Normas e atos
+    "dec", "decr", "res", "port", "inst", "instr", "const", "emend", "prov",
+    # Processos e recursos
+    "proc", "rec", "ag", "agr", "agrg", "ap", "apel", "emb", "embs", "resp", "rext", "rel", "red",
+    "min", "des", "dr", "dra", "drs", "sr", "sra", "srs", "exmo", "exma", "ilmo", "ilma",
+    # Pessoas jurídicas e outros
+    "ltda", "cia", "s/a", "aprox", "máx", "mín", "tel", "av",
+    # Meses
+    "jan", "fev", "mar", "abr", "jun", "jul", "ago", "set", "out", "nov", "dez",
+)
+
+# Abreviações que também são palavras ("o mar.", "em 5 min.", "pagou dez.", "um par."): o ponto
+# só é protegido antes de dígito ou minúscula ("mar. 2020", "set. de 2021", "nos. 1 e 2")
+AMBIGUOUS_ABBREVIATIONS = ("mar", "set", "out", "min", "des", "dez", "nos", "num", "par")
+# Entre elas, títulos protegidos também com inicial maiúscula ("Min. Relator", "Des. Fulano")
+TITLE_ABBREVIATIONS = ("min", "des")
+# Primeiro caractere após o espaço que segue o ponto
+NEXT_CHARACTER = re.compile(r"\s+(\S)")
+
+# Marcadores de dispositivo terminados em ponto que introduzem o texto seguinte
+DISPOSITIVO_MARKERS = (
+    r"\bArt(?:igo)?s?\.?\s*\d+(?:\.\d{3})*\s*[º°o]?(?:\s*[-–]\s*[A-Z])?\.",
+    r"§\s*\d+\s*[º°o]?\.",
+    r"\bPar[áa]grafo\s+[úu]nico\.",
+    # Enumeração no início da linha ("1.", "12.")
+    r"(?m:^)[ \t]*\d{1,3}\.",
+)
+
+# Candidatos a fronteira: espaço após pontuação final
+BOUNDARY_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+# Início de dispositivo: começo de linha (com prefixos de Markdown ou aspas) ou de sentença;
+# referências no meio da frase ("no art. 5º.", "o § 2º.") encerram a sentença normalmente
+MARKER_START = r"(?:^|[.!?;:]\s+)[ \t#*>\-\"“']*"
+
+# Caracteres examinados antes de um candidato (maior que qualquer marcador)
+PROTECTED_LOOKBACK = 64
+
+# Caracteres de abreviação além de letras e dígitos ("s/a", "n°")
+WORD_EXTRA_CHARS = "/°_"
+
+
+class SentenceSegmenter:
+    """Divide texto em sentenças em uma passagem, sem quebrar em abreviações jurídicas."""
+
+    def __init__(self, abbreviations: Optional[Iterable[str]] = None):
+        """
+        Prepara as abreviações e compila o regex de marcadores.
+
+        Args:
+            abbreviations: Abreviações sem o ponto final (default: LEGAL_ABBREVIATIONS)
+        """
+        self.abbreviations = frozenset(w.lower() for w in (abbreviations or LEGAL_ABBREVIATIONS))
+        self._max_length = max((len(w) for w in self.abbreviations), default=0)
+        self._marker_at_end = re.compile(
+            MARKER_START + r"(?:" + "|".join(DISPOSITIVO_MARKERS) + r")\Z", re.IGNORECASE | re.MULTILINE
+        )
+
+    def _is_boundary(self, text: str, end: int) -> bool:
+        """Fim de sentença em text[end - 1], a menos que o ponto encerre abreviação ou marcador."""
+        dot = end - 1
+        if text[dot] != ".":
+            return True
+
+        # Palavra imediatamente antes do ponto (limitada ao tamanho da maior abreviação)
+        limit = max(0, dot - self._max_length - 1)
+        start = dot
+        while start > limit and (text[start - 1].isalnum() or text[start - 1] in WORD_EXTRA_CHARS):
+            start -= 1
+        word = text[start:dot].lower()
+        if word in self.abbreviations and (start == 0 or start > limit):
+            if word not in AMBIGUOUS_ABBREVIATIONS:
+                return False
+            if word in TITLE_ABBREVIATIONS and text[start].isupper():
+                return False
+            # Sem o texto seguinte (ends_sentence) não há como decidir: não é fronteira segura
+            if end >= len(text):
+                return False
+            following = NEXT_CHARACTER.match(text, end)
+            return following is None or not (following.group(1).isdigit() or following.group(1).islower())
+
+        # Marcadores terminam em número, ordinal, letra de artigo ("5º-A.") ou "único"
+        if word in ("único", "unico") or len(word) == 1 or word.rstrip("º°o").isdigit():
+            return self._marker_at_end.search(text, max(0, end - PROTECTED_LOOKBACK), end) is None
+        return True
+
+    def split(self, text: str) -> List[str]:
+        """
+        Divide o texto em sentenças (mesma convenção de re.split(r'(?<=[.!?])\\s+', text)).
+
+        Uma passagem localiza os candidatos (pontuação final seguida de espaço); cada
+        candidato é descartado se o ponto pertence a abreviação ou marcador.
+
+        Args:
+            text: Texto limpo
+
+        Returns:
+            Lista de sentenças (ao menos uma, possivelmente vazia)
+        """
+        sentences = []
+        start = 0
+        for match in BOUNDARY_PATTERN.finditer(text):
+            if self._is_boundary(text, match.start()):
+                sentences.append(text[start:match.start()])
+                start = match.end()
+        sentences.append(text[start:])
+        return sentences
+
+    def ends_sentence(self, text: str) -> bool:
+        """Indica se um espaço logo após o fim de `text` seria fronteira de sentença."""
+        return text[-1:] in (".", "!", "?") and self._is_boundary(text, len(text))
+
+
+# Instância compartilhada para uso nas funções auxiliares
+_default_segmenter = SentenceSegmenter()
+
+
+def split_sentences(text: str) -> List[str]:
+    """Atalho para dividir texto em sentenças."""
+    return _default_segmenter.split(text)
@@ -0,0 +1,128 @@
+"""
+Índice de similaridade de cosseno em memória (busca exata top-k).
+Guarda os candidatos normalizados uma única vez em float32 e responde lotes de
+consultas com multiplicações de matrizes por blocos e argpartition: a memória de
+trabalho fica limitada a block_size x block_size similaridades, mesmo com
+centenas de milhares de vetores.
+"""
+
+from typing import Optional, Sequence, Tuple, Union
+import numpy as np
+
+Vectors = Union[np.ndarray, Sequence[Sequence[float]], Sequence[float]]
+
+
+def normalize_rows(vectors: Vectors) -> np.ndarray:
+    """Cópia float32 2-D com as linhas normalizadas (norma L2 = 1)."""
+    matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.maximum(norms, 1e-12, out=norms)
+    matrix /= norms
+    return matrix
+
+
+class SimilarityIndex:
+    """Candidatos pré-normalizados e busca top-k exata em lotes."""
+
+    def __init__(self, embeddings: Optional[Vectors] = None, dimension: Optional[int] = None,
+                 block_size: int = 2048):
+        """
+        Inicializa o índice.
+
+        Args:
+            embeddings: Candidatos iniciais (n, dimensão)
+            dimension: Dimensão dos vetores (inferida dos embeddings se omitida)
+            block_size: Linhas de consultas e de candidatos por bloco da multiplicação
+        """
+        self.block_size = max(1, block_size)
+        self._matrix = np.empty((0, dimension or 0), dtype=np.float32)
+        self._size = 0
+        if embeddings is not None and len(embeddings):
+            self.add(embeddings)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dimension(self) -> int:
+        return self._matrix.shape[1]
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Candidatos normalizados (visão, sem cópia)."""
+        return self._matrix[:self._size]
+
+    def add(self, embeddings: Vectors) -> np.ndarray:
+        """
+        Acrescenta candidatos (capacidade dobra quando cheia).
+
+        Returns:
+            Índices atribuídos aos novos candidatos
+        """
+        rows = normalize_rows(embeddings)
+        if self._size and rows.shape[1] != self.dimension:
+            raise ValueError(f"Dimensão {rows.shape[1]} incompatível com o índice ({self.dimension})")
+        end = self._size + len(rows)
+        if end > len(self._matrix) or rows.shape[1] != self._matrix.shape[1]:
+            grown = np.empty((max(end, 2 * len(self._matrix)), rows.shape[1]), dtype=np.float32)
+            if self._size:
+                grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size:end] = rows
+        start, self._size = self._size, end
+        return np.arange(start, end)
+
+    def search(self, queries: Vectors, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k candidatos mais similares de cada consulta.
+
+        Args:
+            queries: Uma consulta (dimensão,) ou um lote (n_consultas, dimensão)
+            k: Vizinhos por consulta (limitado ao tamanho do índice)
+
+        Returns:
+            (índices int64, similaridades float32), ambos (n_consultas, k),
+            em ordem decrescente de similaridade
+        """
+        return self._search(normalize_rows(queries), k)
+
+    def neighbors(self, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k vizinhos de cada candidato do índice, excluindo ele mesmo."""
+        return self._search(self.matrix, k, exclude_self=True)
+
+    def _search(self, queries: np.ndarray, k: int, exclude_self: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        k = max(0, min(k, self._size - (1 if exclude_self else 0)))
+        indices = np.empty((len(queries), k), dtype=np.int64)
+        scores = np.empty((len(queries), k), dtype=np.float32)
+        if k == 0:
+            return indices, scores
+
+        candidates = self.matrix
+        for q_start in range(0, len(queries), self.block_size):
+            block_queries = queries[q_start:q_start + self.block_size]
+            rows = np.arange(len(block_queries))
+            best_scores = np.full((len(block_queries), k), -np.inf, dtype=np.float32)
+            best_indices = np.full((len(block_queries), k), -1, dtype=np.int64)
+
+            for c_start in range(0, self._size, self.block_size):
+                block = block_queries @ candidates[c_start:c_start + self.block_size].T
+                if exclude_self:
+                    # A consulta q_start + i é o candidato de mesmo índice
+                    own = rows + q_start - c_start
+                    inside = (own >= 0) & (own < block.shape[1])
+                    block[rows[inside], own[inside]] = -np.inf
+
+                # Top-k do bloco, depois top-k da união com o melhor acumulado
+                kk = min(k, block.shape[1])
+                top = np.argpartition(block, block.shape[1] - kk, axis=1)[:, -kk:]
+                merged_scores = np.concatenate([best_scores, np.take_along_axis(block, top, axis=1)], axis=1)
+                merged_indices = np.concatenate([best_indices, top + c_start], axis=1)
+                keep = np.argpartition(merged_scores, merged_scores.shape[1] - k, axis=1)[:, -k:]
+                best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+                best_indices = np.take_along_axis(merged_indices, keep, axis=1)
+
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            scores[q_start:q_start + len(block_queries)] = np.take_along_axis(best_scores, order, axis=1)
+            indices[q_start:q_start + len(block_queries)] = np.take_along_axis(best_indices, order, axis=1)
+
+        return indices, scores
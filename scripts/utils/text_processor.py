@@ -4,26 +4,63 @@ Inclui normalização, chunking e extração de estrutura.
 """
 
 import re
-from typing import List, Dict, Tuple, Optional, Any
+from bisect import bisect_left
+from itertools import accumulate
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Any, Iterable, Iterator, TextIO, Union
+import numpy as np
 import tiktoken
 from loguru import logger
 
+from .legal_lexer import LegalStructureLexer, iter_nodes
+from .legal_area_classifier import LegalAreaClassifier
+from .sentence_segmenter import SentenceSegmenter
+
+# regex é dependência do tiktoken; usado para reproduzir sua pré-tokenização
+try:
+    import regex
+    HAS_REGEX = True
+except ImportError:
+    HAS_REGEX = False
+
+# Limite seguro para cortar o texto em blocos: espaço após fim de sentença,
+# seguido de caractere que não é espaço nem pontuação (ver _iter_sentence_batches)
+SAFE_CUT_PATTERN = re.compile(r'[.!?](\s+)(?=[^\s.,;:!?])')
+
+# Candidatos a corte examinados por bloco (pontos de abreviação não servem de corte)
+MAX_CUT_ATTEMPTS = 8
+
+
+def iter_text_blocks(stream: TextIO, block_size: int = 1 << 20) -> Iterator[str]:
+    """Lê um stream de texto em blocos de até `block_size` caracteres."""
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            return
+        yield block
+
 
 class TextProcessor:
     """Processador de textos jurídicos."""
 
-    def __init__(self, encoding_name: str = "cl100k_base"):
+    def __init__(self, encoding_name: str = "cl100k_base", legal_areas: Optional[Dict[str, Any]] = None):
         """
         Inicializa o processador de texto.
 
         Args:
             encoding_name: Nome do encoding do tiktoken (default: cl100k_base para GPT-4)
+            legal_areas: Taxonomia de áreas do direito (default: taxonomia padrão do classificador)
         """
         try:
             self.encoder = tiktoken.get_encoding(encoding_name)
         except (ImportError, ValueError, KeyError) as e:
             logger.warning(f"Falha ao carregar tiktoken: {e}. Usando contagem aproximada.")
             self.encoder = None
+        self._pretoken_regex = None
+        self._token_lengths: Optional[np.ndarray] = None
+        self._lexer = LegalStructureLexer()
+        self._area_classifier = LegalAreaClassifier(legal_areas)
+        self._segmenter = SentenceSegmenter()
 
     def count_tokens(self, text: str) -> int:
         """Conta tokens no texto."""
@@ -61,6 +98,9 @@ class TextProcessor:
         """
         Extrai estrutura de um artigo (incisos, parágrafos, alíneas).
 
+        Usa o lexer de passagem única (LegalStructureLexer); quando o texto contém
+        vários artigos, considera o primeiro.
+
         Args:
             text: Texto do artigo
 
@@ -75,41 +115,27 @@ class TextProcessor:
             "subitems": []
         }
 
-        # Extrair referência do artigo (Art. X)
-        article_match = re.search(r'Art\.\s*(\d+[º°]?[.-]?[A-Z]?)', text)
-        if article_match:
-            structure["article_ref"] = article_match.group(0)
+        tree = self._lexer.parse(text)
+        article = next(iter_nodes(tree, "artigo"), None)
+        scope = article or tree
+        if article:
+            structure["article_ref"] = article["ref"]
+            structure["caput"] = self.clean_text(article["children"][0]["text"])
 
-        # Extrair parágrafos
-        paragraphs = re.findall(r'§\s*(\d+[º°]?)[.\s]+(.*?)(?=§|\n\n|$)', text, re.DOTALL)
         structure["paragraphs"] = [
-            {"ref": f"§{ref}", "text": self.clean_text(content)}
-            for ref, content in paragraphs
+            {"ref": node["ref"].replace(" ", "") if node["ref"].startswith("§") else node["ref"],
+             "text": self.clean_text(node["text"])}
+            for node in iter_nodes(scope, "paragrafo")
         ]
-
-        # Extrair incisos (I, II, III, etc.)
-        items = re.findall(r'\b([IVX]+)\s*[–-]\s*(.*?)(?=\b[IVX]+\s*[–-]|\n\n|$)', text, re.DOTALL)
         structure["items"] = [
-            {"ref": ref, "text": self.clean_text(content)}
-            for ref, content in items
+            {"ref": node["ref"], "text": self.clean_text(node["text"])}
+            for node in iter_nodes(scope, "inciso")
         ]
-
-        # Extrair alíneas (a), b), c), etc.)
-        subitems = re.findall(r'\b([a-z])\)\s*(.*?)(?=\b[a-z]\)|\n\n|$)', text, re.DOTALL)
         structure["subitems"] = [
-            {"ref": f"{ref})", "text": self.clean_text(content)}
-            for ref, content in subitems
+            {"ref": node["ref"], "text": self.clean_text(node["text"])}
+            for node in iter_nodes(scope, "alinea")
         ]
 
-        # Extrair caput (tudo antes do primeiro parágrafo/inciso)
-        caput_match = re.search(
-            r'Art\.\s*\d+[º°]?[.-]?[A-Z]?\s*[.-]?\s*(.*?)(?=§|[IVX]+\s*[–-]|\n\n|$)',
-            text,
-            re.DOTALL
-        )
-        if caput_match:
-            structure["caput"] = self.clean_text(caput_match.group(1))
-
         return structure
 
     def split_into_chunks(
@@ -121,6 +147,9 @@ class TextProcessor:
         """
         Divide texto em chunks com overlap.
 
+        Cada sentença é tokenizada uma única vez; limites, overlap e contagem
+        de tokens dos chunks saem de somas prefixadas, em tempo linear.
+
         Args:
             text: Texto para dividir
             chunk_size: Tamanho máximo do chunk em tokens
@@ -129,52 +158,213 @@ class TextProcessor:
         Returns:
             Lista de dicionários com chunks e metadados
         """
-        # Limpar texto
-        text = self.clean_text(text)
+        chunks = list(self._assemble_chunks(self._iter_sentence_batches([text]), chunk_size, chunk_overlap))
+        logger.debug(f"Texto dividido em {len(chunks)} chunks")
+        return chunks
+
+    def iter_chunks(
+        self,
+        source: Union[str, Path, TextIO],
+        chunk_size: int = 1500,
+        chunk_overlap: int = 200,
+        block_size: int = 1 << 20
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Gera chunks de um arquivo ou stream de texto sem materializar o documento.
+
+        Lê blocos de `block_size` caracteres e processa as sentenças até o último
+        limite seguro de cada bloco; a memória fica limitada ao bloco, às sentenças
+        pendentes e ao chunk corrente. Os chunks são idênticos aos de split_into_chunks.
+
+        Args:
+            source: Caminho do arquivo (lido em UTF-8) ou stream de texto aberto
+            chunk_size: Tamanho máximo do chunk em tokens
+            chunk_overlap: Overlap entre chunks em tokens
+            block_size: Caracteres lidos por vez
+
+        Yields:
+            Dicionários com chunks e metadados, na ordem do texto
+        """
+        if isinstance(source, (str, Path)):
+            with open(source, "r", encoding="utf-8") as f:
+                yield from self.iter_chunks(f, chunk_size, chunk_overlap, block_size)
+            return
+
+        batches = self._iter_sentence_batches(iter_text_blocks(source, block_size))
+        yield from self._assemble_chunks(batches, chunk_size, chunk_overlap)
+
+    def split_sentences(self, text: str) -> List[str]:
+        """Divide texto limpo em sentenças sem quebrar em abreviações jurídicas ("Art.", "nº.", "inc.")."""
+        return self._segmenter.split(text)
+
+    def _iter_sentence_batches(self, blocks: Iterable[str]) -> Iterator[List[str]]:
+        """
+        Limpa o texto e o divide em sentenças, bloco a bloco.
 
-        # Dividir em sentenças (aproximação)
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        O buffer é cortado no último espaço entre sentenças seguido de texto que não
+        é pontuação (e cujo ponto não encerra abreviação): nenhuma regra de clean_text
+        nem a segmentação atravessa esse ponto, então o resultado é o mesmo de
+        processar o texto inteiro.
+        """
+        buffer = ""
+        emitted = False
+        for block in blocks:
+            buffer += block
+            # Poucos candidatos a partir do fim: cada tentativa limpa o prefixo inteiro
+            for cut in list(SAFE_CUT_PATTERN.finditer(buffer))[:-MAX_CUT_ATTEMPTS - 1:-1]:
+                head = self.clean_text(buffer[:cut.start(1)])
+                if self._segmenter.ends_sentence(head):
+                    yield self.split_sentences(head)
+                    emitted = True
+                    buffer = buffer[cut.end(1):]
+                    break
+
+        text = self.clean_text(buffer)
+        if text or not emitted:
+            yield self.split_sentences(text)
+
+    def _assemble_chunks(
+        self,
+        batches: Iterable[List[str]],
+        chunk_size: int,
+        chunk_overlap: int
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Agrupa sentenças em chunks à medida que chegam.
 
-        chunks = []
-        current_chunk = []
+        Um chunk fecha quando a próxima sentença estouraria chunk_size; o seguinte
+        recomeça pelo maior sufixo de sentenças que cabe em chunk_overlap (busca
+        binária nas somas prefixadas da janela). Só a janela do chunk corrente fica
+        em memória.
+        """
+        window: List[str] = []
+        window_tokens: List[int] = []
+        window_joined: List[int] = []
         current_tokens = 0
         chunk_index = 0
-                })
-
-                # Manter overlap
-                overlap_tokens = 0
-                overlap_sentences = []
-
-                for s in reversed(current_chunk):
-                    s_tokens = self.count_tokens(s)
-                    if overlap_tokens + s_tokens <= chunk_overlap:
-                        overlap_sentences.insert(0, s)
-                        overlap_tokens += s_tokens
-                    else:
-                        break
-
-                current_chunk = overlap_sentences
-                current_tokens = overlap_tokens
-                chunk_index += 1
-
-            current_chunk.append(sentence)
-            current_tokens += sentence_tokens
-
-        # Adicionar último chunk
-        if current_chunk:
-            chunk_text = " ".join(current_chunk)
-            start_snippet = current_chunk[0][:50]
-            end_snippet = current_chunk[-1][-50:]
-            chunks.append({
+        previous = None
+
+        def make_chunk() -> Dict[str, Any]:
+            chunk_text = " ".join(window)
+            if self.encoder:
+                # Tokens de " ".join(...) = primeira sentença + demais precedidas de espaço
+                tokens = window_tokens[0] + sum(window_joined[1:])
+            else:
+                tokens = self.count_tokens(chunk_text)
+            return {
                 "content": chunk_text,
-                "tokens": self.count_tokens(chunk_text),
+                "tokens": tokens,
                 "chunk_index": chunk_index,
-                "start_sentence": start_snippet + ("..." if len(current_chunk[0]) > 50 else ""),
-                "end_sentence": ("..." if len(current_chunk[-1]) > 50 else "") + end_snippet
-            })
+                "start_sentence": window[0][:50] + ("..." if len(window[0]) > 50 else ""),
+                "end_sentence": ("..." if len(window[-1]) > 50 else "") + window[-1][-50:]
+            }
+
+        for sentences in batches:
+            if previous is not None:
+                # A última sentença do lote anterior dá a contagem com espaço da primeira deste
+                sentence_tokens, joined_tokens = self._sentence_token_counts([previous] + sentences)
+                sentence_tokens = sentence_tokens[1:]
+                joined_tokens = joined_tokens[1:] if joined_tokens else None
+            else:
+                sentence_tokens, joined_tokens = self._sentence_token_counts(sentences)
+            previous = sentences[-1]
+
+            for i, sentence in enumerate(sentences):
+                tokens = sentence_tokens[i]
+                if current_tokens + tokens > chunk_size and window:
+                    yield make_chunk()
+                    prefix = list(accumulate(window_tokens, initial=0))
+                    first = bisect_left(prefix, prefix[-1] - chunk_overlap, 0, len(window))
+                    del window[:first], window_tokens[:first], window_joined[:first]
+                    current_tokens = prefix[-1] - prefix[first]
+                    chunk_index += 1
+
+                window.append(sentence)
+                window_tokens.append(tokens)
+                window_joined.append(joined_tokens[i] if joined_tokens else 0)
+                current_tokens += tokens
+
+        if window:
+            yield make_chunk()
+
+    def _sentence_token_counts(self, sentences: List[str]) -> Tuple[List[int], Optional[List[int]]]:
+        """
+        Conta tokens por sentença codificando o documento uma única vez.
 
-        logger.debug(f"Texto dividido em {len(chunks)} chunks")
-        return chunks
+        As sentenças terminam em pontuação e não começam com espaço, então nenhum
+        pré-token do tiktoken atravessa a junção " ".join(sentenças): os offsets dos
+        tokens do texto unido dão, por sentença, a contagem com o espaço que a
+        precede. A contagem isolada (igual a count_tokens(sentença)) difere só no
+        primeiro pré-token e é corrigida recodificando apenas esse trecho.
+
+        Returns:
+            Tupla (tokens de cada sentença isolada, tokens de cada sentença precedida
+            de espaço). Sem tiktoken (contagem aproximada, não aditiva) o segundo é None.
+        """
+        if not self.encoder:
+            return [self.count_tokens(s) for s in sentences], None
+
+        joined = " ".join(sentences)
+        tokens = np.asarray(self.encoder.encode_ordinary(joined), dtype=np.int64)
+        # Offset em bytes (UTF-8) do início de cada token
+        token_starts = np.concatenate(([0], np.cumsum(self._token_byte_lengths()[tokens])[:-1]))
+
+        # Fronteiras em bytes: a sentença i >= 1 começa no espaço que a precede
+        byte_lengths = np.fromiter((len(s.encode("utf-8")) + 1 for s in sentences), dtype=np.int64, count=len(sentences))
+        cuts = np.concatenate(([0], np.cumsum(byte_lengths)[:-1] - 1))
+        token_cuts = np.append(np.searchsorted(token_starts, cuts, side="left"), len(tokens))
+        joined_tokens = np.diff(token_cuts).tolist()
+
+        # Início de cada sentença em caracteres, para a correção do primeiro pré-token
+        starts = []
+        position = 0
+        for sentence in sentences:
+            starts.append(position)
+            position += len(sentence) + 1
+
+        pretoken = self._pretoken_pattern()
+        if pretoken is None:
+            return [len(t) for t in self.encoder.encode_ordinary_batch(sentences)], joined_tokens
+
+        piece_tokens: Dict[str, int] = {}
+
+        def count_piece(piece: str) -> int:
+            if piece not in piece_tokens:
+                piece_tokens[piece] = len(self.encoder.encode_ordinary(piece))
+            return piece_tokens[piece]
+
+        sentence_tokens = [joined_tokens[0]]
+        for i in range(1, len(sentences)):
+            end = starts[i] + len(sentences[i])
+            with_space = pretoken.match(joined, starts[i] - 1, end).group()
+            alone = pretoken.match(joined, starts[i], end).group()
+            if with_space == " ":
+                # Espaço virou pré-token próprio (ex: sentença começando com dígito)
+                sentence_tokens.append(joined_tokens[i] - 1)
+            elif with_space == " " + alone:
+                sentence_tokens.append(joined_tokens[i] - count_piece(with_space) + count_piece(alone))
+            else:
+                sentence_tokens.append(len(self.encoder.encode_ordinary(sentences[i])))
+        return sentence_tokens, joined_tokens
+
+    def _token_byte_lengths(self) -> np.ndarray:
+        """Tamanho em bytes de cada token do vocabulário (calculado uma vez)."""
+        if self._token_lengths is None:
+            lengths = np.zeros(self.encoder.n_vocab, dtype=np.int64)
+            for token in range(self.encoder.n_vocab):
+                try:
+                    lengths[token] = len(self.encoder.decode_single_token_bytes(token))
+                except KeyError:
+                    pass
+            self._token_lengths = lengths
+        return self._token_lengths
+
+    def _pretoken_pattern(self):
+        """Regex de pré-tokenização do encoding (None se indisponível nesta versão do tiktoken)."""
+        if self._pretoken_regex is None:
+            pattern = getattr(self.encoder, "_pat_str", None)
+            self._pretoken_regex = regex.compile(pattern) if pattern and HAS_REGEX else False
+        return self._pretoken_regex or None
 
     def extract_law_metadata(self, text: str) -> Dict[str, Optional[str]]:
         """
@@ -237,41 +427,11 @@ class TextProcessor:
         Returns:
             Área detectada ou None
         """
-        areas = {
-            "Direito Administrativo": [
-                "administrativo", "servidor público", "licitação", "contrato administrativo",
-                "ato administrativo", "processo administrativo", "poder público"
-            ],
-            "Direito Constitucional": [
-                "constitucional", "constituição", "direito fundamental", "estado democrático",
-                "princípio constitucional", "controle de constitucionalidade"
-            ],
-            "Direito Penal": [
-                "penal", "crime", "pena", "delito", "infração penal", "reclusão", "detenção"
-            ],
-            "Direito Civil": [
-                "civil", "contrato", "obrigação", "propriedade", "sucessão", "família"
-            ],
-            "Direito Tributário": [
-                "tributário", "tributo", "imposto", "taxa", "contribuição", "fiscal"
-            ],
-            "Direito do Trabalho": [
-                "trabalho", "trabalhador", "empregado", "empregador", "CLT", "jornada"
-            ]
-        }
-
-        text_lower = text.lower()
-        scores = {}
+        return self._area_classifier.classify(text)
 
-        for area, keywords in areas.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                scores[area] = score
-
-        if scores:
-            return max(scores, key=scores.get)
-
-        return None
+    def score_legal_areas(self, text: str) -> Dict[str, float]:
+        """Pontuação ponderada de todas as áreas do direito em uma passagem."""
+        return self._area_classifier.score(text)
 
 
 # Instância compartilhada para uso nas funções auxiliares
@@ -293,6 +453,15 @@ def split_into_chunks(
     return _default_processor.split_into_chunks(text, chunk_size, chunk_overlap)
 
 
+def iter_chunks(
+    source: Union[str, Path, TextIO],
+    chunk_size: int = 1500,
+    chunk_overlap: int = 200
+) -> Iterator[Dict[str, Any]]:
+    """Atalho para gerar chunks de um arquivo ou stream."""
+    return _default_processor.iter_chunks(source, chunk_size, chunk_overlap)
+
+
 if __name__ == "__main__":
     # Teste
     sample_text = """
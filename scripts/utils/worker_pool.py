@@ -0,0 +1,267 @@
+"""
+Pool de processos supervisionado.
+Cada tarefa tem orçamento de tempo de parede e de memória (RSS); workers que
+estouram o orçamento são finalizados e substituídos, e workers saudáveis são
+reciclados após N tarefas para conter vazamentos lentos. Um worker que morre
+durante a inicialização indica ambiente quebrado (import, modelo ausente) e
+aborta a execução em vez de ser atribuído à tarefa.
+"""
+
+import os
+import sys
+import time
+import queue
+import itertools
+import multiprocessing
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from loguru import logger
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+MB = 1024 * 1024
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Status das tarefas que estouraram o orçamento (o worker foi finalizado); "crashed"
+# só depois de a tarefa derrubar também o worker saudável que a retentou
+BUDGET_STATUSES = ("timeout", "memory", "crashed")
+
+
+class WorkerStartupError(RuntimeError):
+    """Worker morreu antes de ficar pronto (falha no initializer ou no import)."""
+
+
+def process_rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """RSS atual de um processo via /proc (None onde não há /proc, ex: macOS)."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _own_rss_bytes() -> Optional[int]:
+    """RSS do próprio processo; sem /proc, usa o pico reportado por getrusage."""
+    rss = process_rss_bytes()
+    if rss is None and HAS_RESOURCE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        rss = peak if sys.platform == "darwin" else peak * 1024
+    return rss
+
+def _worker_main(worker_id: int, func: Callable, initializer: Optional[Callable], tasks, results, ready):
+    """Laço do processo worker: executa tarefas até receber None."""
+    if initializer is not None:
+        try:
+            initializer()
+        except Exception as e:
+            results.put(("startup", worker_id, None, "error", f"{type(e).__name__}: {e}", None))
+            return
+    ready.set()
+    while True:
+        item = tasks.get()
+        if item is None:
+            break
+        index, args = item
+        results.put(("start", worker_id, index, None, None, None))
+        try:
+            status, value = "ok", func(*args)
+        except Exception as e:
+            status, value = "error", f"{type(e).__name__}: {e}"
+        results.put(("done", worker_id, index, status, value, _own_rss_bytes()))
+
+
+class _Worker:
+    """Processo worker com fila de tarefas própria (no máximo uma tarefa por vez)."""
+
+    def __init__(self, worker_id: int, ctx, func: Callable, initializer: Optional[Callable], results):
+        self.worker_id = worker_id
+        self.tasks = ctx.Queue()
+        # Sinalizado depois do initializer (Event: visível mesmo se o processo morrer em seguida)
+        self.ready = ctx.Event()
+        self.process = ctx.Process(
+            target=_worker_main, args=(worker_id, func, initializer, self.tasks, results, self.ready)
+        )
+        self.process.start()
+        self.index: Optional[int] = None
+        self.started: Optional[float] = None
+        self.completed = 0
+
+    def assign(self, index: int, args: Tuple):
+        self.index = index
+        self.started = None
+        self.tasks.put((index, args))
+
+    def stop(self, timeout: float = 10.0):
+        """Encerra o worker de forma ordenada (ou à força, se não responder)."""
+        if self.process.is_alive():
+            self.tasks.put(None)
+            self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+
+
+class SupervisedPool:
+    """Pool de processos com orçamentos por tarefa e reciclagem de workers."""
+
+    def __init__(
+        self,
+        func: Callable,
+        num_workers: int,
+        initializer: Optional[Callable] = None,
+        task_timeout: float = 0,
+        max_rss_mb: int = 0,
+        max_tasks_per_worker: int = 0,
+        crash_retries: int = 1,
+        start_method: str = "spawn",
+        poll_interval: float = 1.0
+    ):
+        """
+        Inicializa o pool (os processos só sobem em `run`).
+
+        Args:
+            func: Função de nível de módulo executada em cada tarefa
+            num_workers: Número de processos
+            initializer: Função chamada uma vez em cada processo novo
+            task_timeout: Tempo de parede máximo por tarefa em segundos (0 desativa)
+            max_rss_mb: RSS máximo do worker em MB (0 desativa)
+            max_tasks_per_worker: Tarefas antes de reciclar o worker (0 desativa)
+            crash_retries: Novas tentativas, em workers novos, de uma tarefa cujo worker morreu
+            start_method: Método de início do multiprocessing
+            poll_interval: Intervalo de checagem dos orçamentos em segundos
+        """
+        self.func = func
+        self.num_workers = max(1, num_workers)
+        self.initializer = initializer
+        self.task_timeout = task_timeout
+        self.max_rss = max_rss_mb * MB
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.crash_retries = max(0, crash_retries)
+        self.ctx = multiprocessing.get_context(start_method)
+        self.poll_interval = poll_interval
+
+    def run(self, tasks: List[Tuple]) -> Iterator[Tuple[int, str, Any, float]]:
+        """
+        Executa as tarefas na ordem dada, entregando resultados conforme terminam.
+
+        Args:
+            tasks: Tuplas de argumentos para `func`
+
+        Yields:
+            Tuplas (índice da tarefa, status, valor, segundos). Status "ok" traz o
+            retorno de `func`; "error" traz a exceção formatada; "timeout", "memory"
+            e "crashed" indicam que o worker foi finalizado (valor None). Uma tarefa
+            só sai "crashed" se derrubar também o(s) worker(s) da nova tentativa.
+
+        Raises:
+            WorkerStartupError: Se um worker morrer antes de concluir o initializer
+        """
+        results = self.ctx.Queue()
+        pending = deque(enumerate(tasks))
+        worker_ids = itertools.count()
+        workers: Dict[int, _Worker] = {}
+        remaining = len(tasks)
+        crashes: Dict[int, int] = {}
+
+        def spawn():
+            worker = _Worker(next(worker_ids), self.ctx, self.func, self.initializer, results)
+            workers[worker.worker_id] = worker
+
+        try:
+            for _ in range(min(self.num_workers, len(tasks))):
+                spawn()
+
+            while remaining:
+                for worker in list(workers.values()):
+                    if worker.index is None and pending:
+                        worker.assign(*pending.popleft())
+
+                try:
+                    kind, worker_id, index, status, value, rss = results.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    kind = None
+
+                worker = workers.get(worker_id) if kind else None
+                if kind == "startup":
+                    raise WorkerStartupError(f"Worker {worker_id} falhou ao iniciar: {value}")
+                # Mensagens de workers já finalizados (ou de tarefas já contabilizadas) são descartadas
+                if worker is not None and worker.index == index:
+                    if kind == "start":
+                        worker.started = time.monotonic()
+                    else:
+                        seconds = time.monotonic() - (worker.started or time.monotonic())
+                        worker.index = None
+                        worker.completed += 1
+                        remaining -= 1
+                        yield index, status, value, seconds
+
+                        reason = None
+                        if self.max_rss and rss and rss > self.max_rss:
+                            reason = f"RSS {rss / MB:.0f} MB acima do orçamento"
+                        elif self.max_tasks_per_worker and worker.completed >= self.max_tasks_per_worker:
+                            reason = f"{worker.completed} tarefas concluídas"
+                        if reason:
+                            logger.info(f"Reciclando worker {worker.process.pid}: {reason}")
+                            worker.stop()
+                            del workers[worker.worker_id]
+                            if pending:
+                                spawn()
+
+                now = time.monotonic()
+                for worker in list(workers.values()):
+                    if not worker.ready.is_set() and not worker.process.is_alive():
+                        raise self._startup_failure(worker, results)
+                    if worker.index is None or not worker.ready.is_set():
+                        continue
+                    failure = None
+                    if not worker.process.is_alive():
+                        failure = "crashed"
+                    elif self.task_timeout and worker.started and now - worker.started > self.task_timeout:
+                        failure = "timeout"
+                    elif self.max_rss and (process_rss_bytes(worker.process.pid) or 0) > self.max_rss:
+                        failure = "memory"
+                    if failure is None:
+                        continue
+
+                    index = worker.index
+                    seconds = now - worker.started if worker.started else 0.0
+                    worker.kill()
+                    del workers[worker.worker_id]
+                    if failure == "crashed" and crashes.get(index, 0) < self.crash_retries:
+                        # Pode ter sido o worker (ex: estado corrompido), não a tarefa: tenta de novo
+                        crashes[index] = crashes.get(index, 0) + 1
+                        logger.warning(
+                            f"Worker {worker.process.pid} morreu na tarefa {index} "
+                            f"(código {worker.process.exitcode}); nova tentativa em um worker novo"
+                        )
+                        pending.appendleft((index, tasks[index]))
+                        spawn()
+                        continue
+                    logger.warning(f"Worker {worker.process.pid} finalizado ({failure}) após {seconds:.0f}s")
+                    remaining -= 1
+                    if pending:
+                        spawn()
+                    yield index, failure, None, seconds
+        finally:
+            for worker in workers.values():
+                worker.stop()
+
+    @staticmethod
+    def _startup_failure(worker: _Worker, results) -> WorkerStartupError:
+        """Erro de inicialização do worker, com a exceção do initializer se ela chegou à fila."""
+        detail = f"código de saída {worker.process.exitcode}"
+        try:
+            while True:
+                kind, worker_id, _, _, value, _ = results.get(timeout=0.5)
+                if kind == "startup" and worker_id == worker.worker_id:
+                    detail = value
+                    break
+        except queue.Empty:
+            pass
+        return WorkerStartupError(f"Worker {worker.process.pid} falhou ao iniciar: {detail}")
@@ -0,0 +1,13 @@
+"""
+Configuração dos testes: os scripts do pipeline importam `config`, `database` e
+`utils` a partir de scripts/, como quando executados diretamente.
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RAW_DOCS_DIR = PROJECT_ROOT / "0-RawDocs"
+MARKDOWN_DIR = PROJECT_ROOT / "1-MarkdownClean"
+
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
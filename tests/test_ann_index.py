@@ -0,0 +1,92 @@
+"""Testes do índice ANN local: atualização por id, reconstrução e persistência."""
+
+import numpy as np
+import pytest
+
+from utils.ann_index import AnnIndex
+
+DIMENSION = 16
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((300, DIMENSION)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [f"id{n}" for n in range(len(vectors))], vectors
+
+
+def open_index(path):
+    # nprobe cobre todas as listas: a busca aproximada fica exata e comparável
+    return AnnIndex(path, DIMENSION, nprobe=64, min_train_size=100)
+
+
+def top_ids(index, query, k=5):
+    return [item_id for item_id, _ in index.search(query[None], k=k)[0]]
+
+
+def test_delta_persists(tmp_path, data):
+    ids, vectors = data
+    index = open_index(tmp_path)
+    assert index.add(ids[:50], vectors[:50]) == 50
+    index.watermark = "2026-01-01T00:00:00"
+    index.save()
+
+    reopened = open_index(tmp_path)
+    assert len(reopened) == 50 and reopened.watermark == "2026-01-01T00:00:00"
+    assert top_ids(reopened, vectors[3], k=1) == ["id3"]
+
+
+def test_rebuild_trains_lists_and_persists(tmp_path, data):
+    ids, vectors = data
+    index = open_index(tmp_path)
+    index.add(ids, vectors)
+    assert index.needs_rebuild()
+    index.rebuild(nlist=8)
+    assert index.generation == 1 and len(index) == len(ids)
+    assert not (tmp_path / "delta.ids.npy").exists()
+
+    index.rebuild(nlist=8)
+    assert sorted(p.name for p in tmp_path.glob("base-*.npy")) == [
+        f"base-2.{part}.npy" for part in ("centroids", "ids", "offsets", "vectors")
+    ]
+
+    reopened = open_index(tmp_path)
+    exact = np.argsort(-(vectors @ vectors[10]))[:5]
+    assert top_ids(reopened, vectors[10]) == [ids[n] for n in exact]
+    assert reopened.ids() == set(ids)
+
+
+def test_remove_and_replace_survive_reopen(tmp_path, data):
+    ids, vectors = data
+    index = open_index(tmp_path)
+    index.add(ids, vectors)
+    index.rebuild(nlist=8)
+
+    assert index.remove(["id1", "id2", "ausente"]) == 2
+    index.add(["id3"], -vectors[3:4])  # substitui um vetor da base
+    index.save()
+
+    reopened = open_index(tmp_path)
+    assert "id1" not in reopened and "id3" in reopened
+    assert len(reopened) == len(ids) - 2
+    assert "id1" not in top_ids(reopened, vectors[1])
+    assert top_ids(reopened, -vectors[3], k=1) == ["id3"]
+
+
+def test_retain_removes_and_restores(tmp_path, data):
+    ids, vectors = data
+    index = open_index(tmp_path)
+    index.add(ids[:200], vectors[:200])
+    index.rebuild(nlist=8)
+    index.add(ids[200:], vectors[200:])
+
+    live = set(ids[10:250])
+    assert index.retain(live) == (10 + 50, 0)
+    assert index.ids() == live
+    index.save()
+
+    reopened = open_index(tmp_path)
+    assert reopened.ids() == live
+    assert reopened.retain(set(ids[:250])) == (0, 10)
+    assert "id0" in reopened and len(reopened) == 250
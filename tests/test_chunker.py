@@ -0,0 +1,43 @@
+"""Equivalência do chunker por somas prefixadas (e do streaming) com o algoritmo anterior."""
+
+import io
+
+import pytest
+
+from benchmark_chunker import legacy_split_into_chunks
+from conftest import MARKDOWN_DIR
+from utils.text_processor import TextProcessor
+
+# Documentos do corpus até este tamanho (o algoritmo anterior é quadrático no overlap)
+MAX_SAMPLE_CHARS = 400_000
+SAMPLES = sorted(
+    p for p in MARKDOWN_DIR.rglob("*.md") if p.stat().st_size <= MAX_SAMPLE_CHARS
+)
+SETTINGS = [(1500, 200), (300, 100), (50, 0)]
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return TextProcessor()
+
+
+@pytest.mark.skipif(not SAMPLES, reason="sem Markdown em 1-MarkdownClean")
+@pytest.mark.parametrize("chunk_size, chunk_overlap", SETTINGS)
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.name[:40])
+def test_chunks_match_previous_algorithm(processor, path, chunk_size, chunk_overlap):
+    text = path.read_text(encoding="utf-8")
+    reference = legacy_split_into_chunks(processor, text, chunk_size, chunk_overlap)
+    assert processor.split_into_chunks(text, chunk_size, chunk_overlap) == reference
+    streamed = processor.iter_chunks(io.StringIO(text), chunk_size, chunk_overlap, block_size=4096)
+    assert list(streamed) == reference
+
+
+def test_sentence_longer_than_chunk(processor):
+    text = "Curta. " + "palavra " * 400 + "fim. Outra curta. Mais uma."
+    reference = legacy_split_into_chunks(processor, text, 100, 20)
+    assert processor.split_into_chunks(text, 100, 20) == reference
+    assert list(processor.iter_chunks(io.StringIO(text), 100, 20, block_size=64)) == reference
+
+
+def test_empty_text(processor):
+    assert processor.split_into_chunks("", 100, 20) == legacy_split_into_chunks(processor, "", 100, 20)
@@ -0,0 +1,120 @@
+"""Testes do manifesto de conversão incremental e da quarentena do passo 1."""
+
+import os
+
+import pytest
+
+from utils.conversion_manifest import ADOPTED_VERSION, ConversionManifest, ConversionQuarantine
+
+VERSION = "docling-2.20.0+r2"
+
+
+@pytest.fixture
+def files(tmp_path):
+    source = tmp_path / "raw" / "lei.pdf"
+    source.parent.mkdir()
+    source.write_bytes(b"%PDF conteudo original")
+    output = tmp_path / "md" / "lei.md"
+    output.parent.mkdir()
+    return source, output
+
+
+def set_mtime(path, seconds):
+    os.utime(path, ns=(seconds * 10**9, seconds * 10**9))
+
+
+def converted(tmp_path, source, output):
+    manifest = ConversionManifest(tmp_path / "md" / ".manifest.json", VERSION)
+    output.write_text("# Lei", encoding="utf-8")
+    manifest.record("lei.pdf", source, output)
+    manifest.save()
+    return ConversionManifest(manifest.path, VERSION)
+
+
+def test_unchanged_file_is_a_hit(tmp_path, files):
+    source, output = files
+    manifest = converted(tmp_path, source, output)
+    needed, sha = manifest.needs_conversion("lei.pdf", source, output)
+    assert not needed and sha == manifest.entries["lei.pdf"]["sha256"]
+
+
+def test_touch_without_content_change_is_a_hit(tmp_path, files):
+    source, output = files
+    manifest = converted(tmp_path, source, output)
+    set_mtime(source, 1_900_000_000)
+    assert manifest.needs_conversion("lei.pdf", source, output)[0] is False
+    assert manifest.entries["lei.pdf"]["mtime_ns"] == 1_900_000_000 * 10**9
+
+
+def test_content_change_is_a_miss(tmp_path, files):
+    source, output = files
+    manifest = converted(tmp_path, source, output)
+    source.write_bytes(b"%PDF conteudo alterado")
+    needed, sha = manifest.needs_conversion("lei.pdf", source, output)
+    assert needed and sha != manifest.entries["lei.pdf"]["sha256"]
+
+
+def test_version_change_or_missing_output_is_a_miss(tmp_path, files):
+    source, output = files
+    manifest = converted(tmp_path, source, output)
+    assert manifest.needs_conversion("lei.pdf", source, output, VERSION + "+docx-native")[0]
+    output.unlink()
+    assert manifest.needs_conversion("lei.pdf", source, output)[0]
+
+
+def test_newer_output_is_adopted_until_the_version_changes(tmp_path, files):
+    source, output = files
+    output.write_text("# Lei", encoding="utf-8")
+    set_mtime(source, 1_000)
+    set_mtime(output, 2_000)
+    manifest = ConversionManifest(tmp_path / "md" / ".manifest.json", VERSION)
+
+    assert manifest.needs_conversion("lei.pdf", source, output)[0] is False
+    assert manifest.entries["lei.pdf"]["converter_version"] == ADOPTED_VERSION
+    manifest.save()
+
+    reopened = ConversionManifest(manifest.path, VERSION)
+    assert reopened.needs_conversion("lei.pdf", source, output)[0] is False
+    upgraded = ConversionManifest(manifest.path, "docling-2.21.0+r2")
+    assert upgraded.needs_conversion("lei.pdf", source, output, "docling-2.21.0+r2")[0]
+
+
+def test_output_older_than_source_is_not_adopted(tmp_path, files):
+    source, output = files
+    output.write_text("# Lei antiga", encoding="utf-8")
+    set_mtime(output, 1_000)
+    set_mtime(source, 2_000)
+    manifest = ConversionManifest(tmp_path / "md" / ".manifest.json", VERSION)
+    assert manifest.needs_conversion("lei.pdf", source, output) == (True, None)
+    assert "lei.pdf" not in manifest.entries
+
+
+def test_native_extractor_output_is_not_adopted(tmp_path, files):
+    source, output = files
+    output.write_text("# Lei", encoding="utf-8")
+    set_mtime(source, 1_000)
+    manifest = ConversionManifest(tmp_path / "md" / ".manifest.json", VERSION)
+    assert manifest.needs_conversion("lei.docx", source, output, VERSION + "+docx-native")[0]
+
+
+def test_orphans_are_removed(tmp_path, files):
+    source, output = files
+    manifest = converted(tmp_path, source, output)
+    assert manifest.remove_orphans([]) == ["lei.pdf"]
+    assert not output.exists() and manifest.entries == {}
+
+
+def test_quarantine_is_keyed_by_size_and_mtime(tmp_path, files):
+    source, _ = files
+    path = tmp_path / "quarantine.json"
+    quarantine = ConversionQuarantine(path)
+    quarantine.add("lei.pdf", source, "timeout", 120.0)
+    quarantine.save()
+
+    reopened = ConversionQuarantine(path)
+    assert reopened.contains("lei.pdf", source)
+    assert not reopened.contains("outra.pdf", source)
+
+    set_mtime(source, 1_900_000_000)
+    assert not reopened.contains("lei.pdf", source)
+    assert "lei.pdf" not in reopened.entries
@@ -0,0 +1,137 @@
+"""Testes do diff por documento do passo 2: chunks inalterados, atualizados, novos e removidos."""
+
+import importlib
+
+import numpy as np
+import pytest
+
+pytest.importorskip("supabase")
+pytest.importorskip("tqdm")
+create_chunks = importlib.import_module("02_create_chunks")
+from utils.text_processor import TextProcessor  # noqa: E402
+
+SENTENCES = [
+    "Art. 1º Esta lei regula as licitações e os contratos administrativos.",
+    "Art. 2º Aplica-se aos órgãos da administração direta e indireta.",
+    "Art. 3º O procedimento observará os princípios da legalidade e da publicidade.",
+    "Art. 4º Os contratos serão formalizados por escrito.",
+]
+
+
+class FakeGenerator:
+    def __init__(self):
+        self.encoded = []
+
+    def generate_embeddings_batch(self, texts, show_progress=False):
+        self.encoded.extend(texts)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+class FakeDB:
+    """Tabela chunks em memória com as operações usadas pelo passo 2."""
+
+    def __init__(self):
+        self.rows = {}
+        self.inserted = 0
+
+    def get_or_create_law(self, **kwargs):
+        return {"id": "lei-1"}
+
+    def get_chunk_hashes(self, source_path):
+        return {h: dict(r) for h, r in self.rows.items() if r["source_path"] == source_path}
+
+    def insert_chunks_batch(self, chunks):
+        for chunk in chunks:
+            assert chunk["content_hash"] not in self.rows
+            self.rows[chunk["content_hash"]] = dict(chunk)
+        self.inserted += len(chunks)
+        return len(chunks)
+
+    def upsert_chunks_batch(self, chunks):
+        for chunk in chunks:
+            self.rows[chunk["content_hash"]].update(chunk)
+        return len(chunks)
+
+    def retire_chunks(self, chunk_ids):
+        ids = set(chunk_ids)
+        retired = [r for r in self.rows.values() if r["id"] in ids and r["is_active"]]
+        for row in retired:
+            row["is_active"] = False
+        return len(retired)
+
+    def active(self):
+        rows = sorted((r for r in self.rows.values() if r["is_active"]), key=lambda r: r["chunk_index"])
+        return [r["content"] for r in rows]
+
+
+@pytest.fixture
+def run(monkeypatch, tmp_path):
+    # Chunks pequenos e sem overlap: um artigo por chunk
+    monkeypatch.setattr(create_chunks, "CHUNK_SIZE", 25)
+    monkeypatch.setattr(create_chunks, "CHUNK_OVERLAP", 0)
+    monkeypatch.setattr(create_chunks, "MARKDOWN_DIR", tmp_path)
+    db = FakeDB()
+    processor = TextProcessor()
+    path = tmp_path / "lei.md"
+
+    def run_once(sentences):
+        generator = FakeGenerator()
+        batcher = create_chunks.create_batcher(generator, db)
+        create_chunks.process_markdown("\n\n".join(sentences), path, processor, batcher, db)
+        create_chunks.flush_batcher(batcher)
+        return generator.encoded
+
+    return db, run_once
+
+
+def test_first_run_inserts_every_chunk(run):
+    db, run_once = run
+    encoded = run_once(SENTENCES)
+    assert db.active() == SENTENCES
+    assert sorted(encoded) == sorted(SENTENCES)
+
+
+def test_unchanged_document_is_a_no_op(run):
+    db, run_once = run
+    run_once(SENTENCES)
+    inserted = db.inserted
+    assert run_once(SENTENCES) == []
+    assert db.inserted == inserted and db.active() == SENTENCES
+
+
+def test_added_and_removed_chunks(run):
+    db, run_once = run
+    run_once(SENTENCES)
+    changed = SENTENCES[:2] + ["Art. 3º O procedimento observará a eficiência."] + SENTENCES[3:]
+    assert run_once(changed) == [changed[2]]
+    assert db.active() == changed
+    assert [r["content"] for r in db.rows.values() if not r["is_active"]] == [SENTENCES[2]]
+
+
+def test_moved_chunks_are_updated_without_embedding(run):
+    db, run_once = run
+    run_once(SENTENCES)
+    reordered = SENTENCES[1:] + SENTENCES[:1]
+    assert run_once(reordered) == []
+    assert db.active() == reordered
+
+
+def test_removed_chunk_comes_back(run):
+    db, run_once = run
+    run_once(SENTENCES)
+    run_once(SENTENCES[:3])
+    assert db.active() == SENTENCES[:3]
+    assert run_once(SENTENCES) == []  # reativado sem novo embedding
+    assert db.active() == SENTENCES
+
+
+def test_failed_save_keeps_old_chunks_active(run, monkeypatch):
+    db, run_once = run
+    run_once(SENTENCES)
+
+    def fail(chunks):
+        raise RuntimeError("banco indisponível")
+
+    monkeypatch.setattr(db, "insert_chunks_batch", fail)
+    run_once(SENTENCES[:3] + ["Art. 4º Redação nova."])
+    assert db.active() == SENTENCES
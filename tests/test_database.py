@@ -0,0 +1,55 @@
+"""Literal pgvector dos embeddings: ida e volta com 7 dígitos significativos."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("supabase")
+
+from database import VECTOR_PRECISION, parse_vector, vector_literal
+
+# Erro relativo máximo de %.7g (meia unidade no 7º dígito) somado ao arredondamento float32
+RELATIVE_TOLERANCE = 0.5 * 10 ** (1 - VECTOR_PRECISION) + np.finfo(np.float32).eps
+
+
+@pytest.fixture(scope="module")
+def embeddings():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(50, 384)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def test_round_trip_within_precision(embeddings):
+    for embedding in embeddings:
+        literal = vector_literal(embedding)
+        assert literal.startswith("[") and literal.endswith("]") and literal.count(",") == 383
+        parsed = parse_vector(literal)
+        assert parsed.dtype == np.float32 and parsed.shape == embedding.shape
+        np.testing.assert_allclose(parsed, embedding, rtol=RELATIVE_TOLERANCE, atol=0)
+        assert float(parsed @ embedding) == pytest.approx(1.0, abs=1e-6)
+
+
+def test_literal_is_idempotent(embeddings):
+    literal = vector_literal(embeddings[0])
+    assert vector_literal(parse_vector(literal)) == literal
+
+
+def test_lists_and_arrays_format_alike():
+    values = [0.1, -2.5e-08, 123456789.0, 0.0, 1.0]
+    assert vector_literal(values) == vector_literal(np.array(values, dtype=np.float64))
+    assert vector_literal(values) == "[0.1,-2.5e-08,1.234568e+08,0,1]"
+    np.testing.assert_array_equal(parse_vector(values), np.array(values, dtype=np.float32))
+
+
+@pytest.mark.parametrize("bad", [np.nan, np.inf, -np.inf])
+def test_non_finite_components_are_rejected(embeddings, bad):
+    embedding = embeddings[0].copy()
+    embedding[7] = bad
+    with pytest.raises(ValueError):
+        vector_literal(embedding)
+    with pytest.raises(ValueError):
+        vector_literal(embedding.tolist())
+    literal = "[" + ",".join(["0.5", str(bad), "0.25"]) + "]"
+    with pytest.raises(ValueError):
+        parse_vector(literal)
+    with pytest.raises(ValueError):
+        parse_vector([0.5, bad])
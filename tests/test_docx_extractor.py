@@ -0,0 +1,70 @@
+"""Extrator DOCX nativo: texto visível, títulos, listas e tabelas a partir do OOXML."""
+
+import zipfile
+
+import pytest
+
+from utils.docx_extractor import ComplexDocumentError, DocxExtractor
+
+STYLES = """<?xml version="1.0" encoding="UTF-8"?>
+<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:style w:type="paragraph" w:styleId="Ttulo1"><w:name w:val="heading 1"/></w:style>
+</w:styles>"""
+
+
+def make_docx(path, body):
+    document = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", document)
+        archive.writestr("word/styles.xml", STYLES)
+    return path
+
+
+def paragraph(*runs, properties=""):
+    return f"<w:p>{properties}{''.join(runs)}</w:p>"
+
+
+def run(text):
+    return f'<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
+
+
+@pytest.fixture
+def convert(tmp_path):
+    return lambda body: DocxExtractor().convert(make_docx(tmp_path / "doc.docx", body))
+
+
+def test_structure(convert):
+    markdown = convert(
+        paragraph(run("LEI Nº 1"), properties='<w:pPr><w:pStyle w:val="Ttulo1"/></w:pPr>')
+        + paragraph(run("Art. 1º"), "<w:r><w:tab/></w:r>", run("Texto."))
+        + paragraph(run("item"), properties="<w:pPr><w:numPr/></w:pPr>")
+        + "<w:tbl><w:tr><w:tc>" + paragraph(run("A|B")) + "</w:tc><w:tc>" + paragraph(run("C"))
+        + "</w:tc></w:tr></w:tbl>"
+    )
+    assert markdown == "# LEI Nº 1\n\nArt. 1º Texto.\n\n- item\n\n| A\\|B | C |\n|---|---|\n"
+
+
+def test_tracked_deletions_and_field_codes_are_skipped(convert):
+    markdown = convert(paragraph(
+        run("Prazo de "),
+        '<w:del w:id="1"><w:r><w:delText>dez</w:delText></w:r></w:del>',
+        '<w:ins w:id="2">' + run("trinta") + "</w:ins>",
+        run(" dias"),
+        '<w:moveFrom w:id="3">' + run(" (movido)") + "</w:moveFrom>",
+        '<w:r><w:fldChar w:fldCharType="begin"/></w:r>',
+        '<w:r><w:instrText> PAGE </w:instrText></w:r>',
+        '<w:r><w:fldChar w:fldCharType="separate"/></w:r>',
+        run(", página 3"),
+        '<w:r><w:fldChar w:fldCharType="end"/></w:r>',
+        run("."),
+    ))
+    assert markdown == "Prazo de trinta dias, página 3.\n"
+
+
+def test_complex_elements_are_delegated(convert):
+    with pytest.raises(ComplexDocumentError):
+        convert(paragraph('<w:r><w:txbxContent/></w:r>'))
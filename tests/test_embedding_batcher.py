@@ -0,0 +1,85 @@
+"""Testes da fila global de embeddings do passo 2: ordem, falhas isoladas por documento."""
+
+import numpy as np
+
+from utils.embedding_batcher import EmbeddingBatcher
+
+
+class FakeGenerator:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.calls = []
+
+    def generate_embeddings_batch(self, texts, show_progress=False):
+        self.calls.append(list(texts))
+        if self.fail_on and self.fail_on in texts:
+            raise RuntimeError(f"falha em {self.fail_on}")
+        return np.array([[len(t), 0] for t in texts], dtype=np.float32)
+
+
+def make_batcher(generator, saved, fail_key=None, max_pending=100):
+    def on_ready(ready):
+        if fail_key and any(item["key"] == fail_key for item, _ in ready):
+            raise RuntimeError("insert falhou")
+        saved.extend(ready)
+    return EmbeddingBatcher(generator, on_ready, batch_size=2, max_pending=max_pending)
+
+
+def submit(batcher, key, texts):
+    for text in texts:
+        batcher.submit({"key": key, "text": text}, text, len(text), key=key)
+
+
+def test_flush_keeps_submission_order_and_sorts_batches():
+    generator = FakeGenerator()
+    saved = []
+    batcher = make_batcher(generator, saved)
+    submit(batcher, "a.md", ["ccc", "a"])
+    batcher.submit({"key": "a.md", "text": None}, None, 0, key="a.md")
+    submit(batcher, "b.md", ["bb"])
+    batcher.flush()
+
+    assert generator.calls == [["a", "bb", "ccc"]]
+    assert [item["text"] for item, _ in saved] == ["ccc", "a", None, "bb"]
+    assert [None if e is None else e[0] for _, e in saved] == [3, 1, None, 2]
+    assert len(batcher) == 0 and not batcher.failed
+
+
+def test_encode_failure_is_isolated_to_its_document():
+    generator = FakeGenerator(fail_on="ruim")
+    saved, retired = [], []
+    batcher = make_batcher(generator, saved)
+    submit(batcher, "a.md", ["um", "dois"])
+    batcher.on_saved("a.md", lambda: retired.append("a.md"))
+    submit(batcher, "b.md", ["ruim"])
+    batcher.on_saved("b.md", lambda: retired.append("b.md"))
+    submit(batcher, "c.md", ["tres"])
+    batcher.flush()
+
+    assert [item["key"] for item, _ in saved] == ["a.md", "a.md", "c.md"]
+    assert set(batcher.failed) == {"b.md"}
+    assert retired == ["a.md"]
+    assert len(batcher) == 0
+
+
+def test_insert_failure_keeps_old_rows_active():
+    saved, retired = [], []
+    batcher = make_batcher(FakeGenerator(), saved, fail_key="b.md", max_pending=3)
+    submit(batcher, "a.md", ["um"])
+    batcher.on_saved("a.md", lambda: retired.append("a.md"))
+    submit(batcher, "b.md", ["dois", "tres"])  # descarga automática dentro do submit de b.md
+    batcher.on_saved("b.md", lambda: retired.append("b.md"))
+
+    assert retired == ["a.md"]
+    assert set(batcher.failed) == {"b.md"}
+
+
+def test_on_saved_waits_for_pending_items():
+    saved, retired = [], []
+    batcher = make_batcher(FakeGenerator(), saved)
+    batcher.on_saved("vazio.md", lambda: retired.append("vazio.md"))
+    submit(batcher, "a.md", ["um"])
+    batcher.on_saved("a.md", lambda: retired.append("a.md"))
+    assert retired == ["vazio.md"]
+    batcher.flush()
+    assert retired == ["vazio.md", "a.md"]
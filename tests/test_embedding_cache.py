@@ -0,0 +1,55 @@
+"""Testes do cache persistente de embeddings: leitura, persistência e despejo LRU."""
+
+import numpy as np
+
+from utils.embedding_cache import EmbeddingCache
+
+DIMENSION = 4
+
+
+def vector(n):
+    return np.full(DIMENSION, n, dtype=np.float32)
+
+
+def open_cache(tmp_path, max_entries=None):
+    cache = EmbeddingCache(tmp_path, "modelo/teste", DIMENSION)
+    if max_entries:
+        cache.max_entries = max_entries
+    return cache
+
+
+def test_put_get_and_reopen(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.put_many(["a", "b"], [vector(1), vector(2)])
+    assert [v[0] for v in cache.get_many(["a", "b"])] == [1, 2]
+    assert cache.get_many(["c"]) == [None]
+    assert (cache.hits, cache.misses) == (2, 1)
+    cache.close()
+
+    reopened = open_cache(tmp_path)
+    assert reopened.get_many(["b"])[0][0] == 2
+    assert len(reopened) == 2
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = open_cache(tmp_path, max_entries=3)
+    for n, text in enumerate("abc"):
+        cache.put_many([text], [vector(n)])
+    cache.get_many(["a"])  # "b" passa a ser o menos usado
+    cache.put_many(["d"], [vector(3)])
+
+    assert len(cache) == 3
+    assert cache.get_many(["b"]) == [None]
+    assert [v[0] for v in cache.get_many(["a", "c", "d"])] == [0, 2, 3]
+
+
+def test_batch_larger_than_cache_stays_bounded(tmp_path):
+    cache = open_cache(tmp_path, max_entries=3)
+    cache.put_many(["x"], [vector(9)])
+    texts = [f"t{n}" for n in range(5)]
+    cache.put_many(texts, [vector(n) for n in range(5)])
+
+    assert len(cache) == 3
+    found = cache.get_many(["x"] + texts)
+    assert found[:3] == [None, None, None]
+    assert [v[0] for v in found[3:]] == [2, 3, 4]
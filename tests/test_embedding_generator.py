@@ -0,0 +1,36 @@
+"""Testes da fábrica get_embedding_generator: opções de config.py e cache de instâncias."""
+
+import pytest
+
+import config
+from utils import embedding_generator
+
+
+class Recorder:
+    def __init__(self, **options):
+        self.options = options
+
+
+@pytest.fixture(autouse=True)
+def fake_generator(monkeypatch):
+    monkeypatch.setattr(embedding_generator, "EmbeddingGenerator", Recorder)
+    monkeypatch.setattr(embedding_generator, "_generator_cache", {})
+
+
+def test_factory_reads_config():
+    generator = embedding_generator.get_embedding_generator()
+    assert generator.options["model_name"] == config.EMBEDDING_MODEL
+    assert generator.options["batch_size"] == config.EMBEDDING_BATCH_SIZE
+    assert generator.options["cache_max_mb"] == config.EMBEDDING_CACHE_MAX_MB
+    assert generator.options["server_url"] == config.EMBEDDING_SERVER_URL
+    assert embedding_generator.get_embedding_generator() is generator
+
+
+def test_every_option_is_part_of_the_cache_key():
+    base = embedding_generator.get_embedding_generator()
+    for option, value in [("cache_max_mb", 1), ("api_concurrency", 99),
+                          ("api_requests_per_minute", 1), ("api_tokens_per_minute", 1),
+                          ("server_url", "http://127.0.0.1:1")]:
+        other = embedding_generator.get_embedding_generator(**{option: value})
+        assert other is not base
+        assert other.options[option] == value
@@ -0,0 +1,104 @@
+"""Testes do servidor local de embeddings: micro-lotes, ordem e clientes concorrentes."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from utils.embedding_service import MicroBatcher, EmbeddingServiceClient, create_server
+
+DIMENSION = 4
+
+
+def fake_encode(texts):
+    """Linha i = [len(texto), posição no lote, 0, 1]."""
+    return np.array([[len(t), i, 0, 1] for i, t in enumerate(texts)], dtype=np.float32)
+
+
+class FakeGenerator:
+    model_name = "fake/model"
+    cache_name = "fake/model"
+    backend = "fake"
+    dimension = DIMENSION
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+
+    def generate_embeddings_batch(self, texts, show_progress=False):
+        self.calls.append(len(texts))
+        time.sleep(self.delay)
+        return fake_encode(texts)
+
+
+@pytest.fixture
+def server():
+    generator = FakeGenerator(delay=0.01)
+    server = create_server(generator, port=0, max_batch=64, max_wait_ms=5)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, generator, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    server.batcher.close()
+
+
+def test_micro_batcher_keeps_request_order():
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        time.sleep(0.02)
+        return fake_encode(texts)
+
+    batcher = MicroBatcher(encode, max_batch=100, max_wait_ms=20)
+    requests = [["x" * (n + 1)] * (n % 3 + 1) for n in range(12)]
+    futures = [batcher.submit(texts) for texts in requests]
+    results = [future.result(timeout=5) for future in futures]
+    batcher.close()
+
+    for texts, rows in zip(requests, results):
+        assert rows.shape == (len(texts), DIMENSION)
+        assert (rows[:, 0] == len(texts[0])).all()
+    # Posições consecutivas no lote: cada requisição recebe a própria fatia
+    assert len(calls) < len(requests)
+    assert [t for call in calls for t in call] == [t for texts in requests for t in texts]
+
+def test_micro_batcher_propagates_errors():
+    def encode(texts):
+        raise ValueError("modelo indisponível")
+
+    batcher = MicroBatcher(encode, max_wait_ms=0)
+    with pytest.raises(ValueError, match="modelo indisponível"):
+        batcher.submit(["a"]).result(timeout=5)
+    batcher.close()
+
+def test_server_round_trip(server):
+    _, _, url = server
+    client = EmbeddingServiceClient(url)
+    assert client.health()["dimension"] == DIMENSION
+    rows = client.embed(["a", "bbb"])
+    assert rows.dtype == np.float32
+    assert rows[:, 0].tolist() == [1, 3]
+    with pytest.raises(RuntimeError, match="400"):
+        client.embed(["a", 1])
+
+def test_server_handles_many_concurrent_clients(server):
+    _, generator, url = server
+    client = EmbeddingServiceClient(url)
+
+    def embed(n):
+        return client.embed(["x" * n] * 2)
+
+    with ThreadPoolExecutor(max_workers=64) as executor:
+        results = list(executor.map(embed, range(1, 129)))
+    for n, rows in enumerate(results, start=1):
+        assert (rows[:, 0] == n).all()
+    assert len(generator.calls) < len(results)
+
+def test_client_reports_unavailable_server():
+    client = EmbeddingServiceClient("http://127.0.0.1:1", max_retries=1)
+    with pytest.raises(RuntimeError, match="indisponível"):
+        client.health()
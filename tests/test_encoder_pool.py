@@ -0,0 +1,107 @@
+"""Pool de processos de encoding: ordem dos resultados e encerramento em falhas."""
+
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+from utils import encoder_pool
+from utils.encoder_pool import EncoderPool, cpu_shares
+
+# fork: os processos herdam o _load_encoder substituído pelo monkeypatch
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="multiprocessing sem fork"
+)
+
+
+def fake_load_encoder(spec, threads):
+    """Encoder falso: embedding = (número do texto, tamanho, pid do worker)."""
+    if spec["backend"] == "broken":
+        raise OSError("modelo ausente")
+
+    def encode(texts):
+        for text in texts:
+            if text.startswith("boom"):
+                raise ValueError(text)
+            if text.startswith("exit"):
+                os._exit(1)
+        return [[float(text.split()[0]), len(text), os.getpid()] for text in texts]
+
+    return encode
+
+
+@pytest.fixture
+def make_pool(monkeypatch):
+    monkeypatch.setattr(encoder_pool, "_load_encoder", fake_load_encoder)
+    pools = []
+
+    def factory(backend="fake", num_workers=3):
+        pool = EncoderPool({"backend": backend}, num_workers, start_method="fork",
+                           start_timeout=30.0, poll_interval=0.1)
+        pools.append(pool)
+        return pool
+
+    yield factory
+    for pool in pools:
+        pool.close()
+
+
+def texts(count):
+    # Tamanhos embaralhados: o pool ordena por tamanho antes de formar os lotes
+    return [f"{i} " + "x" * ((i * 37) % 50) for i in range(count)]
+
+
+def processes(pool):
+    return [worker["process"] for worker in pool._workers]
+
+
+def test_cpu_shares_cover_each_core_once():
+    shares = cpu_shares(3)
+    cores = [core for share in shares for core in share]
+    assert len(cores) == len(set(cores)) and all(shares)
+
+
+@pytest.mark.parametrize("count, batch_size", [(100, 7), (5, 32), (1, 1)])
+def test_results_keep_input_order(make_pool, count, batch_size):
+    pool = make_pool()
+    inputs = texts(count)
+    embeddings = pool.encode(inputs, batch_size)
+    assert embeddings.dtype == np.float32 and embeddings.shape == (count, 3)
+    np.testing.assert_array_equal(embeddings[:, 0], np.arange(count))
+    np.testing.assert_array_equal(embeddings[:, 1], [len(t) for t in inputs])
+
+
+def test_batches_are_spread_across_workers(make_pool):
+    pool = make_pool(num_workers=2)
+    if len(cpu_shares(2)) < 2:
+        pytest.skip("um único núcleo disponível")
+    embeddings = pool.encode(texts(40), 5)
+    assert set(embeddings[:, 2]) == {p.pid for p in processes(pool)}
+
+
+def test_encoding_error_shuts_the_pool_down(make_pool):
+    pool = make_pool()
+    pool.encode(texts(10), 2)
+    workers = processes(pool)
+    with pytest.raises(RuntimeError, match="Erro no encoding: ValueError"):
+        pool.encode(texts(10) + ["boom"], 2)
+    assert pool._workers == [] and not any(p.is_alive() for p in workers)
+    # Reiniciado sob demanda, sem resultados da chamada interrompida
+    np.testing.assert_array_equal(pool.encode(texts(10), 2)[:, 0], np.arange(10))
+
+
+def test_dead_worker_shuts_the_pool_down(make_pool):
+    pool = make_pool()
+    pool.start()
+    workers = processes(pool)
+    with pytest.raises(RuntimeError, match="Processos de encoding finalizados"):
+        pool.encode(texts(10) + ["exit"], 2)
+    assert pool._workers == [] and not any(p.is_alive() for p in workers)
+
+
+def test_model_load_failure_fails_start(make_pool):
+    pool = make_pool(backend="broken")
+    with pytest.raises(RuntimeError, match="OSError: modelo ausente"):
+        pool.start()
+    assert pool._workers == []
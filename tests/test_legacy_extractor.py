@@ -0,0 +1,74 @@
+"""Testes dos extratores em processo de RTF e Word 97-2003 (.doc)."""
+
+import pytest
+
+from conftest import RAW_DOCS_DIR
+from utils.legacy_extractor import (
+    RtfExtractor, DocExtractor, LegacyFormatError, HAS_STRIPRTF, _strip_binary_runs
+)
+
+requires_striprtf = pytest.mark.skipif(not HAS_STRIPRTF, reason="striprtf não instalado")
+
+ANEEL_RTF = RAW_DOCS_DIR / "legislacao" / "administrativo" / "aneel_(lei_9074).rtf"
+SAMPLE_DOC = RAW_DOCS_DIR / "legislacao" / "leis_-_concurso_mpe-sc" / "ambiental" / "12854_2003_lei.doc"
+
+
+def write_rtf(tmp_path, body: bytes):
+    path = tmp_path / "doc.rtf"
+    path.write_bytes(rb"{\rtf1\ansi\ansicpg1252\deff0{\fonttbl{\f0 Times;}}" + body + b"}")
+    return path
+
+
+@requires_striprtf
+def test_rtf_field_result_is_kept(tmp_path):
+    path = write_rtf(tmp_path, rb'Antes {\field{\*\fldinst HYPERLINK "x"}{\fldrslt Lei 8.112}} depois')
+    text = RtfExtractor().extract_text(path)
+    assert "Lei 8.112" in text
+    assert "HYPERLINK" not in text
+
+
+@requires_striprtf
+def test_rtf_field_without_hyperlink_is_kept(tmp_path):
+    path = write_rtf(tmp_path, rb"{\field{\*\fldinst SEQ inciso}{\fldrslt III -}} a execu\'e7\'e3o")
+    assert RtfExtractor().extract_text(path).split() == ["III", "-", "a", "execução"]
+
+
+@requires_striprtf
+def test_rtf_skips_binary_runs(tmp_path):
+    path = write_rtf(tmp_path, rb"Art. 1\'ba {\*\objdata\bin6 {}\}x\} vigente")
+    assert RtfExtractor().extract_text(path).split() == ["Art.", "1º", "vigente"]
+
+
+def test_strip_binary_runs_ignores_escaped_backslash():
+    assert _strip_binary_runs(rb"a\\bin3 xyz") == rb"a\\bin3 xyz"
+    assert _strip_binary_runs(rb"a\bin3 xyzb") == b"ab"
+
+
+@requires_striprtf
+@pytest.mark.skipif(not ANEEL_RTF.exists(), reason="corpus ausente")
+def test_rtf_corpus_keeps_titles_and_remissions():
+    markdown = RtfExtractor().convert(ANEEL_RTF)
+    assert markdown.startswith("# aneel_(lei_9074)\n\n")
+    assert "LEI Nº 9.074" in markdown
+    assert "nos termos da Lei no 8.987" in markdown
+    assert "\nII - (VETADO)\n" in markdown
+
+
+def test_doc_field_codes_keep_result():
+    text = "ver \x13 HYPERLINK \"x\" \x14Lei 9.605\x15 e \x13 PAGE \x13 x \x14y\x15\x14 3\x15 fim"
+    assert DocExtractor()._strip_fields(text) == "ver Lei 9.605 e  3 fim"
+
+
+def test_doc_rejects_non_ole_file(tmp_path):
+    path = tmp_path / "falso.doc"
+    path.write_bytes(b"{\\rtf1 nao e OLE}")
+    with pytest.raises(LegacyFormatError):
+        DocExtractor().extract_text(path)
+
+
+@pytest.mark.skipif(not SAMPLE_DOC.exists(), reason="corpus ausente")
+def test_doc_corpus_text():
+    text = DocExtractor().extract_text(SAMPLE_DOC)
+    assert text.startswith("LEI Nº 12.854, DE 22 DE DEZEMBRO DE 2003\n")
+    assert "Art. 1º" in text
+    assert not any(mark in text for mark in "\x13\x14\x15\r")
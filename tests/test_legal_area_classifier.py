@@ -0,0 +1,98 @@
+"""Classificador de área do direito: autômato Aho-Corasick vs busca termo a termo."""
+
+import re
+
+import pytest
+
+from config import LEGAL_AREAS
+from conftest import MARKDOWN_DIR
+from utils.legal_area_classifier import DEFAULT_LEGAL_AREAS, LegalAreaClassifier, fold, normalize_taxonomy
+
+# Documentos do corpus até este tamanho (a referência faz uma varredura por palavra-chave)
+MAX_SAMPLE_CHARS = 400_000
+SAMPLES = sorted(
+    p for p in MARKDOWN_DIR.rglob("*.md") if p.stat().st_size <= MAX_SAMPLE_CHARS
+)
+TAXONOMIES = {"default": DEFAULT_LEGAL_AREAS, "config": LEGAL_AREAS or DEFAULT_LEGAL_AREAS}
+
+
+def per_term_score(taxonomy, text):
+    """Referência: uma regex por palavra-chave, contando ocorrências (inclusive sobrepostas) x peso."""
+    folded = fold(text)
+    scores = {}
+    for area, keywords in normalize_taxonomy(taxonomy).items():
+        total = 0.0
+        for keyword, weight in keywords.items():
+            words = re.findall(r"\w+", fold(keyword))
+            if not words:
+                continue
+            pattern = r"(?<!\w)(?=" + r"\W+".join(map(re.escape, words)) + r"(?!\w))"
+            total += weight * len(re.findall(pattern, folded))
+        if total > 0:
+            scores[area] = total
+    return scores
+
+
+def blocks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return LegalAreaClassifier({
+        "Administrativo": {"servidor público": 2, "processo administrativo": 3, "administrativo": 1},
+        "Penal": ["pena", "infração penal", "crime"],
+        "Trabalho": ["CLT", "jornada de trabalho", "trabalho"],
+    })
+
+
+def test_word_boundaries(classifier):
+    assert classifier.score("Direito penal e penalidades.") == {}
+    assert classifier.score("A pena; o crime.") == {"Penal": 2.0}
+
+
+def test_overlapping_terms_all_count(classifier):
+    # "processo administrativo" contém "administrativo"; "jornada de trabalho" contém "trabalho"
+    assert classifier.score("processo administrativo") == {"Administrativo": 4.0}
+    assert classifier.score("jornada de trabalho e trabalho") == {"Trabalho": 3.0}
+    assert classifier.score("processo processo administrativo") == {"Administrativo": 4.0}
+
+
+def test_case_and_accent_folding(classifier):
+    assert classifier.score("SERVIDOR PUBLICO") == {"Administrativo": 2.0}
+    assert classifier.score("Servidor Público, infracao penal") == {"Administrativo": 2.0, "Penal": 1.0}
+    assert classifier.score("clt") == {"Trabalho": 1.0}
+    # Texto decomposto (NFD), comum em PDFs convertidos
+    assert classifier.score("servidor público") == {"Administrativo": 2.0}
+
+
+def test_multi_word_terms_across_block_boundaries(classifier):
+    text = "O servidor público cometeu infração penal na jornada de trabalho."
+    expected = classifier.score(text)
+    assert expected == {"Administrativo": 2.0, "Penal": 1.0, "Trabalho": 2.0}
+    for size in range(1, len(text) + 1):
+        assert classifier.score(blocks(text, size)) == expected, size
+
+
+def test_word_split_between_blocks(classifier):
+    assert classifier.score(["servidor pú", "blico"]) == {"Administrativo": 2.0}
+    assert classifier.score(["pe", "na"]) == {"Penal": 1.0}
+    assert classifier.score(["pena", " "]) == {"Penal": 1.0}
+    assert classifier.score(["pe", "", "nal"]) == {}
+
+
+def test_classify(classifier):
+    assert classifier.classify("crime e pena no servidor público") == "Administrativo"
+    assert classifier.classify("sem palavras-chave") is None
+
+
+@pytest.mark.skipif(not SAMPLES, reason="sem Markdown em 1-MarkdownClean")
+@pytest.mark.parametrize("taxonomy", TAXONOMIES, ids=str)
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.name[:40])
+def test_matches_per_term_scan(path, taxonomy):
+    text = path.read_text(encoding="utf-8")
+    classifier = LegalAreaClassifier(TAXONOMIES[taxonomy])
+    reference = per_term_score(TAXONOMIES[taxonomy], text)
+    assert classifier.score(text) == pytest.approx(reference)
+    with open(path, encoding="utf-8") as f:
+        assert classifier.score(iter(lambda: f.read(4096), "")) == pytest.approx(reference)
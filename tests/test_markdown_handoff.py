@@ -0,0 +1,130 @@
+"""Testes da passagem em memória do modo fused (passos 1+2) e do orquestrador."""
+
+import threading
+import time
+import types
+
+import pytest
+
+import config
+import run_pipeline
+from utils.markdown_handoff import MarkdownHandoff
+
+
+def consume_in_thread(handoff, received, on_item=None):
+    def consume():
+        for output_path, content in handoff:
+            received.append((output_path.name, content))
+            if on_item:
+                on_item()
+    thread = threading.Thread(target=consume, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_documents_keep_order_and_are_written(tmp_path):
+    handoff = MarkdownHandoff(maxsize=2, poll_interval=0.05)
+    received = []
+    consumer = consume_in_thread(handoff, received)
+    paths = [tmp_path / "sub" / f"doc{n}.md" for n in range(10)]
+    for n, path in enumerate(paths):
+        handoff.publish(path, f"# Documento {n}")
+    handoff.close()
+    consumer.join(timeout=5)
+
+    assert not consumer.is_alive()
+    assert received == [(f"doc{n}.md", f"# Documento {n}") for n in range(10)]
+    assert [p.read_text(encoding="utf-8") for p in paths] == [f"# Documento {n}" for n in range(10)]
+    assert handoff.write_errors == 0
+
+
+def test_existing_files_are_drained_without_polling(tmp_path):
+    handoff = MarkdownHandoff(poll_interval=0.2)
+    handoff.add_existing(tmp_path / f"old{n}.md" for n in range(50))
+    received = []
+    start = time.perf_counter()
+    consumer = consume_in_thread(handoff, received)
+    while len(received) < 50 and time.perf_counter() - start < 5:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    handoff.close()
+    consumer.join(timeout=5)
+
+    assert [name for name, _ in received] == [f"old{n}.md" for n in range(50)]
+    assert all(content is None for _, content in received)
+    # Antes: ~0,2 s de espera por arquivo existente (10 s para 50)
+    assert elapsed < 1.0
+
+
+def test_new_documents_take_priority_over_existing(tmp_path):
+    handoff = MarkdownHandoff(poll_interval=0.05)
+    handoff.add_existing([tmp_path / "old.md"])
+    handoff.publish(tmp_path / "new.md", "novo")
+    handoff.close()
+    assert [(p.name, c) for p, c in handoff] == [("new.md", "novo"), ("old.md", None)]
+
+
+def test_iteration_ends_after_close(tmp_path):
+    handoff = MarkdownHandoff(poll_interval=0.05)
+    received = []
+    consumer = consume_in_thread(handoff, received)
+    time.sleep(0.1)
+    handoff.close()
+    consumer.join(timeout=2)
+    assert not consumer.is_alive() and received == []
+
+
+def test_abort_unblocks_producer(tmp_path):
+    handoff = MarkdownHandoff(maxsize=1, poll_interval=0.05)
+    handoff.abort(RuntimeError("falha no chunker"))
+    for n in range(5):
+        handoff.publish(tmp_path / f"doc{n}.md", "x")  # não bloqueia com a fila cheia
+    handoff.close()
+    assert (tmp_path / "doc4.md").exists()
+
+
+def fake_steps(monkeypatch, documents, consume):
+    """Substitui os módulos dos passos 1 e 2 por versões mínimas."""
+    def convert_main(handoff=None):
+        for path, content in documents:
+            handoff.publish(path, content)
+        handoff.wait_written()
+
+    modules = {
+        1: types.SimpleNamespace(main=convert_main),
+        2: types.SimpleNamespace(consume_handoff=consume)
+    }
+    monkeypatch.setattr(run_pipeline, "_load_step_module", lambda step: modules[step])
+    monkeypatch.setattr(config, "FUSED_QUEUE_SIZE", 1)
+
+
+def run_with_timeout(timeout=10):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(run_pipeline.run_fused_conversion_and_chunking()),
+                              daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "modo fused travou"
+    return result[0]
+
+
+def test_fused_run_delivers_every_document_in_order(monkeypatch, tmp_path):
+    documents = [(tmp_path / f"doc{n}.md", f"conteúdo {n}") for n in range(20)]
+    received = []
+    fake_steps(monkeypatch, documents, lambda handoff: received.extend(c for _, c in handoff))
+
+    assert run_with_timeout() is True
+    assert received == [content for _, content in documents]
+
+
+def test_fused_run_consumer_failure_does_not_hang_producer(monkeypatch, tmp_path):
+    documents = [(tmp_path / f"doc{n}.md", "x") for n in range(20)]
+
+    def failing_consumer(handoff):
+        for _ in handoff:
+            raise RuntimeError("erro no chunking")
+
+    fake_steps(monkeypatch, documents, failing_consumer)
+    assert run_with_timeout() is False
+    # A conversão seguiu até o fim e gravou todo o Markdown
+    assert all(path.exists() for path, _ in documents)
@@ -0,0 +1,101 @@
+"""Índice MinHash/LSH de chunks quase duplicados."""
+
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from conftest import PROJECT_ROOT
+from utils.near_duplicates import NearDuplicateIndex
+
+WORDS = (
+    "licitação contrato servidor pena crime tributo imposto prazo recurso sentença juiz réu autor "
+    "parte multa órgão união estado município decreto portaria norma vigência revogação publicação"
+).split()
+
+
+def document(seed, length=200):
+    """Texto pseudoaleatório determinístico sobre um vocabulário jurídico."""
+    return " ".join(random.Random(seed).choices(WORDS, k=length))
+
+
+def edited(text, every):
+    words = text.split()
+    return " ".join("alterada" if i % every == 0 else word for i, word in enumerate(words))
+
+
+@pytest.fixture
+def index():
+    return NearDuplicateIndex(threshold=0.85)
+
+
+def test_identical_chunks_alias_to_first_seen(index):
+    text = document(1)
+    assert index.add("a", text) == (None, 0.0)
+    assert index.add("b", document(2)) == (None, 0.0)
+    assert index.add("c", text) == ("a", 1.0)
+    # Aliases não entram no índice: a próxima cópia também aponta para o primeiro
+    assert index.add("d", text) == ("a", 1.0)
+    assert index.alias_count == 2 and index.canonical_count == 2
+
+
+def test_short_identical_chunks(index):
+    assert index.add("a", "Revogado.") == (None, 0.0)
+    assert index.add("b", "(REVOGADO)") == ("a", 1.0)
+
+
+def test_near_duplicate_above_threshold_aliases(index):
+    text = document(3)
+    index.add("a", text)
+    key, similarity = index.add("b", edited(text, 100))
+    assert key == "a" and 0.85 <= similarity < 1.0
+
+
+def test_unrelated_and_distant_chunks_do_not_alias(index):
+    text = document(4)
+    index.add("a", text)
+    assert index.add("b", document(5)) == (None, 0.0)
+    # Uma palavra trocada a cada dez: ~1/3 dos shingles em comum, abaixo do limiar
+    key, similarity = index.add("c", edited(text, 10))
+    assert key is None and similarity == 0.0
+    assert index.canonical_count == 3
+
+
+def test_registered_chunks_are_canonical(index):
+    index.register("existente", document(6))
+    assert index.add("novo", document(6)) == ("existente", 1.0)
+
+
+def test_num_perm_must_be_a_multiple_of_bands():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_perm=100, bands=16)
+
+
+def run_stream():
+    index = NearDuplicateIndex()
+    texts = [document(seed % 6) if seed % 3 else edited(document(seed % 6), 60) for seed in range(30)]
+    return [index.add(i, text) for i, text in enumerate(texts)]
+
+
+def test_deterministic_within_a_process():
+    assert run_stream() == run_stream()
+
+
+def test_signature_is_stable_across_processes():
+    # crc32 e semente fixa: a assinatura não depende do PYTHONHASHSEED do processo
+    code = (
+        "import sys; sys.path.insert(0, 'scripts/utils');"
+        "from near_duplicates import NearDuplicateIndex;"
+        "print(NearDuplicateIndex().signature(sys.argv[1]).tolist())"
+    )
+    text = document(7)
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", code, text], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+            env={**os.environ, "PYTHONHASHSEED": hash_seed}
+        ).stdout
+        for hash_seed in ("1", "2")
+    }
+    assert outputs == {f"{NearDuplicateIndex().signature(text).tolist()}\n"}
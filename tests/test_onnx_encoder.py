@@ -0,0 +1,153 @@
+"""Paridade do encoder ONNX int8 (pesos quantizados) com o fp32, em um modelo pequeno gerado no teste."""
+
+import json
+
+import numpy as np
+import pytest
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+
+from onnx import TensorProto, helper, numpy_helper
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+
+from config import EMBEDDING_ONNX_DIR
+from utils.onnx_encoder import (
+    COSINE_TOLERANCE, ONNX_CONFIG_FILE, ONNX_MODEL_FILES, TOKENIZER_FILE, OnnxEncoder
+)
+
+HIDDEN = 64
+MAX_SEQ_LENGTH = 16
+TEXTS = [
+    "Art. 1º Esta Lei estabelece normas gerais de licitação e contratação.",
+    "§ 2º O disposto no caput não se aplica às empresas públicas.",
+    "Parágrafo único. Aplica-se subsidiariamente o Código de Processo Civil.",
+    "A pena de reclusão será cumprida em regime fechado, semiaberto ou aberto.",
+    "Revogado.",
+    "",
+]
+
+
+def build_tokenizer(texts):
+    vocab = {"[PAD]": 0, "[UNK]": 1}
+    tokenizer = Tokenizer(WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    for text in texts:
+        for word, _ in tokenizer.pre_tokenizer.pre_tokenize_str(text):
+            vocab.setdefault(word, len(vocab))
+    tokenizer = Tokenizer(WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    return tokenizer
+
+
+def build_weights(vocab_size, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "embeddings": rng.normal(size=(vocab_size, HIDDEN)).astype(np.float32),
+        "dense": (rng.normal(size=(HIDDEN, HIDDEN)) / np.sqrt(HIDDEN)).astype(np.float32),
+        "output": (rng.normal(size=(HIDDEN, HIDDEN)) / np.sqrt(HIDDEN)).astype(np.float32),
+    }
+
+
+def build_model(weights):
+    """Transformer de brinquedo: embedding -> MatMul -> Tanh -> MatMul, mascarado (last_hidden_state)."""
+    nodes = [
+        helper.make_node("Gather", ["embeddings", "input_ids"], ["embedded"]),
+        helper.make_node("MatMul", ["embedded", "dense"], ["projected"]),
+        helper.make_node("Tanh", ["projected"], ["activated"]),
+        helper.make_node("MatMul", ["activated", "output"], ["hidden"]),
+        helper.make_node("Cast", ["attention_mask"], ["mask"], to=TensorProto.FLOAT),
+        helper.make_node("Unsqueeze", ["mask", "last_axis"], ["mask3d"]),
+        helper.make_node("Mul", ["hidden", "mask3d"], ["last_hidden_state"]),
+    ]
+    initializers = [numpy_helper.from_array(array, name) for name, array in weights.items()]
+    initializers.append(numpy_helper.from_array(np.array([-1], dtype=np.int64), "last_axis"))
+    graph = helper.make_graph(
+        nodes, "encoder",
+        [helper.make_tensor_value_info(name, TensorProto.INT64, ["batch", "sequence"])
+         for name in ("input_ids", "attention_mask")],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "sequence", HIDDEN])],
+        initializers
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    return model
+
+
+def reference_encode(weights, tokenizer, texts):
+    """Mesmo grafo e pooling (mean + L2) em numpy, texto a texto."""
+    rows = []
+    for text in texts:
+        ids = tokenizer.encode(text.strip()).ids[:MAX_SEQ_LENGTH]
+        hidden = np.tanh(weights["embeddings"][ids] @ weights["dense"]) @ weights["output"]
+        pooled = hidden.mean(axis=0) if ids else np.zeros(HIDDEN, dtype=np.float32)
+        rows.append(pooled / max(np.linalg.norm(pooled), 1e-12))
+    return np.array(rows, dtype=np.float32)
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("onnx")
+    tokenizer = build_tokenizer(TEXTS)
+    tokenizer.save(str(directory / TOKENIZER_FILE))
+    weights = build_weights(tokenizer.get_vocab_size())
+    fp32_path = directory / ONNX_MODEL_FILES["fp32"]
+    onnx.save(build_model(weights), str(fp32_path))
+    quantize_dynamic(str(fp32_path), str(directory / ONNX_MODEL_FILES["int8"]), weight_type=QuantType.QInt8)
+    config = {
+        "dimension": HIDDEN, "max_seq_length": MAX_SEQ_LENGTH, "pad_token": "[PAD]", "pad_token_id": 0,
+        "pooling": "mean", "normalize": True
+    }
+    (directory / ONNX_CONFIG_FILE).write_text(json.dumps(config), encoding="utf-8")
+    return directory, weights, tokenizer
+
+
+def cosine(first, second):
+    first = first / np.linalg.norm(first, axis=1, keepdims=True)
+    second = second / np.linalg.norm(second, axis=1, keepdims=True)
+    return (first * second).sum(axis=1)
+
+
+def test_fp32_matches_numpy_reference(model_dir):
+    directory, weights, tokenizer = model_dir
+    texts = TEXTS[:-1]
+    embeddings = OnnxEncoder(directory, quantized=False).encode(texts, batch_size=2)
+    assert embeddings.dtype == np.float32 and embeddings.shape == (len(texts), HIDDEN)
+    np.testing.assert_allclose(embeddings, reference_encode(weights, tokenizer, texts), atol=1e-5)
+
+
+def test_int8_within_cosine_tolerance_of_fp32(model_dir):
+    directory, _, _ = model_dir
+    texts = TEXTS[:-1]
+    fp32 = OnnxEncoder(directory, quantized=False).encode(texts)
+    int8 = OnnxEncoder(directory, quantized=True).encode(texts)
+    assert not np.array_equal(fp32, int8)
+    assert cosine(fp32, int8).min() >= COSINE_TOLERANCE["int8"]
+
+
+def test_batching_preserves_input_order(model_dir):
+    directory, _, _ = model_dir
+    # fp32: no int8 a escala de quantização das ativações depende do lote
+    encoder = OnnxEncoder(directory, quantized=False)
+    whole = encoder.encode(TEXTS, batch_size=len(TEXTS))
+    np.testing.assert_allclose(encoder.encode(TEXTS, batch_size=1), whole, atol=1e-6)
+    np.testing.assert_allclose(encoder.encode(TEXTS[::-1], batch_size=3)[::-1], whole, atol=1e-6)
+
+
+def test_missing_model_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        OnnxEncoder(tmp_path)
+
+
+@pytest.mark.skipif(
+    not all((EMBEDDING_ONNX_DIR / name).exists() for name in [ONNX_CONFIG_FILE, *ONNX_MODEL_FILES.values()]),
+    reason="modelo ONNX não exportado (python scripts/export_onnx_model.py)"
+)
+def test_exported_model_int8_parity():
+    fp32 = OnnxEncoder(EMBEDDING_ONNX_DIR, quantized=False).encode(TEXTS[:-1])
+    int8 = OnnxEncoder(EMBEDDING_ONNX_DIR, quantized=True).encode(TEXTS[:-1])
+    assert cosine(fp32, int8).min() >= COSINE_TOLERANCE["int8"]
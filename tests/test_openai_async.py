@@ -0,0 +1,189 @@
+"""
+Testes do cliente assíncrono de embeddings contra um servidor local que imita
+/v1/embeddings (latência aleatória, respostas embaralhadas, 429 e erros 4xx).
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+pytest.importorskip("openai")
+from utils.openai_async import (  # noqa: E402
+    AsyncEmbeddingClient, RateLimiter, approximate_tokens, retry_after_seconds
+)
+
+
+def stub_vector(text):
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return np.frombuffer(digest[:8], dtype=np.uint8).astype(np.float32) / 255
+
+
+class StubServer:
+    """Servidor /v1/embeddings; `respond(n, body)` pode devolver (status, payload, headers)."""
+
+    def __init__(self, respond=None, latency=(0.0, 0.0)):
+        self.respond = respond
+        self.latency = latency
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.requests += 1
+                    number = stub.requests
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(random.uniform(*stub.latency))
+                    reply = stub.respond(number, body) if stub.respond else None
+                    status, payload, headers = reply or (200, stub.embeddings(body), {})
+                    raw = json.dumps(payload).encode("utf-8")
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(raw)))
+                    for key, value in headers.items():
+                        self.send_header(key, value)
+                    self.end_headers()
+                    self.wfile.write(raw)
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @staticmethod
+    def embeddings(body):
+        data = [{"object": "embedding", "index": i,
+                 "embedding": base64.b64encode(stub_vector(t).tobytes()).decode("ascii")}
+                for i, t in enumerate(body["input"])]
+        random.shuffle(data)
+        return {"object": "list", "data": data, "model": body["model"],
+                "usage": {"prompt_tokens": 0, "total_tokens": 0}}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def error(status, message, headers=None):
+    return status, {"error": {"message": message, "type": "error"}}, headers or {}
+
+
+def make_client(stub, **kwargs):
+    options = dict(batch_size=10, concurrency=8, requests_per_minute=60000,
+                   count_tokens=approximate_tokens, max_retries=3)
+    options.update(kwargs)
+    return AsyncEmbeddingClient("sk-test", "text-embedding-3-small", base_url=stub.url, **options)
+
+
+TEXTS = [f"Art. {i}º Texto de teste número {i}." for i in range(300)]
+
+
+def test_order_preserved_under_concurrency():
+    stub = StubServer(latency=(0.0, 0.05))
+    try:
+        client = make_client(stub)
+        embeddings = client.embed(TEXTS)
+    finally:
+        stub.close()
+    assert embeddings.dtype == np.float32
+    assert np.array_equal(embeddings, np.stack([stub_vector(t) for t in TEXTS]))
+    assert client.requests == stub.requests == 30
+    assert stub.max_in_flight > 1
+
+
+def test_in_flight_requests_are_capped():
+    stub = StubServer(latency=(0.03, 0.03))
+    try:
+        client = make_client(stub, batch_size=5, concurrency=3)
+        client.embed(TEXTS[:60])
+    finally:
+        stub.close()
+    assert stub.max_in_flight == 3
+
+
+def test_rate_limiter_waits_for_request_and_token_buckets():
+    async def timed_acquire(limiter, tokens):
+        start = time.monotonic()
+        await limiter.acquire(tokens)
+        return time.monotonic() - start
+
+    # 600 req/min = 10/s: com o balde vazio, a próxima requisição espera ~0,1 s
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10**9)
+    limiter.requests.level = 0
+    assert 0.08 <= asyncio.run(timed_acquire(limiter, 1)) < 0.5
+
+    # 60000 tokens/min = 1000/s: 100 tokens esperam ~0,1 s
+    limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=60000)
+    limiter.tokens.level = 0
+    assert 0.08 <= asyncio.run(timed_acquire(limiter, 100)) < 0.5
+
+    # Depois de um 429 a vazão cai à metade: a mesma espera dobra
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10**9)
+    limiter.throttled(0.0)
+    limiter.requests.level = 0
+    assert 0.18 <= asyncio.run(timed_acquire(limiter, 1)) < 0.6
+
+
+def test_batches_respect_token_budget():
+    stub = StubServer()
+    try:
+        client = make_client(stub, batch_size=100, tokens_per_minute=50, count_tokens=lambda t: 10)
+        assert [len(batch) for _, batch, _ in client._batches(TEXTS[:12])] == [5, 5, 2]
+    finally:
+        stub.close()
+
+
+def test_429_waits_for_retry_after():
+    def respond(number, body):
+        if number == 1:
+            return error(429, "Rate limit", {"Retry-After": "0.3"})
+        return None
+
+    stub = StubServer(respond)
+    try:
+        client = make_client(stub, batch_size=100)
+        start = time.perf_counter()
+        embeddings = client.embed(TEXTS[:10])
+        elapsed = time.perf_counter() - start
+    finally:
+        stub.close()
+    assert np.array_equal(embeddings, np.stack([stub_vector(t) for t in TEXTS[:10]]))
+    assert (client.throttled, client.retries, stub.requests) == (1, 1, 2)
+    assert elapsed >= 0.3
+
+
+def test_retry_after_header_formats():
+    assert retry_after_seconds({"retry-after-ms": "250"}) == 0.25
+    assert retry_after_seconds({"retry-after": "2"}) == 2.0
+    assert retry_after_seconds({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+    assert retry_after_seconds({}) is None
+
+
+def test_non_retryable_4xx_raises_immediately():
+    stub = StubServer(lambda number, body: error(400, "input inválido"))
+    try:
+        client = make_client(stub)
+        with pytest.raises(RuntimeError, match="400"):
+            client.embed(TEXTS[:5])
+    finally:
+        stub.close()
+    assert stub.requests == 1 and client.retries == 0
@@ -0,0 +1,49 @@
+"""Testes da segmentação de sentenças com abreviações e marcadores jurídicos."""
+
+import pytest
+
+from utils.sentence_segmenter import SentenceSegmenter, split_sentences
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("O disposto no Art. 5º da Lei nº. 8.666 aplica-se. Fim.",
+     ["O disposto no Art. 5º da Lei nº. 8.666 aplica-se.", "Fim."]),
+    ("Art. 5º. Os recursos serão aplicados.", ["Art. 5º. Os recursos serão aplicados."]),
+    ("Fim do caput.\nArt. 10. O texto.", ["Fim do caput.", "Art. 10. O texto."]),
+    ("Fim do caput. § 2º. O prazo.", ["Fim do caput.", "§ 2º. O prazo."]),
+    ("Parágrafo único. Texto.", ["Parágrafo único. Texto."]),
+    ("1. Primeiro item.\n2. Segundo.", ["1. Primeiro item.", "2. Segundo."]),
+    # Referências no meio da frase encerram a sentença
+    ("Conforme o art. 5º. Os recursos seguem.", ["Conforme o art. 5º.", "Os recursos seguem."]),
+    ("Aplica-se o § 2º. Em seguida, decide.", ["Aplica-se o § 2º.", "Em seguida, decide."]),
+])
+def test_markers(text, expected):
+    assert split_sentences(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Navegou pelo mar. Em seguida voltou.", ["Navegou pelo mar.", "Em seguida voltou."]),
+    ("Levou 5 min. Depois saiu.", ["Levou 5 min.", "Depois saiu."]),
+    ("Publicada em 15 de mar. de 2020. Vigora.", ["Publicada em 15 de mar. de 2020.", "Vigora."]),
+    ("Julgado em 10 set. 2019. Ementa.", ["Julgado em 10 set. 2019.", "Ementa."]),
+    ("Rel. Min. Luiz Fux, Des. Fulano. Voto.", ["Rel. Min. Luiz Fux, Des. Fulano.", "Voto."]),
+    # Palavras comuns em fim de sentença
+    ("Pagou dez. Depois saiu.", ["Pagou dez.", "Depois saiu."]),
+    ("A escolha coube a nos. Assim decidiu.", ["A escolha coube a nos.", "Assim decidiu."]),
+    ("Tudo terminou num. Então voltou.", ["Tudo terminou num.", "Então voltou."]),
+    ("Comprou um par. O restante ficou.", ["Comprou um par.", "O restante ficou."]),
+    ("Vigora desde 1º de dez. de 2020. Fim.", ["Vigora desde 1º de dez. de 2020.", "Fim."]),
+    ("Processos nos. 10 e 11. Arquivados.", ["Processos nos. 10 e 11.", "Arquivados."]),
+    ("Certidão num. 5. Válida.", ["Certidão num. 5.", "Válida."]),
+    ("Conforme o par. único do art. 2º. Fim.", ["Conforme o par. único do art. 2º.", "Fim."]),
+])
+def test_ambiguous_abbreviations(text, expected):
+    assert split_sentences(text) == expected
+
+
+def test_ends_sentence_is_conservative_without_following_text():
+    segmenter = SentenceSegmenter()
+    assert segmenter.ends_sentence("Fim do caput.")
+    assert not segmenter.ends_sentence("Publicada em 15 de mar.")
+    assert not segmenter.ends_sentence("Pagou dez.")
+    assert not segmenter.ends_sentence("Art. 5º.")
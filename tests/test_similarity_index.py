@@ -0,0 +1,75 @@
+"""Busca top-k do SimilarityIndex contra a referência de força bruta em numpy."""
+
+import numpy as np
+import pytest
+
+from utils.similarity_index import SimilarityIndex, normalize_rows
+
+
+def brute_force(candidates, queries, k, exclude_self=False):
+    """Referência: matriz completa de cossenos em float64 e ordenação total."""
+    candidates = np.asarray(candidates, dtype=np.float64)
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+    candidates = candidates / np.linalg.norm(candidates, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    similarities = queries @ candidates.T
+    if exclude_self:
+        np.fill_diagonal(similarities, -np.inf)
+    order = np.argsort(-similarities, axis=1, kind="stable")[:, :k]
+    return order, np.take_along_axis(similarities, order, axis=1)
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(42)
+    return rng.normal(size=(300, 32)).astype(np.float32), rng.normal(size=(40, 32)).astype(np.float32)
+
+
+@pytest.mark.parametrize("block_size", [3, 7, 64, 2048])
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_search_matches_brute_force(data, block_size, k):
+    candidates, queries = data
+    indices, scores = SimilarityIndex(candidates, block_size=block_size).search(queries, k)
+    expected_indices, expected_scores = brute_force(candidates, queries, k)
+    assert indices.dtype == np.int64 and scores.dtype == np.float32
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(scores, expected_scores, atol=1e-5)
+
+
+@pytest.mark.parametrize("block_size", [5, 16, 2048])
+def test_neighbors_match_brute_force_without_self(data, block_size):
+    candidates, _ = data
+    indices, scores = SimilarityIndex(candidates, block_size=block_size).neighbors(k=4)
+    expected_indices, expected_scores = brute_force(candidates, candidates, 4, exclude_self=True)
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(scores, expected_scores, atol=1e-5)
+    assert not (indices == np.arange(len(candidates))[:, None]).any()
+
+
+def test_incremental_add_matches_single_build(data):
+    candidates, queries = data
+    index = SimilarityIndex(block_size=50)
+    for start in range(0, len(candidates), 37):
+        assigned = index.add(candidates[start:start + 37])
+        np.testing.assert_array_equal(assigned, np.arange(start, min(start + 37, len(candidates))))
+    assert len(index) == len(candidates) and index.dimension == candidates.shape[1]
+    np.testing.assert_allclose(index.matrix, normalize_rows(candidates))
+    np.testing.assert_array_equal(index.search(queries, 10)[0], brute_force(candidates, queries, 10)[0])
+
+
+def test_single_query_and_k_limits(data):
+    candidates, queries = data
+    index = SimilarityIndex(candidates[:3])
+    indices, scores = index.search(queries[0], k=10)
+    assert indices.shape == scores.shape == (1, 3)
+    np.testing.assert_array_equal(indices, brute_force(candidates[:3], queries[0], 3)[0])
+    assert index.search(queries, k=0)[0].shape == (len(queries), 0)
+    assert SimilarityIndex(dimension=32).search(queries, k=5)[0].shape == (len(queries), 0)
+    assert index.neighbors(k=5)[0].shape == (3, 2)
+
+
+def test_dimension_mismatch_is_rejected(data):
+    candidates, _ = data
+    index = SimilarityIndex(candidates)
+    with pytest.raises(ValueError):
+        index.add(np.ones((2, 8), dtype=np.float32))
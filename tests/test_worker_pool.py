@@ -0,0 +1,51 @@
+"""Testes do pool supervisionado: inicialização, falhas e novas tentativas."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from utils.worker_pool import SupervisedPool, WorkerStartupError
+
+
+def square(x):
+    if x < 0:
+        raise ValueError("negativo")
+    return x * x
+
+def crash_always(_):
+    os._exit(3)
+
+def crash_first_time(marker: str):
+    # A primeira tentativa derruba o worker; a nova tentativa, em outro worker, conclui
+    if not Path(marker).exists():
+        Path(marker).touch()
+        os._exit(3)
+    return "ok"
+
+def broken_initializer():
+    raise ImportError("docling ausente")
+
+
+def run(pool, tasks):
+    return sorted((index, status, value) for index, status, value, _ in pool.run(tasks))
+
+
+def test_results_and_task_errors():
+    pool = SupervisedPool(square, 2, poll_interval=0.05)
+    assert run(pool, [(2,), (-1,), (3,)]) == [
+        (0, "ok", 4), (1, "error", "ValueError: negativo"), (2, "ok", 9)
+    ]
+
+def test_initializer_failure_aborts_instead_of_failing_tasks():
+    pool = SupervisedPool(square, 2, initializer=broken_initializer, poll_interval=0.05)
+    with pytest.raises(WorkerStartupError, match="docling ausente"):
+        run(pool, [(1,), (2,)])
+
+def test_crash_is_retried_on_a_new_worker(tmp_path):
+    pool = SupervisedPool(crash_first_time, 1, poll_interval=0.05)
+    assert run(pool, [(str(tmp_path / "marker"),)]) == [(0, "ok", "ok")]
+
+def test_repeated_crash_is_reported():
+    pool = SupervisedPool(crash_always, 1, crash_retries=1, poll_interval=0.05)
+    assert run(pool, [(None,)]) == [(0, "crashed", None)]